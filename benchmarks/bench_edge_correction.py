@@ -0,0 +1,49 @@
+# benchmarks/bench_edge_correction.py
+"""
+Per-edge Python loop vs EdgeCorrection scatter-add, against edge count.
+Run: python -m benchmarks.bench_edge_correction
+"""
+
+import time
+import torch
+
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
+from src.models.edge_correction import EdgeCorrection
+from tests.helpers import loop_edge_correction
+
+SIZES = [(100, 1_000), (1_000, 10_000), (5_000, 50_000), (20_000, 200_000)]
+
+
+def _best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    torch.manual_seed(0)
+    fc = torch.nn.Linear(NUM_EDGE_FEATURES, 18)
+    scatter_add = EdgeCorrection("sum")
+
+    print(f"{'nodes':>7} {'edges':>8} {'loop (s)':>9} {'scatter (ms)':>13} "
+          f"{'loop edges/s':>13} {'scatter edges/s':>16} {'speedup':>8} {'max |diff|':>11}")
+
+    for n_nodes, n_edges in SIZES:
+        x = torch.randn(n_nodes, 18)
+        edge_index = torch.randint(0, n_nodes, (2, n_edges))
+        with torch.no_grad():
+            correction = fc(torch.rand(n_edges, NUM_EDGE_FEATURES))
+
+            t_scatter, got = _best_of(lambda: scatter_add(x, edge_index, correction))
+            t_loop, ref = _best_of(lambda: loop_edge_correction(x, edge_index, correction), repeat=1)
+
+        print(f"{n_nodes:>7} {n_edges:>8} {t_loop:>9.3f} {t_scatter * 1000:>13.2f} "
+              f"{n_edges / t_loop:>13.0f} {n_edges / t_scatter:>16.0f} "
+              f"{t_loop / t_scatter:>7.0f}x {(got - ref).abs().max().item():>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
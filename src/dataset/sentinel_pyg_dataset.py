@@ -1,9 +1,15 @@
 import os
+import glob
+import hashlib
 import json
 import torch
 import networkx as nx
 import pandas as pd
-from torch_geometric.data import Data, Dataset
+from torch_geometric.data import Data, Dataset, InMemoryDataset
+
+# Event types (edge features) - shared with the pipeline's int8 event codes
+from src.pipeline.window_graph import EDGE_STAT_KEYS, EVENT_TYPES
+from src.pipeline.graph_store import GraphStore, graph_arrays
 
 # Node features (11 as before)
 NODE_FEATURE_KEYS = [
@@ -30,73 +36,157 @@ NODE_FEATURE_KEYS = [
     "time_cos"
 ]
 
-# Event types (edge features)
-EVENT_TYPES = [
-    "EVENT_EXECUTE", "EVENT_FORK", "EVENT_SIGNAL", "EVENT_READ", "EVENT_WRITE",
-    "EVENT_OPEN", "EVENT_CREATE", "EVENT_RECVMSG", "EVENT_RECVFROM",
-    "EVENT_RENAME", "EVENT_CLONE", "EVENT_UNIT", "EVENT_MODIFY_PROCESS",
-    "EVENT_SENDMSG", "EVENT_SENDTO", "EVENT_SHM", "EVENT_TEE", "EVENT_SPLICE",
-    "EVENT_VMSPLICE", "EVENT_INIT_MODULE", "EVENT_FINIT_MODULE",
-    "EVENT_SERVICEINSTALL"
-]
-
 NUM_NODE_FEATURES = len(NODE_FEATURE_KEYS)
-NUM_EDGE_FEATURES = len(EVENT_TYPES)
+NUM_EDGE_FEATURES = len(EVENT_TYPES) + len(EDGE_STAT_KEYS)  # type shares + repeat stats
+
+
+def data_from_arrays(arrays, y):
+    """GraphStore arrays -> PyG Data; x / edge_attr share the store's memory."""
+    data = Data(
+        x=torch.from_numpy(arrays["x"]),
+        edge_index=torch.from_numpy(arrays["edge_index"]).t(),
+        edge_attr=torch.from_numpy(arrays["edge_attr"]),
+        y=torch.tensor([y], dtype=torch.long),
+        node_id=torch.from_numpy(arrays["node_id"]).long(),
+    )
+    if "node_kind" in arrays:
+        data.node_kind = torch.from_numpy(arrays["node_kind"]).long()
+    return data
+
+
+def require_features(G, feature_keys, source):
+    """Raise if a JSON window graph's nodes lack any of feature_keys."""
+    _, first = next(iter(G.nodes(data=True)), (None, {}))
+    missing = [k for k in feature_keys if first and k not in first]
+    if missing:
+        raise ValueError(
+            f"{source} was built without node features {missing}; "
+            f"rebuild with SENTINEL_FEATURES covering them")
+
+
+def feature_columns(feature_keys=None):
+    """Index into NODE_FEATURE_KEYS for a model's feature list (a slice if a prefix)."""
+    if feature_keys is None:
+        return slice(None)
+    cols = [NODE_FEATURE_KEYS.index(k) for k in feature_keys]
+    if cols == list(range(len(cols))):
+        return slice(0, len(cols))  # view, no copy
+    return torch.tensor(cols, dtype=torch.long)
 
 
 class SentinelGraphDataset(Dataset):
-    def __init__(self, graphs_dir, labels_csv):
+    """
+    One PyG Data per window.
+
+    Reads the packed GraphStore (store_dir) when it exists; otherwise
+    parses window_XXXX.json from graphs_dir. With feature_keys (e.g.
+    GraphSAGE.FEATURE_KEYS) x only holds those columns. A build that did
+    not compute all of them raises ValueError.
+    """
+
+    def __init__(self, graphs_dir, labels_csv, store_dir=None, feature_keys=None):
         super().__init__()
         self.graphs_dir = graphs_dir
+        self.feature_keys = list(feature_keys) if feature_keys is not None else NODE_FEATURE_KEYS
+        self.columns = feature_columns(feature_keys)
         self.labels = pd.read_csv(labels_csv)
+        self.label_of = dict(zip(self.labels["window_id"], self.labels["label"]))
+
+        self.store = GraphStore(store_dir) if GraphStore.exists(store_dir) else None
+        if self.store is not None:
+            self.store.require(self.feature_keys)
 
         self.valid = []
         for wid in self.labels["window_id"]:
-            if os.path.exists(f"{graphs_dir}/window_{wid:04d}.json"):
+            if self.store is not None and wid in self.store:
+                self.valid.append(wid)
+            elif os.path.exists(f"{graphs_dir}/window_{wid:04d}.json"):
                 self.valid.append(wid)
 
     def len(self):
         return len(self.valid)
 
     def get(self, idx):
+        data = self._get(idx)
+        data.x = data.x[:, self.columns]
+        return data
+
+    def _get(self, idx):
         wid = self.valid[idx]
+        if self.store is not None and wid in self.store:
+            return data_from_arrays(self.store.arrays(wid), int(self.label_of[wid]))
+
         path = f"{self.graphs_dir}/window_{wid:04d}.json"
 
         with open(path, "r") as f:
-            g_json = json.load(f)
-        G = nx.node_link_graph(g_json)
-
-        # -------- Node features --------
-        node_idx = {}
-        node_features = []
-
-        for i, (node, data) in enumerate(G.nodes(data=True)):
-            node_idx[node] = i
-            node_features.append(
-                [float(data.get(k, 0)) for k in NODE_FEATURE_KEYS]
-            )
-
-        x = torch.tensor(node_features, dtype=torch.float)
+            G = nx.node_link_graph(json.load(f))
+        require_features(G, self.feature_keys, path)
 
-        # -------- Edge features --------
-        edges = []
-        edge_features = []
+        # same packing as the store: node features, type shares + repeat stats
+        return data_from_arrays(graph_arrays(G, NODE_FEATURE_KEYS), int(self.label_of[wid]))
 
-        for src, dst, data in G.edges(data=True):
-            edges.append([node_idx[src], node_idx[dst]])
 
-            evt = data.get("event", None)
-            onehot = [1.0 if evt == e else 0.0 for e in EVENT_TYPES]
+class SentinelInMemoryDataset(InMemoryDataset):
+    """
+    Every window as tensors in one collated block: x / edge_index /
+    edge_attr of all graphs concatenated, with per-graph slice offsets.
 
-            edge_features.append(onehot)
+    Built once from SentinelGraphDataset and cached under
+    <labels dir>/processed/sentinel_<features>_<key>.pt. <features> hashes
+    the feature keys and the edge width, <key> hashes labels.csv and the
+    store (or JSON graph) files, so another model's feature list gets its
+    own cache and a rebuilt dataset replaces the stale one. Items are
+    slices of the block and `labels` is the y tensor - nothing is parsed
+    after the first run.
+    """
 
-        edge_index = torch.tensor(edges, dtype=torch.long).t().contiguous()
-        edge_attr = torch.tensor(edge_features, dtype=torch.float)
-
-        # -------- Label --------
-        y = torch.tensor(
-            [int(self.labels[self.labels.window_id == wid]["label"].values[0])],
-            dtype=torch.long
-        )
-
-        return Data(x=x, edge_index=edge_index, edge_attr=edge_attr, y=y)
+    def __init__(self, graphs_dir, labels_csv, store_dir=None, feature_keys=None):
+        self.graphs_dir = graphs_dir
+        self.labels_csv = labels_csv
+        self.store_dir = store_dir
+        self.feature_keys = list(feature_keys) if feature_keys is not None else None
+        self.features_key = hashlib.sha1(json.dumps(
+            [self.feature_keys, NUM_EDGE_FEATURES, GraphStore.FORMAT_VERSION]).encode()).hexdigest()[:8]
+        self.key = self.version_key()
+        super().__init__(os.path.dirname(os.path.abspath(labels_csv)))
+        self.load(self.processed_paths[0])
+
+    def version_key(self):
+        h = hashlib.sha1()
+        with open(self.labels_csv, "rb") as f:
+            h.update(f.read())
+        if GraphStore.exists(self.store_dir):
+            files = sorted(glob.glob(os.path.join(self.store_dir, "*")))
+        else:
+            files = sorted(glob.glob(os.path.join(self.graphs_dir, "window_*.json")))
+        for path in files:
+            st = os.stat(path)
+            h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()[:12]
+
+    @property
+    def raw_file_names(self):
+        return []
+
+    @property
+    def processed_file_names(self):
+        return [f"sentinel_{self.features_key}_{self.key}.pt"]
+
+    def process(self):
+        source = SentinelGraphDataset(self.graphs_dir, self.labels_csv, self.store_dir, self.feature_keys)
+        data_list = []
+        for i in range(len(source)):
+            data = source[i]
+            data.window_id = torch.tensor([source.valid[i]])
+            data_list.append(data)
+        self.save(data_list, self.processed_paths[0])
+
+        # caches of older builds, same feature list
+        for path in glob.glob(os.path.join(self.processed_dir, f"sentinel_{self.features_key}_*.pt")):
+            if path != self.processed_paths[0]:
+                os.remove(path)
+
+    @property
+    def labels(self):
+        """Label of every item (in index order), without building Data objects."""
+        return self._data.y[torch.as_tensor(list(self.indices()), dtype=torch.long)]
@@ -1,5 +1,8 @@
 # src/dataset/temporal_graph_dataset.py
 
+from collections import OrderedDict
+
+import numpy as np
 import torch
 from torch_geometric.data import Batch, Data
 
@@ -15,18 +18,66 @@ class TemporalGraphDataset(torch.utils.data.Dataset):
     def __len__(self):
         return len(self.sequences)
 
-    def __getitem__(self, idx):
-        seq_graphs, label = self.sequences[idx]
+    def sequence(self, idx):
+        """(list of Data, label) of one sequence."""
+        return self.sequences[idx]
 
-        # Convert list[Data] → list[Batch]
-        batched_graphs = []
-        for g in seq_graphs:
-            # Batch.from_data_list turns Data → Batch
-            batched_graphs.append(Batch.from_data_list([g]))
+    def __getitem__(self, idx):
+        seq_graphs, label = self.sequence(idx)
 
+        # graphs stay plain Data; the collate functions batch them
         label = torch.tensor([label], dtype=torch.long)
 
-        return batched_graphs, label
+        return list(seq_graphs), label
+
+
+class LazySequenceDataset(TemporalGraphDataset):
+    """
+    Overlapping sequences over the sorted windows of a SequenceExtractor,
+    without materializing them.
+
+    A sequence is only its start: item i covers windows
+    [i * stride, i * stride + seq_len). Window graphs are kept in a small
+    LRU (cache_size, default seq_len + stride), so consecutive sequences
+    share the Data of their overlapping windows, and memory stays at a
+    few windows over a whole epoch; store-backed graphs are views on the
+    mmap'd shards, so reloading an evicted window is cheap.
+    Labels (OR over the sequence) come from labels.csv, no graph loading.
+    """
+
+    def __init__(self, extractor, seq_len=None, stride=1, cache_size=None):
+        self.extractor = extractor
+        self.seq_len = seq_len or extractor.seq_len
+        self.stride = stride
+        self.window_ids = sorted(extractor.labels.window_id.tolist())
+        self.cache_size = cache_size or self.seq_len + stride
+        self.graphs = OrderedDict()   # window id -> Data, least recently used first
+
+        n = max(len(self.window_ids) - self.seq_len + 1, 0)
+        self.starts = np.arange(0, n, stride)
+
+        # any positive window in [start, start + seq_len)
+        pos = np.array([int(extractor.label_of[w]) > 0 for w in self.window_ids], dtype=np.int64)
+        cum = np.concatenate([[0], np.cumsum(pos)])
+        self.labels = ((cum[self.starts + self.seq_len] - cum[self.starts]) > 0).astype(np.int64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def graph(self, wid):
+        data = self.graphs.get(wid)
+        if data is None:
+            data = self.graphs[wid] = self.extractor.load_graph(wid)
+            if len(self.graphs) > self.cache_size:
+                self.graphs.popitem(last=False)
+        else:
+            self.graphs.move_to_end(wid)
+        return data
+
+    def sequence(self, idx):
+        start = self.starts[idx]
+        seq_ids = self.window_ids[start:start + self.seq_len]
+        return [self.graph(wid) for wid in seq_ids], int(self.labels[idx])
 
 
 def temporal_collate_fn(batch):
@@ -48,3 +99,23 @@ def temporal_collate_fn(batch):
         timestep_batches.append(Batch.from_data_list(graphs_t))
 
     return timestep_batches, labels
+
+
+def fused_collate_fn(batch):
+    """
+    Collate into ONE disjoint-union Batch holding every graph of every
+    timestep, sample-major (graph b * seq_len + t), so the encoder runs
+    once per batch. Graph-level `sample` / `step` give each graph's
+    (sample, timestep); TGNN pools straight into (batch, seq_len, hidden).
+    """
+
+    seq_len = len(batch[0][0])
+    batch_size = len(batch)
+
+    labels = torch.cat([item[1] for item in batch], dim=0)
+
+    graphs = Batch.from_data_list([g for item in batch for g in item[0]])
+    graphs.sample = torch.arange(batch_size).repeat_interleave(seq_len)
+    graphs.step = torch.arange(seq_len).repeat(batch_size)
+
+    return graphs, labels
@@ -0,0 +1,29 @@
+# src/models/edge_correction.py
+
+import torch.nn as nn
+from torch_geometric.utils import scatter
+
+
+class EdgeCorrection(nn.Module):
+    """
+    Adds per-edge correction vectors onto their source nodes in one
+    scatter (the models' projected edge features).
+
+    aggr:
+    - "sum"   x[src] += correction for every edge (the original loop)
+    - "mean"  sum divided by the node's out-degree
+    - "max"   element-wise max over the node's out-edges
+    Nodes without out-edges are left unchanged.
+    """
+
+    def __init__(self, aggr="sum"):
+        super().__init__()
+        if aggr not in ("sum", "mean", "max"):
+            raise ValueError(f"Unknown edge aggregation: {aggr}")
+        self.aggr = aggr
+
+    def forward(self, x, edge_index, correction):
+        src = edge_index[0]
+        if self.aggr == "sum":
+            return x.index_add(0, src, correction.to(x.dtype))
+        return x + scatter(correction.to(x.dtype), src, dim=0, dim_size=x.size(0), reduce=self.aggr)
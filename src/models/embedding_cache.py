@@ -0,0 +1,99 @@
+# src/models/embedding_cache.py
+
+import hashlib
+from collections import OrderedDict
+
+import torch
+from torch_geometric.data import Batch
+
+
+class WindowEmbeddingCache:
+    """
+    Per-window GraphSAGEEncoder embeddings for TGNN inference.
+
+    In eval mode a window's embedding does not depend on the sequence it
+    sits in, so overlapping sequences share it: each window is encoded
+    once and only the LSTM + attention + classifier run per sequence
+    (seq_len x less GNN work).
+
+    Entries are keyed by (model version, window id) in an LRU of at most
+    max_windows CPU tensors. The version hashes the encoder weights, so
+    a retrained or reloaded model never reads stale embeddings.
+    """
+
+    def __init__(self, model, max_windows=100_000, batch_size=64):
+        self.model = model
+        self.max_windows = max_windows
+        self.batch_size = batch_size
+        self.cache = OrderedDict()   # (version, window id) -> embedding
+        self.hits = 0
+        self.misses = 0
+
+    def version(self):
+        h = hashlib.sha1()
+        for name, tensor in self.model.encoder.state_dict().items():
+            h.update(name.encode())
+            h.update(tensor.detach().cpu().numpy().tobytes())
+        return h.hexdigest()[:12]
+
+    @torch.no_grad()
+    def embeddings(self, window_ids, graph_of, device=None):
+        """
+        (len(window_ids), hidden_dim) embeddings; graph_of(wid) gives the
+        Data of windows not cached yet, encoded batch_size at a time.
+        """
+        version = self.version()
+        out = [None] * len(window_ids)
+        todo = []
+        for i, wid in enumerate(window_ids):
+            emb = self.cache.get((version, wid))
+            if emb is None:
+                todo.append(i)
+            else:
+                self.cache.move_to_end((version, wid))
+                out[i] = emb
+        self.hits += len(window_ids) - len(todo)
+        self.misses += len(todo)
+
+        for k in range(0, len(todo), self.batch_size):
+            part = todo[k:k + self.batch_size]
+            batch = Batch.from_data_list([graph_of(window_ids[i]) for i in part])
+            if device is not None:
+                batch = batch.to(device)
+            emb = self.model.encoder(batch, num_graphs=batch.num_graphs).cpu()
+            for i, e in zip(part, emb):
+                out[i] = e
+                self.cache[(version, window_ids[i])] = e
+
+        while len(self.cache) > self.max_windows:
+            self.cache.popitem(last=False)
+
+        if not out:
+            return torch.zeros((0, self.model.lstm.input_size))
+        return torch.stack(out)
+
+    @torch.no_grad()
+    def predict(self, dataset, device=None, batch_size=256):
+        """
+        (logits, attention) of every sequence of a LazySequenceDataset:
+        windows are encoded once, sequences are sliding views over them.
+        """
+        seq_len = dataset.seq_len
+        used = dataset.window_ids[:int(dataset.starts[-1]) + seq_len] if len(dataset) else []
+        emb = self.embeddings(used, dataset.graph, device)
+
+        # (n_windows - seq_len + 1, seq_len, hidden_dim) views, one per start
+        windows = emb.unfold(0, seq_len, 1).transpose(1, 2)
+        starts = torch.as_tensor(dataset.starts, dtype=torch.long)
+
+        logits, attn = [], []
+        for k in range(0, len(starts), batch_size):
+            seq = windows[starts[k:k + batch_size]]
+            if device is not None:
+                seq = seq.to(device)
+            lg, at = self.model.classify(seq)
+            logits.append(lg.cpu())
+            attn.append(at.cpu())
+        if not logits:
+            return torch.zeros((0, self.model.classifier[-1].out_features)), torch.zeros((0, seq_len))
+        return torch.cat(logits), torch.cat(attn)
@@ -2,12 +2,21 @@ import torch
 import torch.nn as nn
 from torch_geometric.nn import SAGEConv, global_mean_pool
 
+from src.models.edge_correction import EdgeCorrection
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
+
 class GraphSAGE(nn.Module):
-    def __init__(self, in_channels=11, edge_channels=22, hidden_channels=64, num_classes=2):
+    # node features the model reads (the dataset / builder select these)
+    FEATURE_KEYS = FeatureEngineer.FEATURE_SETS["graphsage"]
+
+    def __init__(self, in_channels=11, edge_channels=NUM_EDGE_FEATURES, hidden_channels=64, num_classes=2,
+                 edge_aggr="sum"):
         super().__init__()
 
         # We will combine node and edge features before convolution
         self.fc_edge = nn.Linear(edge_channels, in_channels)
+        self.edge_correction = EdgeCorrection(edge_aggr)
 
         self.conv1 = SAGEConv(in_channels, hidden_channels)
         self.conv2 = SAGEConv(hidden_channels, hidden_channels)
@@ -28,11 +37,8 @@ class GraphSAGE(nn.Module):
         # convert each edge’s feature into a correction vector
         edge_correction = self.fc_edge(edge_attr)
 
-        # aggregate corrections onto nodes
-        # NOTE: simple scatter-add for now
-        x = x.clone()
-        for i, (src, dst) in enumerate(edge_index.t()):
-            x[src] += edge_correction[i]
+        # aggregate corrections onto their source nodes (one scatter-add)
+        x = self.edge_correction(x, edge_index, edge_correction)
 
         x = self.relu(self.conv1(x, edge_index))
         x = self.relu(self.conv2(x, edge_index))
@@ -2,20 +2,26 @@
 
 import torch
 import torch.nn as nn
+from torch_geometric.data import Batch
 from torch_geometric.nn import SAGEConv, global_mean_pool
 from src.explainability.temporal_attention import TemporalAttention
+from src.models.edge_correction import EdgeCorrection
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
 
 class GraphSAGEEncoder(nn.Module):
     """
     Encodes a single graph into a dense vector.
-    Correctly matches node features (18) + edge features (22).
+    Correctly matches node features (18) + edge features
+    (22 event-type shares + 4 repeat stats).
     """
-    def __init__(self, in_channels=18, edge_channels=22,
-                 hidden_channels=64, out_channels=128):
+    def __init__(self, in_channels=18, edge_channels=NUM_EDGE_FEATURES,
+                 hidden_channels=64, out_channels=128, edge_aggr="sum"):
         super().__init__()
 
-        # Correct: 22 → 18
+        # Correct: 26 → 18
         self.edge_fc = nn.Linear(edge_channels, in_channels)
+        self.edge_correction = EdgeCorrection(edge_aggr)
 
         self.conv1 = SAGEConv(in_channels, hidden_channels)
         self.conv2 = SAGEConv(hidden_channels, hidden_channels)
@@ -25,7 +31,7 @@ class GraphSAGEEncoder(nn.Module):
 
         self.project = nn.Linear(hidden_channels, out_channels)
 
-    def forward(self, data):
+    def forward(self, data, num_graphs=None):
         x, edge_index, edge_attr, batch = (
             data.x,
             data.edge_index,
@@ -36,15 +42,13 @@ class GraphSAGEEncoder(nn.Module):
         # Update edges into 18-d correction vector
         edge_update = self.edge_fc(edge_attr)  # shape: [num_edges, 18]
 
-        # Apply edge updates to nodes
-        x = x.clone()
-        for i, (src, dst) in enumerate(edge_index.t()):
-            x[src] += edge_update[i]  # both tensors now size 18
+        # Apply edge updates to their source nodes (one scatter-add)
+        x = self.edge_correction(x, edge_index, edge_update)
 
         x = self.relu(self.conv1(x, edge_index))
         x = self.relu(self.conv2(x, edge_index))
 
-        x = global_mean_pool(x, batch)
+        x = global_mean_pool(x, batch, size=num_graphs)
         x = self.project(x)
 
         return x
@@ -52,9 +56,12 @@ class GraphSAGEEncoder(nn.Module):
 
 
 class TGNN(nn.Module):
-    def __init__(self, node_features=18, edge_features=22,
+    # node features the model reads (all of them)
+    FEATURE_KEYS = FeatureEngineer.FEATURE_SETS["tgnn"]
+
+    def __init__(self, node_features=18, edge_features=NUM_EDGE_FEATURES,
                  gnn_hidden=64, lstm_hidden=128,
-                 lstm_layers=1, num_classes=2):
+                 lstm_layers=1, num_classes=2, edge_aggr="sum"):
         super().__init__()
 
         self.encoder = GraphSAGEEncoder(
@@ -62,6 +69,7 @@ class TGNN(nn.Module):
             edge_channels=edge_features,
             hidden_channels=gnn_hidden,
             out_channels=lstm_hidden,
+            edge_aggr=edge_aggr,
         )
 
         self.lstm = nn.LSTM(
@@ -81,14 +89,27 @@ class TGNN(nn.Module):
         )
 
     def forward(self, graph_sequence):
-        # Encode each graph in sequence
-        embeddings = []
-        for t in range(len(graph_sequence)):
-            emb_t = self.encoder(graph_sequence[t])
-            embeddings.append(emb_t)
-
-        seq = torch.stack(embeddings, dim=1)   # (batch, seq_len, hidden_dim)
-
+        if isinstance(graph_sequence, Batch):
+            # fused_collate_fn batch: one encoder pass over all timesteps
+            seq_len = int(graph_sequence.step.max()) + 1
+            emb = self.encoder(graph_sequence, num_graphs=graph_sequence.num_graphs)
+            seq = emb.view(-1, seq_len, emb.size(-1))   # (batch, seq_len, hidden_dim)
+        else:
+            # Encode each graph in sequence
+            embeddings = []
+            for t in range(len(graph_sequence)):
+                emb_t = self.encoder(graph_sequence[t])
+                embeddings.append(emb_t)
+
+            seq = torch.stack(embeddings, dim=1)   # (batch, seq_len, hidden_dim)
+
+        return self.classify(seq)
+
+    def classify(self, seq):
+        """
+        LSTM + temporal attention + classifier over window embeddings
+        (batch, seq_len, hidden_dim) -> (logits, attention weights).
+        """
         lstm_out, _ = self.lstm(seq)
 
         # 🔥 ADD TEMPORAL ATTENTION FOR EXPLAINABILITY
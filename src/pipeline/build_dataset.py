@@ -1,17 +1,84 @@
 # src/pipeline/build_dataset.py
 
+import json
+import os
 import pandas as pd
 from pathlib import Path
 
 from src.pipeline.event_loader import EventLoader
+from src.pipeline.multi_source_loader import MultiSourceLoader
+from src.pipeline.event_store import EventStore
+from src.pipeline.entity_dictionary import EntityDictionary
+from src.pipeline.entity_enricher import EntityEnricher
+from src.pipeline.entity_state import EntityStateStore
 from src.pipeline.window_generator import WindowGenerator
+from src.pipeline.ground_truth import GroundTruth
 from src.pipeline.graph_constructor import GraphConstructor
 from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.centrality import CentralityEngine
 from src.pipeline.graph_exporter import GraphExporter
+from src.pipeline.build_manifest import BuildManifest, code_version
+from src.pipeline.graph_store import GraphStore
+from src.pipeline.incremental_graph import IncrementalWindowGraph
+from src.pipeline.window_rollup import WindowRollup
+from src.pipeline.hub_compactor import HubCompactor
+from src.pipeline.multi_resolution_build import MultiResolutionBuild
+from src.pipeline.streaming_build import StreamingBuild
+from src.pipeline.worker_pool import pool_context, init_worker, run_job
 
 
 class DatasetBuilder:
-    def __init__(self):
+    """
+    Builds one graph JSON per 1-second window plus labels.csv.
+
+    - workers > 1 fans windows out to a process pool; the sorted event
+      frame is shared read-only with the workers
+    - window_id is the window's index in time order, so output is
+      identical whatever the number of workers
+    - each finished window is appended to build_progress.jsonl; with
+      resume=True an interrupted build skips the windows already done
+    - with incremental=True, manifest.json remembers each window's input
+      hash and code version, and only changed windows are rebuilt
+    - with stride_seconds < window_seconds, windows overlap and each run of
+      consecutive windows keeps one IncrementalWindowGraph that is slid
+      forward instead of rebuilding every window from its events; its
+      degree counters, and the centralities of an unchanged graph, are
+      reused as feature columns
+    - every graph is also packed into the binary GraphStore in store/,
+      which the training datasets read instead of the JSON files
+    - features (a FeatureEngineer.FEATURE_SETS name or list) limits the
+      node features computed to what the target model reads; a later build
+      asking for more only computes the missing ones and reuses the rest
+    - with compact_hubs=True, a HubCompactor fitted on the whole log
+      collapses the leaf fan-out of hub entities before features are
+      computed; labels.csv gains the per-window compaction statistics
+    - with entity_history=True, an EntityStateStore (SQLite next to the
+      entity dictionary) carries per-entity statistics across windows and
+      every node gets the hist_* features as of its window's start; the
+      store continues from the previous build when only later windows change
+    - labels come from a GroundTruth file (data/processed/ground_truth.csv
+      by default: start, end, host, technique per attack interval), applied
+      to all windows in one vectorized pass; labels.csv gains the attack
+      overlap fraction and one column per technique
+    - with resolutions (e.g. 1, 10, 60), a MultiResolutionBuild rolls the
+      finest tumbling windows up into every resolution in one pass
+    - with memory_budget_mb, a StreamingBuild never loads the log whole
+    - combinations no build path supports (see _check_options) raise
+      ValueError before anything is read
+    """
+
+    LABEL_COLUMNS = [
+        "window_id", "start", "end", "label", "num_nodes", "num_edges",
+        "centrality_mode", "centrality_error",
+    ]
+
+    def __init__(self, workers=1, resume=True, incremental=True,
+                 window_seconds=None, stride_seconds=None, sources=None,
+                 resolutions=None, features=None, compact_hubs=False,
+                 entity_history=False, ground_truth=None, memory_budget_mb=None):
+
+        self._check_options(window_seconds, stride_seconds, resolutions,
+                            compact_hubs, entity_history, memory_budget_mb)
 
         # FIXED: Correct events.csv path for your system
         self.events_path = Path("data/processed/events.csv")
@@ -24,74 +91,387 @@ class DatasetBuilder:
         self.graph_dir = self.output_dir / "graphs"
         self.graph_dir.mkdir(parents=True, exist_ok=True)
 
-        # Loader
-        self.loader = EventLoader(self.events_path)
+        self.workers = max(1, int(workers))
+        self.resume = resume
+        self.progress_path = self.output_dir / "build_progress.jsonl"
+        self.incremental = incremental
+        self.manifest = BuildManifest.open(self.output_dir / "manifest.json")
 
-        # Windows
-        self.windows = WindowGenerator(window_seconds=1)
-        self.windows.set_attack_period(
-            pd.to_datetime("2019-05-07 11:10:00"),
-            pd.to_datetime("2019-05-07 11:11:59")
+        # Stable UUID -> int id mapping shared by every window
+        suffix = "parquet" if EventStore.available() else "csv"
+        self.entities = EntityDictionary.open(
+            Path(f"data/processed/cache/entities.{suffix}"),
+            processed_dir=self.events_path.parent,
         )
 
+        # Attack intervals (default: the single 2019-05-07 engagement period)
+        self.truth = GroundTruth.load(ground_truth or self.events_path.parent / "ground_truth.csv")
+        self._labels = []  # per level: label record of every window, by window_id
+
+        # Typed attributes from subjects/files/network/registry, indexed by id
+        self.enricher = EntityEnricher.from_tables(self.events_path.parent, self.entities)
+
+        # Memory cap: rows per loader chunk follow from the budget
+        self.memory_budget_mb = memory_budget_mb
+        chunksize = StreamingBuild.chunksize(memory_budget_mb) if memory_budget_mb else 1_000_000
+        self.chunksize = chunksize
+
+        # Loader: one events.csv, or a k-way merge of many host exports
+        self.sources = sources
+        if sources:
+            self.loader = MultiSourceLoader(sources, chunksize=chunksize, entities=self.entities)
+        else:
+            self.loader = EventLoader(self.events_path, chunksize=chunksize, entities=self.entities)
+
+        # Windows (multi-resolution: tumbling windows at the finest resolution)
+        self.rollup = WindowRollup(resolutions) if resolutions else None
+        if self.rollup is not None:
+            window_seconds = self.rollup.resolutions[0]
+        self.windows = WindowGenerator(window_seconds or 1, stride_seconds)
+        self.windows.set_ground_truth(self.truth)
+
         # Graph builders
         self.graph_builder = GraphConstructor()
-        self.fe = FeatureEngineer()
-        self.exporter = GraphExporter(self.graph_dir)
+        self.compactor = HubCompactor() if compact_hubs else None
+        self.label_columns = self.LABEL_COLUMNS + self.truth.columns + (
+            HubCompactor.STAT_COLUMNS if self.compactor is not None else [])
+        self.fe = FeatureEngineer(keys=features)
+        self._cached = {}   # window_id -> (feature columns, graph meta) to reuse
+
+        # Cross-window entity history (single resolution only)
+        self.state = None
+        self._history = {}  # window_id -> hist_* by entity id, as of the window start
+        if entity_history:
+            self.state = EntityStateStore(Path("data/processed/cache/entity_state.sqlite"))
+            self.fe.keys = self.fe.resolve(self.fe.keys + FeatureEngineer.HISTORY_KEYS)
+        self.exporter = GraphExporter(self.graph_dir, formats=("json", "npz"))
+        self.store_dir = self.output_dir / "store"
+
+        # Output dir / exporter per resolution (level 0 = the usual output)
+        self.level_dirs = [self.output_dir]
+        if self.rollup is not None:
+            self.level_dirs += [self.output_dir / f"res_{r:g}s" for r in self.rollup.resolutions[1:]]
+        self.exporters = [self.exporter] + [
+            GraphExporter(d / "graphs", formats=("json", "npz")) for d in self.level_dirs[1:]
+        ]
+
+    @staticmethod
+    def _check_options(window_seconds, stride_seconds, resolutions,
+                       compact_hubs, entity_history, memory_budget_mb):
+        """
+        Reject flag combinations that no build path implements:
+
+        - the streaming build sees one chunk at a time, while hub compaction,
+          entity history and the roll-up need the whole log
+        - entity history is per window of a single resolution
+        - resolutions are tumbling windows; window_seconds, if given, must
+          be the finest resolution
+        """
+        if memory_budget_mb:
+            needs_log = [name for name, on in (("resolutions", resolutions),
+                                               ("compact_hubs", compact_hubs),
+                                               ("entity_history", entity_history)) if on]
+            if needs_log:
+                raise ValueError(f"memory_budget_mb (streaming build) does not support "
+                                 f"{', '.join(needs_log)}: they need the whole log")
+        if not resolutions:
+            return
+        if entity_history:
+            raise ValueError("entity_history is not supported with multiple resolutions")
+        if stride_seconds:
+            raise ValueError("stride_seconds is not supported with resolutions "
+                             "(every resolution is a tumbling window)")
+        finest = min(float(r) for r in resolutions)
+        if window_seconds and float(window_seconds) != finest:
+            raise ValueError(f"window_seconds={window_seconds:g} conflicts with the finest "
+                             f"resolution {finest:g}s")
+
+    # -----------------------------------------------------------
+    # One window
+    # -----------------------------------------------------------
+
+    def _process_window(self, window_id, ws, we, w, G=None, level=0, label=None, known=None):
+        """
+        Graph + features + export for one window -> label row (None if empty).
+        known: feature columns of G already at hand (e.g. sliding degrees).
+        """
+        if w is not None and w.empty:
+            return None
+
+        # Build raw graph (array form), unless maintained incrementally
+        if G is None:
+            G = self.graph_builder.build_window_graph(w)
+        if G.num_nodes == 0:
+            return None
+
+        # Collapse hub fan-out before the (hub-sensitive) features
+        if self.compactor is not None:
+            G = self.compactor.compact(G)
+
+        # Add features (batch mode), reusing a previous build's columns
+        keys, columns = None, None
+        if self.compactor is None and known:
+            columns = known
+        if level == 0 and window_id in self._cached:
+            cached, meta = self._cached[window_id]
+            G.graph.update(meta)
+            keys = set(self.fe.keys) | set(cached)
+            columns = {**(columns or {}), **cached}
+        self.fe.history = self._history.get(window_id) if level == 0 else None
+        G = self.fe.add_window_features(G, keys, columns)
+
+        # Entity attributes
+        G = self.enricher.enrich(G)
+
+        # Save
+        self.exporters[level].save(G, window_id)
+
+        row = {
+            "window_id": window_id,
+            "start": ws,
+            "end": we,
+            "num_nodes": G.num_nodes,
+            "num_edges": G.num_edges,
+            "centrality_mode": G.graph.get("centrality_mode"),
+            "centrality_error": G.graph.get("centrality_error"),
+            "features": [k for k in FeatureEngineer.NODE_KEYS + FeatureEngineer.HISTORY_KEYS
+                         if k in G.node_attrs],
+        }
+        row.update(label if label is not None else self._labels[level][window_id])
+        if self.compactor is not None:
+            row.update((k, G.graph[k]) for k in HubCompactor.STAT_COLUMNS)
+        return row
+
+    def _label_windows(self, starts, ends, hosts):
+        """Label records of windows (one vectorized GroundTruth pass)."""
+        labels = self.truth.label_windows(starts, ends, hosts)
+        print(f"🎯 {int(labels['label'].sum())} of {len(labels)} windows overlap "
+              f"{len(self.truth)} attack intervals")
+        return labels.to_dict("records")
+
+    # -----------------------------------------------------------
+    # Checkpointing
+    # -----------------------------------------------------------
+
+    def _load_progress(self):
+        """window start -> entry of windows finished by an interrupted run."""
+        done = {}
+        if not (self.resume and self.progress_path.exists()):
+            return done
 
+        with open(self.progress_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a killed run
+                done[entry["start"]] = entry
+        return done
+
+    def _checkpoint(self, f, entry):
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+
+    def _move_graphs(self, moves):
+        """Renumber reused graph files (old_id -> new_id) without clobbering."""
+        for old, new in moves:
+            for src, dst in zip(self.exporter.paths(old), self.exporter.paths(new)):
+                os.replace(src, f"{dst}.tmp")
+        for _, new in moves:
+            for dst in self.exporter.paths(new):
+                os.replace(f"{dst}.tmp", dst)
+
+    # -----------------------------------------------------------
+    # Build
+    # -----------------------------------------------------------
+
+    def _plan(self, events, tasks, version):
+        """
+        Split windows into reusable entries and windows to (re)build.
+        Returns (entries by start, todo tasks, input hash by window_id,
+        graph renames old_id -> new_id, stale graph ids).
+
+        Windows that are current but lack some requested features are
+        rebuilt; their existing feature columns are kept in self._cached.
+        With entity history, every window after the first one rebuilt needs
+        new hist_* features (its history changed) and is rebuilt that way.
+        """
+        previous = dict(self.manifest.entries) if self.incremental else {}
+        previous.update(self._load_progress())
+
+        row_hashes = BuildManifest.row_hashes(events)
+        entries, todo, hashes, moves = {}, [], {}, []
+
+        for task in tasks:
+            i, ws, we, a, b = task
+            key = str(ws)
+            h = BuildManifest.window_hash(row_hashes, a, b)
+            prev = previous.get(key)
+
+            reusable = self.manifest.is_current(prev, h, version) and (
+                prev.get("empty") or all(p.exists() for p in self.exporter.paths(prev["window_id"]))
+            )
+            has = prev.get("features", FeatureEngineer.NODE_KEYS) if reusable else []
+            if self.state is not None and todo:
+                has = [k for k in has if k not in FeatureEngineer.HISTORY_KEYS]
+            if reusable and not prev.get("empty") and not set(self.fe.keys) <= set(has):
+                columns = self.exporter.load_node_attrs(prev["window_id"], has)
+                meta = {k: prev[k] for k in ("centrality_mode", "centrality_error") if k in prev}
+                self._cached[i] = (columns, meta)
+                reusable = False
+            if not reusable:
+                todo.append(task)
+                hashes[i] = h
+                continue
+
+            entry = dict(prev, window_id=i)
+            if not entry.get("empty"):
+                entry.update(self._labels[0][i])
+                if prev["window_id"] != i:
+                    moves.append((prev["window_id"], i))
+            entries[key] = entry
+
+        # graph files of windows that no longer exist (or were renumbered away)
+        keep = {e["window_id"] for e in entries.values() if not e.get("empty")}
+        keep |= {t[0] for t in todo}
+        stale = {
+            e["window_id"] for e in previous.values()
+            if not e.get("empty") and e["window_id"] not in keep
+        } - {old for old, _ in moves}
+
+        return entries, todo, hashes, moves, stale
 
     def run(self):
-        print("📥 Loading events from:", self.events_path)
+        if self.memory_budget_mb:
+            return StreamingBuild(self).run()
+
+        print("📥 Loading events from:", self.sources or self.events_path)
         events = self.loader.load()
+        self.entities.save()
         print("✔ Loaded events:", len(events))
+        print("✔ Known entities:", len(self.entities))
 
-        windows = self.windows.generate_windows(events)
-        print("✔ Generated windows:", len(windows))
+        if self.compactor is not None:
+            self.compactor.fit(events)
+            print(f"🗜️  {len(self.compactor)} hub entities (degree >= {self.compactor.threshold:g})")
 
-        label_rows = []
-        count = 0
+        if self.rollup is not None:
+            return MultiResolutionBuild(self).run(events)
 
-        for i, (ws, we) in enumerate(windows):
+        # Single pass: events sorted once, each window is a row range
+        events, starts, lo, hi = self.windows.partition(events)
+        self._labels = [self._label_windows(
+            starts, starts + self.windows.window, GroundTruth.window_hosts(events, lo, hi))]
+        tasks = [
+            (i, ws, ws + self.windows.window, int(a), int(b))
+            for i, (ws, a, b) in enumerate(zip(starts, lo, hi))
+        ]
 
-            # FIXED: Correct timestamp filter
-            w = events[(events["timestamp"] >= ws) & (events["timestamp"] < we)]
+        # Incremental / resume: reuse windows whose inputs and code are unchanged
+        version = code_version()
+        if self.compactor is not None:
+            version += "+hubs-" + self.compactor.signature()
+        entries, todo, hashes, moves, stale = self._plan(events, tasks, version)
+        if entries:
+            print(f"♻️  {len(entries)} windows unchanged, {len(todo)} to build")
+        if self._cached:
+            print(f"♻️  {len(self._cached)} windows only need new features")
 
-            if w.empty:
-                # Debug print
-                print(f"⚠️  Empty window {i}, skipping")
-                continue
+        self._move_graphs(moves)
+        for window_id in stale:
+            for path in self.exporter.paths(window_id):
+                path.unlink(missing_ok=True)
+        self.manifest.save(entries, version)
 
-            # Build raw graph
-            G = self.graph_builder.build_graph(w)
+        if self.state is not None:
+            self._history = self.state.snapshots(events, todo)
+            print(f"🕰️  Entity history: {len(self.state)} entities as of {self.state.as_of}")
 
-            if len(G.nodes) == 0:
-                print(f"⚠️  Empty graph for window {i}, skipping")
-                continue
+        with open(self.progress_path, "w") as progress:
+            for window_id, ws, row in self._run_tasks(events, todo):
+                if row is None:
+                    row = {"window_id": window_id, "start": ws, "empty": True}
+                    print(f"⚠️  Empty graph for window {window_id}, skipping")
+                else:
+                    print(f"✔ Graph {window_id} saved ({row['num_nodes']} nodes, {row['num_edges']} edges)")
 
-            # Add features
-            G = self.fe.compute_node_features(G)
+                entry = dict(row, start=str(row["start"]),
+                             input_hash=hashes[window_id], code_version=version)
+                if "end" in entry:
+                    entry["end"] = str(entry["end"])
+                entries[entry["start"]] = entry
+                self._checkpoint(progress, entry)
 
-            # Save
-            self.exporter.save(G, count)
+        # Save labels (deterministic window_id order)
+        label_rows = sorted(
+            (e for e in entries.values() if not e.get("empty")),
+            key=lambda e: e["window_id"],
+        )
+        labels = pd.DataFrame(label_rows, columns=self.label_columns)
+        labels.to_csv(self.output_dir / "labels.csv", index=False)
+        if self.compactor is not None:
+            removed = labels["hub_edges_removed"].sum()
+            total = removed + labels["num_edges"].sum()
+            print(f"🗜️  Hub compaction removed {removed} of {total} edges ({removed / max(total, 1):.1%})")
 
-            label_rows.append({
-                "window_id": count,
-                "start": ws,
-                "end": we,
-                "label": self.windows.label_window(ws, we),
-                "num_nodes": len(G.nodes),
-                "num_edges": len(G.edges)
-            })
+        # Pack every window into the binary store used by the datasets;
+        # reused windows may carry more features than this build computes
+        features = set(self.fe.keys).union(*(
+            e.get("features", FeatureEngineer.NODE_KEYS) for e in label_rows))
+        for e in label_rows:
+            features.intersection_update(e.get("features", FeatureEngineer.NODE_KEYS))
+        self._write_store(self.exporter, self.store_dir, labels, features)
 
-            print(f"✔ Graph {count} saved ({len(G.nodes)} nodes, {len(G.edges)} edges)")
+        # Build complete: the manifest now covers every window
+        self.manifest.save(entries, version)
+        self.progress_path.unlink()
 
-            count += 1
+        print(f"\n🎉 Dataset ready!")
+        print(f"Total graphs created: {len(label_rows)}")
 
-        # Save labels
-        pd.DataFrame(label_rows).to_csv(self.output_dir / "labels.csv", index=False)
+    def _write_store(self, exporter, store_dir, labels, features=None):
+        """Pack the labelled windows; meta lists the features they all have."""
+        GraphStore.write(store_dir, (
+            (wid, exporter.load_arrays(wid)) for wid in labels["window_id"]
+        ), features=self.fe.keys if features is None else features)
+        print("✔ Graph store:", store_dir)
 
-        print(f"\n🎉 Dataset ready!")
-        print(f"Total graphs created: {count}")
+    def _process_run(self, events, run):
+        """Yield (window_id, ws, label_row) for a run of consecutive windows."""
+        inc = IncrementalWindowGraph(self.windows.stride) if self.windows.sliding else None
+
+        for window_id, ws, we, a, b in run:
+            w = events.iloc[a:b]
+            if inc is None:
+                yield window_id, ws, self._process_window(window_id, ws, we, w)
+                continue
+
+            G = inc.slide_to(events, a, b).to_window_graph()
+            row = self._process_window(window_id, ws, we, w, G, known=inc.node_columns(G))
+            if row is not None and self.compactor is None:
+                inc.keep(G, CentralityEngine.KEYS)
+            yield window_id, ws, row
+
+    def _run_tasks(self, events, tasks, method="_process_run", target=None):
+        """
+        Yield target.method's results (e.g. (window_id, ws, label_row)) as
+        windows complete; target defaults to the builder.
+        """
+        target = self if target is None else target
+        if self.workers == 1 or len(tasks) < 2:
+            yield from getattr(target, method)(events, tasks)
+            return
+
+        # runs of consecutive windows (sliding windows reuse state within a run)
+        size = max(1, min(64, len(tasks) // (self.workers * 8)))
+        runs = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+        print(f"🧵 Building {len(tasks)} windows with {self.workers} workers")
+        with pool_context().Pool(self.workers, initializer=init_worker,
+                                 initargs=(target, events)) as pool:
+            jobs = [(method, run) for run in runs]
+            for results in pool.imap_unordered(run_job, jobs):
+                yield from results
 
 
 # -----------------------------------------------------------
@@ -99,5 +479,16 @@ class DatasetBuilder:
 # -----------------------------------------------------------
 
 if __name__ == "__main__":
-    builder = DatasetBuilder()
+    builder = DatasetBuilder(
+        workers=int(os.environ.get("SENTINEL_WORKERS", 1)),
+        window_seconds=float(os.environ.get("SENTINEL_WINDOW", 0)) or None,
+        stride_seconds=float(os.environ.get("SENTINEL_STRIDE", 0)) or None,
+        sources=os.environ.get("SENTINEL_SOURCES"),
+        resolutions=[float(r) for r in os.environ.get("SENTINEL_RESOLUTIONS", "").split(",") if r],
+        features=os.environ.get("SENTINEL_FEATURES"),
+        compact_hubs=os.environ.get("SENTINEL_COMPACT_HUBS", "0") == "1",
+        entity_history=os.environ.get("SENTINEL_HISTORY", "0") == "1",
+        ground_truth=os.environ.get("SENTINEL_GROUND_TRUTH"),
+        memory_budget_mb=float(os.environ.get("SENTINEL_MEMORY_MB", 0)) or None,
+    )
     builder.run()
@@ -0,0 +1,93 @@
+# src/pipeline/build_manifest.py
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Modules whose source defines what a window graph / its features look like.
+# Editing any of them changes the code version and invalidates every window.
+CODE_MODULES = [
+    "window_graph.py",
+    "incremental_graph.py",
+    "graph_constructor.py",
+    "centrality.py",
+    "feature_engineer.py",
+    "graph_exporter.py",
+    "graph_store.py",
+    "entity_enricher.py",
+    "hub_compactor.py",
+    "entity_state.py",
+]
+
+# Columns that make up a window's input
+HASH_COLUMNS = ["timestamp", "type", "subject", "predicate_object"]
+
+
+def code_version(modules=CODE_MODULES):
+    """Short SHA-1 over the source of the graph/feature modules."""
+    here = Path(__file__).parent
+    h = hashlib.sha1()
+    for name in modules:
+        h.update(name.encode())
+        h.update((here / name).read_bytes())
+    return h.hexdigest()[:12]
+
+
+class BuildManifest:
+    """
+    Record of the last completed dataset build, keyed by window start.
+
+    Each entry holds the window's label row plus:
+    - input_hash    hash of the window's events (timestamp, type, UUIDs)
+    - code_version  hash of the graph / feature code that produced it
+
+    A window only needs rebuilding when either hash differs.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+
+    @classmethod
+    def open(cls, path):
+        m = cls(path)
+        if m.path.exists():
+            with open(m.path) as f:
+                m.entries = json.load(f)["windows"]
+        return m
+
+    def save(self, entries, version):
+        entries = dict(sorted(entries.items(), key=lambda kv: kv[1]["window_id"]))
+        self.entries = entries
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"code_version": version, "windows": entries}, f)
+        os.replace(tmp, self.path)
+
+    # -----------------------------------------------------------
+    # Hashing
+    # -----------------------------------------------------------
+
+    @staticmethod
+    def row_hashes(events):
+        """One uint64 per event row (computed once for the whole frame)."""
+        cols = [c for c in HASH_COLUMNS if c in events.columns]
+        # categoricals hash by value, so category order doesn't matter
+        return pd.util.hash_pandas_object(events[cols], index=False).to_numpy()
+
+    @staticmethod
+    def window_hash(row_hashes, a, b):
+        """Hash of the window covering rows a:b."""
+        return hashlib.blake2b(
+            np.ascontiguousarray(row_hashes[a:b]).tobytes(), digest_size=16
+        ).hexdigest()
+
+    def is_current(self, entry, input_hash, version):
+        return (
+            entry is not None
+            and entry.get("input_hash") == input_hash
+            and entry.get("code_version") == version
+        )
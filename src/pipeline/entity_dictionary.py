@@ -0,0 +1,166 @@
+# src/pipeline/entity_dictionary.py
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.uuid_codec import uuid_literals_to_hex
+
+
+class EntityDictionary:
+    """
+    Interns CDM UUIDs (hex strings) into dense, stable int32 ids.
+
+    Row i of `table` describes entity id i:
+    - uuid         32-char hex
+    - kind         subject / file / netflow / registry / unknown
+    - entity_type  e.g. SUBJECT_PROCESS, FILE_OBJECT_FILE (if known)
+    - source       CDM source tag (if known)
+
+    The dictionary is persisted, so ids survive across runs and windows and
+    can be used for temporal tracking of the same entity.
+
+    intern() runs once per streamed chunk, so it never copies the whole
+    dictionary: new UUIDs are kept as blocks until `table` is read, and the
+    lookup index is a few hash indexes of roughly halving size (merged like
+    a binary counter, so each UUID is re-indexed O(log n) times in total).
+    """
+
+    KINDS = ["unknown", "subject", "file", "netflow", "registry"]
+
+    # kind -> (table file, column holding the entity type)
+    TABLES = {
+        "subject": ("subjects.csv", "type"),
+        "file": ("files.csv", "file_type"),
+        "netflow": ("network.csv", None),
+        "registry": ("registry.csv", None),
+    }
+
+    COLUMNS = ["uuid", "kind", "entity_type", "source"]
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.table = pd.DataFrame({c: pd.Series(dtype=object) for c in self.COLUMNS})
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def table(self):
+        """One row per id (new UUIDs appended on first access since intern())."""
+        if self._fresh:
+            rows = pd.DataFrame({
+                "uuid": np.concatenate(self._fresh),
+                "kind": "unknown",
+                "entity_type": None,
+                "source": None,
+            }, dtype=object)
+            self._table = pd.concat([self._table, rows], ignore_index=True)
+            self._fresh = []
+        return self._table
+
+    @table.setter
+    def table(self, df):
+        self._table = df
+        self._fresh = []       # uuid arrays interned after _table
+        self._size = len(df)
+        self._blocks = [(0, pd.Index(df["uuid"], dtype=object))] if len(df) else []
+
+    @classmethod
+    def open(cls, path, processed_dir=None):
+        """Load a saved dictionary, or create one seeded from the entity tables."""
+        d = cls(path)
+        if d.path.exists():
+            if d.path.suffix == ".parquet":
+                d.table = pd.read_parquet(d.path)
+            else:
+                d.table = pd.read_csv(d.path, dtype=object)
+            d.table = d.table[cls.COLUMNS].astype(object)
+        elif processed_dir is not None:
+            d.add_tables(processed_dir)
+        return d
+
+    def save(self, path=None):
+        path = Path(path) if path else self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".parquet":
+            self.table.to_parquet(path, index=False)
+        else:
+            self.table.to_csv(path, index=False)
+
+    # -----------------------------------------------------------
+    # Interning
+    # -----------------------------------------------------------
+
+    def lookup(self, uuids):
+        """hex UUIDs -> int32 ids (-1 for unknown or missing)."""
+        values = np.asarray(uuids, dtype=object)
+        ids = np.full(len(values), -1, dtype=np.int32)
+        todo = np.arange(len(values))
+        for offset, index in self._blocks:
+            if not len(todo):
+                break
+            pos = index.get_indexer(values[todo])
+            hit = pos >= 0
+            ids[todo[hit]] = offset + pos[hit]
+            todo = todo[~hit]
+        return ids
+
+    def intern(self, uuids):
+        """hex UUIDs -> int32 ids, adding unseen UUIDs. Missing cells -> -1."""
+        values = np.asarray(uuids, dtype=object)
+        ids = self.lookup(values)
+
+        new = (ids < 0) & ~pd.isna(values)
+        if new.any():
+            fresh = pd.unique(values[new])
+            block = pd.Index(fresh, dtype=object)
+            start = self._size
+            ids[new] = start + block.get_indexer(values[new])
+
+            self._fresh.append(fresh)
+            self._size += len(fresh)
+            self._blocks.append((start, block))
+            while len(self._blocks) > 1 and len(self._blocks[-1][1]) >= len(self._blocks[-2][1]):
+                (offset, older), (_, newer) = self._blocks[-2:]
+                self._blocks[-2:] = [(offset, older.append(newer))]
+
+        return ids
+
+    def uuids(self, ids):
+        """int ids -> hex UUIDs."""
+        return self.table["uuid"].to_numpy()[np.asarray(ids)]
+
+    def kind_codes(self, ids):
+        """int ids -> int8 index into KINDS."""
+        codes = pd.Categorical(self.table["kind"], categories=self.KINDS).codes
+        return codes.astype(np.int8)[np.asarray(ids)]
+
+    # -----------------------------------------------------------
+    # Entity tables
+    # -----------------------------------------------------------
+
+    def add_tables(self, processed_dir):
+        """Intern every UUID in subjects/files/network/registry and join kind/type/source."""
+        processed_dir = Path(processed_dir)
+
+        for kind, (fname, type_col) in self.TABLES.items():
+            path = processed_dir / fname
+            if not path.exists():
+                continue
+
+            df = pd.read_csv(path, dtype=object)
+            uuids = uuid_literals_to_hex(df["uuid"])
+            ids = self.intern(uuids)
+            keep = ids >= 0
+
+            pos = ids[keep]
+            self.table.loc[pos, "kind"] = kind
+            if type_col is not None and type_col in df:
+                self.table.loc[pos, "entity_type"] = df[type_col].to_numpy(object)[keep]
+            elif type_col is None:
+                self.table.loc[pos, "entity_type"] = kind.upper()
+            if "source" in df:
+                self.table.loc[pos, "source"] = df["source"].to_numpy(object)[keep]
+
+        return self
@@ -0,0 +1,122 @@
+# src/pipeline/entity_enricher.py
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.uuid_codec import uuid_literals_to_hex
+
+
+class EntityEnricher:
+    """
+    Attaches typed entity attributes to graph nodes with one vectorized gather.
+
+    The entity tables are read once and scattered into dense columns indexed
+    by EntityDictionary id (the dictionary is the hash index), so enriching a
+    window is `column[node_ids]` - no per-node DataFrame filtering. Each
+    column has one extra trailing row holding the "missing" value, used for
+    ids interned after the tables were loaded.
+
+    Node attributes added by enrich():
+    - node_kind      int8 index into EntityDictionary.KINDS
+    - subject_type, cid, parent_id, cmd_line            (subjects.csv)
+    - file_type                                          (files.csv)
+    - local_port, remote_address, remote_port, ip_protocol  (network.csv)
+    - registry_key                                       (registry.csv)
+    """
+
+    # kind -> (table file, {table column: (node attribute, dtype)})
+    ATTRIBUTES = {
+        "subject": ("subjects.csv", {
+            "type": ("subject_type", "str"),
+            "cid": ("cid", "int"),
+            "parent_subject": ("parent_id", "uuid"),
+            "cmd_line": ("cmd_line", "str"),
+        }),
+        "file": ("files.csv", {
+            "file_type": ("file_type", "str"),
+        }),
+        "netflow": ("network.csv", {
+            "local_port": ("local_port", "int"),
+            "remote_address": ("remote_address", "str"),
+            "remote_port": ("remote_port", "int"),
+            "ip_protocol": ("ip_protocol", "int"),
+        }),
+        "registry": ("registry.csv", {
+            "key": ("registry_key", "str"),
+        }),
+    }
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.columns = {}   # node attribute -> dense array by entity id
+        self.kind = np.zeros(1, dtype=np.int8)
+        self.dtypes = {}
+        for _, spec in self.ATTRIBUTES.values():
+            for attr, dtype in spec.values():
+                self.dtypes[attr] = dtype
+
+    @classmethod
+    def from_tables(cls, processed_dir, entities):
+        """Read the entity tables once and build the per-id columns."""
+        e = cls(entities)
+        processed_dir = Path(processed_dir)
+
+        loaded = []
+        for kind, (fname, spec) in cls.ATTRIBUTES.items():
+            path = processed_dir / fname
+            if not path.exists():
+                continue
+            cols = ["uuid"] + list(spec)
+            df = pd.read_csv(path, usecols=lambda c: c in cols, dtype=object)
+            ids = entities.intern(uuid_literals_to_hex(df["uuid"]))
+            loaded.append((kind, df, ids, spec))
+
+        # size after interning every table, plus the trailing "missing" row
+        n = len(entities)
+        for attr, dtype in e.dtypes.items():
+            if dtype == "str":
+                e.columns[attr] = np.full(n + 1, None, dtype=object)
+            else:
+                e.columns[attr] = np.full(n + 1, -1, dtype=np.int64)
+        e.kind = np.zeros(n + 1, dtype=np.int8)
+
+        for kind, df, ids, spec in loaded:
+            keep = ids >= 0
+            e.kind[ids[keep]] = entities.KINDS.index(kind)
+            for col, (attr, dtype) in spec.items():
+                if col not in df:
+                    continue
+                values = df[col]
+                if dtype == "int":
+                    values = pd.to_numeric(values, errors="coerce").fillna(-1).astype(np.int64)
+                elif dtype == "uuid":
+                    values = pd.Series(entities.lookup(uuid_literals_to_hex(values))).astype(np.int64)
+                else:
+                    values = values.where(values.notna(), None)
+                e.columns[attr][ids[keep]] = values.to_numpy()[keep]
+
+        return e
+
+    # -----------------------------------------------------------
+    # Join
+    # -----------------------------------------------------------
+
+    def attributes(self, ids):
+        """Entity ids -> {attribute: array} (unknown / new ids get defaults)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        missing = len(self.kind) - 1
+        rows = np.where((ids >= 0) & (ids < missing), ids, missing)
+
+        out = {"node_kind": self.kind[rows]}
+        for attr, col in self.columns.items():
+            out[attr] = col[rows]
+        return out
+
+    def enrich(self, wg):
+        """Add entity attributes to a WindowGraph's node_attrs (in place)."""
+        ids = wg.node_ids
+        if ids is None:
+            ids = self.entities.lookup(wg.node_keys)
+        wg.node_attrs.update(self.attributes(ids))
+        return wg
@@ -0,0 +1,277 @@
+# src/pipeline/entity_state.py
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.window_graph import EVENT_TYPES
+
+
+class EntityStateStore:
+    """
+    Running per-entity statistics across windows: SQLite on disk, with an
+    in-memory LRU of the most recently touched entities in front of it.
+
+    State per entity id (one fixed-size record, STATE):
+    - first_ts, last_ts   int64 ns of the first / last event seen
+    - n                   events seen (as subject or object)
+    - type_counts         int64 [len(EVENT_TYPES)] events per type
+    - gap_n, gap_mean, gap_m2   Welford accumulators of inter-event gaps (s)
+
+    ingest() folds time-ordered events in. A chunk is first reduced per
+    entity with sorts / bincounts, then merged into the stored records with
+    Chan's parallel update, so each event costs O(1) and old events are
+    never re-read. history() turns the records into the HISTORY_KEYS node
+    features, as of a given time.
+
+    `as_of` (persisted) marks how far the state goes: every event strictly
+    before it has been folded in, none after it.
+    """
+
+    HISTORY_KEYS = [
+        "hist_event_count", "hist_type_count", "hist_age",
+        "hist_since_last", "hist_gap_mean", "hist_gap_std",
+    ]
+
+    STATE = np.dtype([
+        ("first_ts", np.int64), ("last_ts", np.int64), ("n", np.int64),
+        ("gap_n", np.int64), ("gap_mean", np.float64), ("gap_m2", np.float64),
+        ("type_counts", np.int64, (len(EVENT_TYPES),)),
+    ])
+
+    def __init__(self, path, cache_size=100_000):
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()   # entity id -> STATE record, LRU order
+        self.dirty = set()
+        self.as_of = None
+        self._db = None
+        self._connect()
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS state (entity_id INTEGER PRIMARY KEY, record BLOB)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'as_of'").fetchone()
+        self.as_of = pd.Timestamp(int(row[0])) if row else None
+
+    def __getstate__(self):
+        # pool workers only read snapshots; the connection stays in the parent
+        state = dict(self.__dict__, _db=None, cache=OrderedDict(), dirty=set())
+        return state
+
+    def __len__(self):
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM state").fetchone()[0]
+
+    # -----------------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------------
+
+    def reset(self):
+        """Forget every entity (e.g. when earlier events changed)."""
+        self.cache.clear()
+        self.dirty.clear()
+        self.as_of = None
+        self._db.execute("DELETE FROM state")
+        self._db.execute("DELETE FROM meta")
+        self._db.commit()
+
+    def flush(self):
+        """Write dirty records and as_of to SQLite."""
+        self._write([eid for eid in self.dirty if eid in self.cache])
+        if self.as_of is not None:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('as_of', ?)", (str(self.as_of.value),))
+        self._db.commit()
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def _write(self, ids):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO state VALUES (?, ?)",
+            ((eid, self.cache[eid].tobytes()) for eid in ids),
+        )
+        self.dirty.difference_update(ids)
+
+    def _read(self, ids, batch=500):
+        """entity id -> record for the ids present in SQLite."""
+        found = {}
+        for i in range(0, len(ids), batch):
+            part = ids[i:i + batch]
+            rows = self._db.execute(
+                f"SELECT entity_id, record FROM state WHERE entity_id IN ({','.join('?' * len(part))})",
+                part,
+            ).fetchall()
+            for eid, blob in rows:
+                found[eid] = np.frombuffer(blob, self.STATE)[0].copy()
+        return found
+
+    def _gather(self, ids):
+        """Records for ids (zeros for unseen entities): LRU first, then SQLite."""
+        out = np.zeros(len(ids), self.STATE)
+        missing = {}
+        for j, eid in enumerate(ids.tolist()):
+            rec = self.cache.get(eid)
+            if rec is None:
+                missing[eid] = j
+            else:
+                self.cache.move_to_end(eid)
+                out[j] = rec
+        for eid, rec in self._read(list(missing)).items():
+            out[missing[eid]] = rec
+        return out
+
+    def _scatter(self, ids, records):
+        for eid, rec in zip(ids.tolist(), records):
+            self.cache[eid] = rec.copy()
+            self.cache.move_to_end(eid)
+            self.dirty.add(eid)
+
+        # evict least recently used, writing back what changed
+        overflow = len(self.cache) - self.cache_size
+        if overflow > 0:
+            old = [eid for eid, _ in zip(self.cache, range(overflow))]
+            self._write([eid for eid in old if eid in self.dirty])
+            for eid in old:
+                del self.cache[eid]
+
+    # -----------------------------------------------------------
+    # Updates
+    # -----------------------------------------------------------
+
+    def ingest(self, events, until=None):
+        """
+        Fold time-ordered events (with subject_id / object_id) into the
+        state; `until` (a Timestamp, default just past the last event)
+        becomes the new as_of.
+        """
+        if until is None and len(events):
+            until = events["timestamp"].iloc[-1] + pd.Timedelta(1, "ns")
+        if len(events):
+            self._ingest(*_appearances(events))
+        if until is not None:
+            self.as_of = pd.Timestamp(until)
+
+    def _ingest(self, ids, ts, evt):
+        order = np.lexsort((ts, ids))
+        ids, ts, evt = ids[order], ts[order], evt[order]
+        uniq, starts, cnt = np.unique(ids, return_index=True, return_counts=True)
+        k = len(uniq)
+        seg = np.repeat(np.arange(k), cnt)
+
+        first = ts[starts]
+        last = ts[starts + cnt - 1]
+
+        # gaps inside the chunk (seconds), reduced per entity
+        same = seg[1:] == seg[:-1]
+        gaps = (np.diff(ts)[same]) / 1e9
+        g_seg = seg[1:][same]
+        c_n = cnt - 1
+        c_mean = np.bincount(g_seg, weights=gaps, minlength=k) / np.maximum(c_n, 1)
+        c_m2 = np.bincount(g_seg, weights=(gaps - c_mean[g_seg]) ** 2, minlength=k)
+
+        known = evt >= 0
+        n_types = len(EVENT_TYPES)
+        counts = np.bincount(seg[known] * n_types + evt[known], minlength=k * n_types)
+
+        state = self._gather(uniq)
+        seen = state["n"] > 0
+
+        # the gap bridging the previous chunk, then the chunk's own gaps
+        bridge = np.where(seen, (first - state["last_ts"]) / 1e9, 0.0)
+        n, mean, m2 = _chan(state["gap_n"], state["gap_mean"], state["gap_m2"],
+                            seen.astype(np.int64), bridge, 0.0)
+        state["gap_n"], state["gap_mean"], state["gap_m2"] = _chan(n, mean, m2, c_n, c_mean, c_m2)
+
+        state["first_ts"] = np.where(seen, state["first_ts"], first)
+        state["last_ts"] = last
+        state["n"] += cnt
+        state["type_counts"] += counts.reshape(k, n_types)
+        self._scatter(uniq, state)
+
+    # -----------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------
+
+    def history(self, ids, as_of=None):
+        """
+        HISTORY_KEYS for entity ids as of a time (default self.as_of) ->
+        DataFrame indexed by entity id. Unseen entities get zeros.
+        """
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        ids = ids[ids >= 0]
+        state = self._gather(ids)
+        seen = state["n"] > 0
+        now = pd.Timestamp(as_of if as_of is not None else self.as_of).value
+
+        since = lambda t: np.where(seen, (now - t) / 1e9, 0.0)
+        return pd.DataFrame({
+            "hist_event_count": state["n"].astype(np.float64),
+            "hist_type_count": (state["type_counts"] > 0).sum(axis=1).astype(np.float64),
+            "hist_age": since(state["first_ts"]),
+            "hist_since_last": since(state["last_ts"]),
+            "hist_gap_mean": state["gap_mean"],
+            "hist_gap_std": np.sqrt(state["gap_m2"] / np.maximum(state["gap_n"], 1)),
+        }, index=pd.Index(ids, name="entity_id"))
+
+    def snapshots(self, events, tasks):
+        """
+        {window_id: history() of the window's entities as of its start} for
+        (window_id, ws, we, lo, hi) tasks over time-sorted events. Continues
+        from the stored state when it does not go past the first window,
+        otherwise replays from the beginning.
+        """
+        tasks = sorted(tasks, key=lambda t: t[1])
+        if not tasks:
+            return {}
+
+        ts = events["timestamp"].to_numpy()
+        if self.as_of is None or self.as_of > tasks[0][1]:
+            self.reset()
+            cursor = 0
+        else:
+            cursor = int(np.searchsorted(ts, self.as_of.to_datetime64(), side="left"))
+
+        out = {}
+        for window_id, ws, _, a, b in tasks:
+            stop = int(np.searchsorted(ts, ws.to_datetime64(), side="left"))
+            self.ingest(events.iloc[cursor:stop], until=ws)
+            cursor = max(cursor, stop)
+
+            w = events.iloc[a:b]
+            out[window_id] = self.history(
+                np.concatenate([w["subject_id"].to_numpy(), w["object_id"].to_numpy()]), ws)
+
+        self.flush()
+        return out
+
+
+def _appearances(events):
+    """(entity id, ns timestamp, event code) of every subject / object appearance."""
+    if "subject_id" not in events.columns:
+        raise ValueError("EntityStateStore needs subject_id / object_id (load with an EntityDictionary)")
+
+    subj = events["subject_id"].to_numpy().astype(np.int64)
+    obj = events["object_id"].to_numpy().astype(np.int64)
+    ts = events["timestamp"].to_numpy().astype("datetime64[ns]").view(np.int64)
+    evt = pd.Categorical(events["type"].to_numpy(dtype=object), categories=EVENT_TYPES).codes.astype(np.int64)
+
+    has_obj = obj >= 0
+    return (
+        np.concatenate([subj, obj[has_obj]]),
+        np.concatenate([ts, ts[has_obj]]),
+        np.concatenate([evt, evt[has_obj]]),
+    )
+
+
+def _chan(na, ma, m2a, nb, mb, m2b):
+    """Chan et al. merge of two (count, mean, M2) accumulators."""
+    n = na + nb
+    delta = mb - ma
+    w = nb / np.maximum(n, 1)
+    return n, ma + delta * w, m2a + m2b + delta ** 2 * na * w
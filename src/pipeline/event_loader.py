@@ -1,11 +1,21 @@
 # src/pipeline/event_loader.py
 import pandas as pd
+import numpy as np
 import ast
 
+from src.pipeline.uuid_codec import decode_uuid_literals, uuid_bytes_to_hex
+
 class EventLoader:
     """
     Loads raw CDM events, cleans UUIDs, filters usable event types.
     Clean, modular, reusable across offline + real-time pipelines.
+
+    load()        -> whole file as one DataFrame
+    iter_chunks() -> bounded-size, timestamp-ordered chunks (multi-GB exports)
+
+    With use_cache (default), both read through the columnar EventStore,
+    so only the first run pays for CSV parsing. Given an EntityDictionary,
+    events also get int32 `subject_id` / `object_id` columns.
     """
 
     EXPANDED_EVENTS = {
@@ -17,13 +27,27 @@ class EventLoader:
         "EVENT_SERVICEINSTALL"
     }
 
-    def __init__(self, path):
+    # Columns the downstream pipeline actually uses (streaming mode)
+    EVENT_COLUMNS = ["timestamp", "type", "subject", "predicate_object"]
+
+    def __init__(self, path, chunksize=1_000_000, reorder_slack="1s",
+                 use_cache=True, cache_dir=None, entities=None):
         self.path = path
         self.data = None
+        self.entities = entities
+
+        # columnar cache (falls back to CSV parsing without pyarrow)
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+
+        # streaming mode: rows per CSV chunk, and how far out of order
+        # timestamps may arrive in the export before we emit them
+        self.chunksize = chunksize
+        self.reorder_slack = pd.Timedelta(reorder_slack)
 
     def _clean_uuid(self, x):
         """Convert b'..' to hex; ensure string form for graph nodes."""
-        if isinstance(x, str) and x.startswith("b'"):
+        if isinstance(x, str) and (x.startswith("b'") or x.startswith('b"')):
             try:
                 b = ast.literal_eval(x)
                 return b.hex()
@@ -31,21 +55,141 @@ class EventLoader:
                 return x
         return str(x)
 
-    def load(self):
-        df = pd.read_csv(self.path)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    def _clean_uuid_column(self, col, optional=False):
+        """
+        Vectorized _clean_uuid over a whole column.
+        16-byte literals are decoded at byte level; anything else falls back
+        to _clean_uuid. For optional columns non-string cells become None.
+        """
+        values = col.to_numpy(dtype=object)
+        raw, valid = decode_uuid_literals(values)
+
+        out = self._clean_uuid_fallback(values, valid, optional)
+        out[valid] = uuid_bytes_to_hex(raw[valid])
+
+        return pd.Series(out, index=col.index, dtype=object)
 
-        # Filter event types
-        df = df[df["type"].isin(self.EXPANDED_EVENTS)]
+    def _clean_uuid_fallback(self, values, valid, optional=False):
+        """_clean_uuid for the rows that are not 16-byte literals (None elsewhere)."""
+        out = np.full(len(values), None, dtype=object)
+        for i in np.flatnonzero(~valid):
+            x = values[i]
+            if isinstance(x, str) or not optional:
+                out[i] = self._clean_uuid(x)
+        return out
+
+    def _prepare(self, df):
+        """Filter event types first, then parse only the surviving rows."""
+        df = df[df["type"].isin(self.EXPANDED_EVENTS)].copy()
+
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
 
         # Clean UUIDs
-        df["subject"] = df["subject"].apply(self._clean_uuid)
+        df["subject"] = self._clean_uuid_column(df["subject"])
 
         # Some events may not have predicate_object
         if "predicate_object" in df.columns:
-            df["predicate_object"] = df["predicate_object"].apply(
-                lambda x: self._clean_uuid(x) if isinstance(x, str) else None
+            df["predicate_object"] = self._clean_uuid_column(
+                df["predicate_object"], optional=True
             )
 
+        return df
+
+    def _attach_ids(self, df):
+        """Intern UUIDs into the shared EntityDictionary (if any)."""
+        if self.entities is None or not len(df):
+            return df
+
+        subject_id = self.entities.intern(df["subject"])
+        if "predicate_object" in df.columns:
+            object_id = self.entities.intern(df["predicate_object"])
+        else:
+            object_id = np.full(len(df), -1, dtype=np.int32)
+        return df.assign(subject_id=subject_id, object_id=object_id)
+
+    def _store(self):
+        # imported here: EventStore builds on this module
+        from src.pipeline.event_store import EventStore
+
+        if self.use_cache and EventStore.available():
+            return EventStore(self.path, self.cache_dir, self.chunksize)
+        return None
+
+    def load(self):
+        store = self._store()
+        if store is not None:
+            df = store.load(types=self.EXPANDED_EVENTS)
+        else:
+            df = self._prepare(pd.read_csv(self.path))
+
+        df = self._attach_ids(df)
         self.data = df
         return df
+
+    def iter_chunks(self, chunksize=None):
+        """
+        Stream events with a fixed memory ceiling.
+
+        Reads `chunksize` CSV rows at a time (only EVENT_COLUMNS), and yields
+        timestamp-sorted DataFrames.
+
+        Through the columnar cache (default) the whole export is sorted once,
+        however out of order it is. Without it, the export must be ordered up
+        to `reorder_slack`: rows within the slack of the newest timestamp seen
+        are held back until the next chunk, and a row later than that raises
+        ValueError (see order_chunks) instead of coming out of order.
+        """
+        store = self._store()
+        if store is not None:
+            chunks = store.iter_batches(types=self.EXPANDED_EVENTS, batch_size=chunksize)
+        else:
+            chunks = (self._prepare(raw) for raw in self.read_csv_chunks(chunksize))
+            chunks = order_chunks(chunks, self.reorder_slack)
+
+        return (self._attach_ids(chunk) for chunk in chunks)
+
+    def read_csv_chunks(self, chunksize=None):
+        """Raw (unparsed, unfiltered) CSV chunks restricted to EVENT_COLUMNS."""
+        return pd.read_csv(
+            self.path,
+            usecols=lambda c: c in self.EVENT_COLUMNS,
+            chunksize=chunksize or self.chunksize,
+        )
+
+
+def order_chunks(chunks, reorder_slack):
+    """
+    Re-emit DataFrame chunks globally sorted by "timestamp".
+
+    Rows within `reorder_slack` of the newest timestamp seen so far are held
+    back and merged into the next chunk, so memory stays bounded by one chunk
+    plus the slack. A row older than rows already emitted (later than the
+    slack in the input) raises ValueError.
+    """
+    reorder_slack = pd.Timedelta(reorder_slack)
+
+    carry = None
+    emitted = None   # newest timestamp already yielded
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+
+        chunk = chunk.sort_values("timestamp", kind="stable", ignore_index=True)
+        first = chunk["timestamp"].iloc[0]
+        if emitted is not None and first < emitted:
+            raise ValueError(
+                f"Event at {first} arrives after events up to {emitted} were emitted: "
+                f"the input is out of order by more than reorder_slack={reorder_slack}")
+
+        watermark = chunk["timestamp"].iloc[-1] - reorder_slack
+        split = int(chunk["timestamp"].searchsorted(watermark, side="left"))
+
+        carry = chunk.iloc[split:]
+        if split:
+            emitted = chunk["timestamp"].iloc[split - 1]
+            yield chunk.iloc[:split]
+
+    if carry is not None and len(carry):
+        yield carry.reset_index(drop=True)
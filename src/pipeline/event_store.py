@@ -0,0 +1,294 @@
+# src/pipeline/event_store.py
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.event_loader import EventLoader, order_chunks
+from src.pipeline.uuid_codec import (
+    UUID_BYTES, decode_uuid_literals, uuid_bytes_to_hex,
+    uuid_bytes_to_words, uuid_words_to_bytes,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without pyarrow we re-parse the CSV every run
+    pa = None
+    pq = None
+
+
+class EventStore:
+    """
+    Canonical columnar copy of a CDM events.csv, built once and reused.
+
+    Parquet layout (all event types, sorted by timestamp, stable):
+    - timestamp        int64 ns
+    - type             dictionary-encoded string (pandas categorical)
+    - subject          fixed 16-byte binary
+    - predicate_object fixed 16-byte binary (nullable)
+    - <uuid col>_str   string, only for ids that are not b'..' literals
+                       (cleaned as EventLoader does), null otherwise
+
+    The file is stamped with the SHA-1 of the source CSV and rebuilt
+    automatically when the CSV changes. Each CSV chunk is sorted and written
+    as one row group (a sorted run); if the runs overlap, they are k-way
+    merged into the final file, so the cache is sorted however late rows
+    arrive in the export, with about one chunk in memory.
+    """
+
+    FORMAT_VERSION = "2"
+    UUID_COLUMNS = ["subject", "predicate_object"]
+
+    def __init__(self, source, cache_dir=None, chunksize=1_000_000):
+        self.source = Path(source)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.source.parent / "cache"
+        self.path = self.cache_dir / f"{self.source.stem}.parquet"
+        self.chunksize = chunksize
+
+    @staticmethod
+    def available():
+        return pq is not None
+
+    # -----------------------------------------------------------
+    # Freshness
+    # -----------------------------------------------------------
+
+    def source_hash(self):
+        h = hashlib.sha1()
+        with open(self.source, "rb") as f:
+            for block in iter(lambda: f.read(8 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _stamp(self):
+        return f"{self.FORMAT_VERSION}:{self.source_hash()}"
+
+    def cached_stamp(self):
+        if not self.path.exists():
+            return None
+        meta = pq.read_schema(self.path).metadata or {}
+        stamp = meta.get(b"sentinel.source")
+        return stamp.decode() if stamp else None
+
+    def is_fresh(self):
+        return self.available() and self.cached_stamp() == self._stamp()
+
+    def ensure(self):
+        """Build the cache if it is missing or stale."""
+        if not self.is_fresh():
+            self.build()
+        return self
+
+    # -----------------------------------------------------------
+    # Build
+    # -----------------------------------------------------------
+
+    def _encode_chunk(self, raw):
+        """Raw CSV chunk -> timestamp + type + UUIDs as (hi, lo) uint64 words."""
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(raw["timestamp"]).astype("datetime64[ns]"),
+            "type": raw["type"].astype(object),
+        })
+
+        loader = EventLoader(self.source)
+        for col in self.UUID_COLUMNS:
+            values = raw[col].to_numpy(dtype=object) if col in raw else np.full(len(raw), None, dtype=object)
+            b, ok = decode_uuid_literals(values)
+            df[f"{col}_hi"], df[f"{col}_lo"] = uuid_bytes_to_words(b)
+            df[f"{col}_ok"] = ok
+            # anything else is kept as the CSV path would clean it
+            df[f"{col}_str"] = loader._clean_uuid_fallback(values, ok, optional=col != "subject")
+
+        return df
+
+    def _iter_runs(self):
+        """Encoded CSV chunks, each sorted by timestamp (ties in file order)."""
+        loader = EventLoader(self.source, chunksize=self.chunksize)
+        for raw in loader.read_csv_chunks():
+            df = self._encode_chunk(raw)
+            if len(df):
+                yield df.sort_values("timestamp", kind="stable", ignore_index=True)
+
+    def _iter_encoded(self):
+        """Ordered encoded chunks without the cache (within EventLoader's slack)."""
+        return order_chunks(self._iter_runs(), EventLoader(self.source).reorder_slack)
+
+    def _uuid_array(self, df, col):
+        raw = uuid_words_to_bytes(df[f"{col}_hi"].to_numpy(), df[f"{col}_lo"].to_numpy())
+        ok = df[f"{col}_ok"].to_numpy()
+        validity = pa.py_buffer(np.packbits(ok, bitorder="little"))
+        return pa.Array.from_buffers(
+            pa.binary(UUID_BYTES), len(df),
+            [validity, pa.py_buffer(raw.tobytes())],
+            null_count=int((~ok).sum()),
+        )
+
+    def _schema(self, stamp):
+        return pa.schema([
+            ("timestamp", pa.int64()),
+            ("type", pa.dictionary(pa.int32(), pa.string())),
+            ("subject", pa.binary(UUID_BYTES)),
+            ("predicate_object", pa.binary(UUID_BYTES)),
+            ("subject_str", pa.string()),
+            ("predicate_object_str", pa.string()),
+        ], metadata={"sentinel.source": stamp})
+
+    def _to_arrow(self, df, schema):
+        return pa.table({
+            "timestamp": pa.array(df["timestamp"].to_numpy().view(np.int64)),
+            "type": pa.array(df["type"].to_numpy(), pa.string()).dictionary_encode(),
+            "subject": self._uuid_array(df, "subject"),
+            "predicate_object": self._uuid_array(df, "predicate_object"),
+            "subject_str": pa.array(df["subject_str"].to_numpy(), pa.string()),
+            "predicate_object_str": pa.array(df["predicate_object_str"].to_numpy(), pa.string()),
+        }).cast(schema)
+
+    def build(self):
+        if not self.available():
+            raise ImportError("EventStore requires pyarrow")
+
+        print("🗄️  Building columnar event cache:", self.path)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".parquet.tmp")
+
+        schema = self._schema(self._stamp())
+        rows, overlap, last = 0, False, None
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for df in self._iter_runs():
+                ts = df["timestamp"]
+                overlap |= last is not None and ts.iloc[0] < last
+                last = ts.iloc[-1] if last is None else max(last, ts.iloc[-1])
+                writer.write_table(self._to_arrow(df, schema), row_group_size=len(df))
+                rows += len(df)
+
+        if overlap:
+            print("↕️  Export is out of order across chunks, merging sorted runs")
+            runs = tmp
+            tmp = self.path.with_suffix(".parquet.merge")
+            self._merge_runs(runs, tmp, schema)
+            runs.unlink()
+
+        os.replace(tmp, self.path)
+        print(f"✔ Cached {rows:,} events")
+        return self
+
+    def _merge_runs(self, src, dst, schema):
+        """
+        k-way merge of src's sorted row groups into dst. Each run is read in
+        chunksize / k row batches; rows up to the smallest last timestamp
+        buffered over the unfinished runs are final and written out.
+        """
+        f = pq.ParquetFile(src)
+        k = f.num_row_groups
+        batch_size = max(1, self.chunksize // k)
+        runs = [f.iter_batches(batch_size=batch_size, row_groups=[i]) for i in range(k)]
+        buffers = [None] * k   # pending rows (pa.Table) of each run, None once done
+
+        def refill(i):
+            batch = next(runs[i], None)
+            buffers[i] = pa.Table.from_batches([batch]) if batch is not None else None
+
+        for i in range(k):
+            refill(i)
+
+        with pq.ParquetWriter(dst, schema) as writer:
+            while any(b is not None for b in buffers):
+                live = [i for i in range(k) if buffers[i] is not None]
+                bound = min(buffers[i].column("timestamp")[-1].as_py() for i in live)
+
+                parts = []
+                for i in live:
+                    ts = buffers[i].column("timestamp").to_numpy()
+                    take = int(np.searchsorted(ts, bound, side="right"))
+                    parts.append(buffers[i].slice(0, take))
+                    buffers[i] = buffers[i].slice(take)
+                    if not len(buffers[i]):
+                        refill(i)
+
+                # stable: equal timestamps keep run (= file) order
+                merged = pa.concat_tables(parts)
+                order = np.argsort(merged.column("timestamp").to_numpy(), kind="stable")
+                writer.write_table(merged.take(order).cast(schema))
+
+    # -----------------------------------------------------------
+    # Read
+    # -----------------------------------------------------------
+
+    @staticmethod
+    def _uuid_hex(column):
+        arr = column.combine_chunks() if hasattr(column, "combine_chunks") else column
+        data = np.frombuffer(arr.buffers()[1], dtype=np.uint8)
+        raw = data[arr.offset * UUID_BYTES:(arr.offset + len(arr)) * UUID_BYTES]
+
+        out = uuid_bytes_to_hex(raw).astype(object)
+        if arr.null_count:
+            out[arr.is_null().to_numpy(zero_copy_only=False)] = None
+        return out
+
+    @classmethod
+    def to_frame(cls, table):
+        """Arrow table/batch -> DataFrame in the same shape EventLoader.load() gives."""
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(
+                table.column("timestamp").to_numpy(), unit="ns"
+            ),
+            "type": table.column("type").to_pandas().cat.remove_unused_categories(),
+        })
+        for col in cls.UUID_COLUMNS:
+            out = cls._uuid_hex(table.column(col))
+            other = table.column(f"{col}_str").to_numpy(zero_copy_only=False)
+            kept = pd.notna(other)
+            out[kept] = other[kept]
+            df[col] = pd.Series(out, dtype=object)
+        return df
+
+    def _filters(self, types):
+        return [("type", "in", sorted(types))] if types is not None else None
+
+    def read_table(self, types=None):
+        self.ensure()
+        return pq.read_table(self.path, filters=self._filters(types))
+
+    def load(self, types=None):
+        """Whole event log as a DataFrame (optionally only some event types)."""
+        if not self.available():
+            print("⚠️  pyarrow not installed, parsing CSV without cache")
+            df = pd.concat(list(self._iter_runs()), ignore_index=True)
+            df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+            if types is not None:
+                df = df[df["type"].isin(types)].reset_index(drop=True)
+            return self._frame_from_encoded(df)
+
+        return self.to_frame(self.read_table(types))
+
+    def iter_batches(self, types=None, batch_size=None):
+        """Timestamp-ordered DataFrame batches with bounded memory."""
+        if not self.available():
+            for df in self._iter_encoded():
+                if types is not None:
+                    df = df[df["type"].isin(types)].reset_index(drop=True)
+                if len(df):
+                    yield self._frame_from_encoded(df)
+            return
+
+        self.ensure()
+        f = pq.ParquetFile(self.path)
+        for batch in f.iter_batches(batch_size=batch_size or self.chunksize):
+            df = self.to_frame(batch)
+            if types is not None:
+                df = df[df["type"].isin(types)].reset_index(drop=True)
+            if len(df):
+                yield df
+
+    def _frame_from_encoded(self, df):
+        out = df[["timestamp", "type"]].copy()
+        for col in self.UUID_COLUMNS:
+            raw = uuid_words_to_bytes(df[f"{col}_hi"].to_numpy(), df[f"{col}_lo"].to_numpy())
+            hexes = uuid_bytes_to_hex(raw).astype(object)
+            ok = df[f"{col}_ok"].to_numpy()
+            hexes[~ok] = df[f"{col}_str"].to_numpy()[~ok]
+            out[col] = pd.Series(hexes, index=out.index, dtype=object)
+        return out
@@ -1,13 +1,52 @@
 # src/pipeline/feature_engineer.py
 import numpy as np
 import pandas as pd
-import networkx as nx
 from datetime import datetime
 
+from src.pipeline.centrality import CentralityEngine
+from src.pipeline.entity_state import EntityStateStore
+
+# node feature name -> (batch feature function, declared cost)
+_REGISTRY = {}
+
+
+def feature(**costs):
+    """
+    Register a batch feature function for the named features. The function
+    is called as fn(engineer, wg, names) and returns {name: array} for (at
+    least) the requested names, so each feature is computable on its own.
+
+    Costs are relative per-window cost classes:
+    0 copy, 1 O(E) bincount, 2 O(E log E) sort, 3 sparse iteration,
+    4 shortest paths from pivots, 5 Brandes betweenness.
+    """
+    def register(fn):
+        for name, cost in costs.items():
+            _REGISTRY[name] = (fn, cost)
+        return fn
+    return register
+
+
 class FeatureEngineer:
     """
     Adds structural, statistical, and temporal features to graph nodes.
     Clean, modular, and future-proof for sequence-based detection.
+
+    compute_node_features()  -> per-node loop over a NetworkX graph
+    compute_feature_matrix() -> batch mode over a WindowGraph's arrays
+
+    Batch features are registered by name with a declared cost (FEATURES).
+    An engineer built with keys (a list or a FEATURE_SETS name) computes only
+    those, e.g. the 11 features GraphSAGE reads, and reuses cached columns
+    when a later model needs a superset.
+
+    Centralities go through a CentralityEngine (exact for small windows,
+    approximate above its cost budget); the mode and error bound used are
+    stored in G.graph["centrality_mode"] / G.graph["centrality_error"].
+
+    HISTORY_KEYS (opt-in, not read by the models by default) come from an
+    EntityStateStore snapshot set on `history` for the window being built:
+    a DataFrame of hist_* columns indexed by entity id.
     """
 
     NODE_KEYS = [
@@ -22,6 +61,31 @@ class FeatureEngineer:
         "time_sin", "time_cos"
     ]
 
+    # Cross-window entity history (EntityStateStore), requested explicitly
+    HISTORY_KEYS = EntityStateStore.HISTORY_KEYS
+
+    # Feature lists of the models (first columns of the packed x)
+    FEATURE_SETS = {
+        "graphsage": NODE_KEYS[:11],
+        "tgnn": NODE_KEYS,
+    }
+
+    FEATURES = _REGISTRY
+
+    # Written to JSON as ints (everything else is float)
+    INT_KEYS = {
+        "node_type_flag", "degree", "in_degree", "out_degree", "event_count",
+        "event_type_count", "burst_flag", "activity_rate"
+    }
+
+    BURST_EVENTS = 5        # >5 events ...
+    BURST_SECONDS = 0.2     # ... within 200 ms
+
+    def __init__(self, centrality=None, keys=None):
+        self.centrality = centrality or CentralityEngine()
+        self.keys = self.resolve(keys)
+        self.history = None
+
     def compute_node_features(self, G):
         """
         Compute centrality, statistical, and temporal features.
@@ -30,22 +94,20 @@ class FeatureEngineer:
         # ------------------------------
         # Structural features
         # ------------------------------
-        try:
-            degree_dict = dict(G.degree())
-            indeg = dict(G.in_degree())
-            outdeg = dict(G.out_degree())
-            close = nx.closeness_centrality(G)
-            between = nx.betweenness_centrality(G, normalized=True)
-            pagerank = nx.pagerank(G, alpha=0.85)
-            cluster = nx.clustering(G.to_undirected())
-        except:
-            close = {n: 0 for n in G.nodes()}
-            between = {n: 0 for n in G.nodes()}
-            pagerank = {n: 0 for n in G.nodes()}
-            cluster = {n: 0 for n in G.nodes()}
-            indeg = {n: 0 for n in G.nodes()}
-            outdeg = {n: 0 for n in G.nodes()}
-            degree_dict = {n: 0 for n in G.nodes()}
+        degree_dict = dict(G.degree())
+        indeg = dict(G.in_degree())
+        outdeg = dict(G.out_degree())
+
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        src = np.fromiter((index[u] for u, _ in G.edges()), np.int64, G.number_of_edges())
+        dst = np.fromiter((index[v] for _, v in G.edges()), np.int64, G.number_of_edges())
+
+        cent, G.graph["centrality_mode"], G.graph["centrality_error"] = \
+            self._run_centrality(len(nodes), src, dst)
+        close, between, pagerank, cluster = (
+            dict(zip(nodes, cent[k].tolist())) for k in CentralityEngine.KEYS
+        )
 
         # ------------------------------
         # TEMPORAL FEATURES
@@ -137,3 +199,198 @@ class FeatureEngineer:
             G.nodes[node]["time_cos"] = time_cos
 
         return G
+
+    # ------------------------------------------------------------------
+    # BATCH MODE (WindowGraph arrays)
+    # ------------------------------------------------------------------
+
+    def _run_centrality(self, n, src, dst, keys=None):
+        """Centralities via the engine; a failure zeros only these features."""
+        try:
+            return self.centrality.compute(n, src, dst, keys)
+        except Exception as e:
+            print(f"⚠️  Centrality failed ({e}), using zeros")
+            keys = [k for k in CentralityEngine.KEYS if keys is None or k in keys]
+            return {k: np.zeros(n) for k in keys}, "failed", float("nan")
+
+    @feature(node_type_flag=0)
+    def _node_type(self, wg, names):
+        return {"node_type_flag": wg.node_type_flag.astype(np.float64)}
+
+    @feature(degree=1, in_degree=1, out_degree=1, event_count=1, activity_rate=1)
+    def _degrees(self, wg, names):
+        n = wg.num_nodes
+        indeg = np.bincount(wg.dst, minlength=n).astype(np.float64)
+        outdeg = np.bincount(wg.src, minlength=n).astype(np.float64)
+        degree = indeg + outdeg
+        return {
+            "degree": degree,
+            "in_degree": indeg,
+            "out_degree": outdeg,
+            "event_count": degree,
+            "activity_rate": degree,  # events per window (1 sec)
+        }
+
+    @feature(event_type_count=1)
+    def _event_types(self, wg, names):
+        """Distinct event types on out-edges."""
+        valid = wg.event >= 0
+        pairs = np.unique(wg.src[valid].astype(np.int64) * 256 + (wg.event[valid].astype(np.int64)))
+        return {"event_type_count": np.bincount(pairs // 256, minlength=wg.num_nodes).astype(np.float64)}
+
+    @feature(closeness=4, betweenness=5, pagerank=3, cluster_coeff=3)
+    def _centralities(self, wg, names):
+        """Closeness / betweenness / PageRank / clustering (only those asked for)."""
+        cent, wg.graph["centrality_mode"], wg.graph["centrality_error"] = \
+            self._run_centrality(wg.num_nodes, wg.src, wg.dst, names)
+        return cent
+
+    @feature(ts_var=2, avg_ts_gap=2, last_seen_delta=2, burst_flag=2,
+             temporal_entropy=2, time_sin=2, time_cos=2)
+    def _temporal(self, wg, names):
+        """
+        Segment reductions over out-edge timestamps, grouped by source node.
+        Mirrors the per-node loop in compute_node_features.
+        """
+        n = wg.num_nodes
+        out = {k: np.zeros(n, dtype=np.float64) for k in names}
+        if wg.num_edges == 0:
+            return out
+
+        # sort edges by (src, ts); work in seconds relative to the window start
+        order = np.lexsort((wg.ts, wg.src))
+        src = wg.src[order]
+        ts_ns = wg.ts[order]
+        t = (ts_ns - ts_ns.min()) / 1e9
+
+        cnt = np.bincount(src, minlength=n)
+        starts = np.zeros(n, dtype=np.int64)
+        np.cumsum(cnt[:-1], out=starts[1:])
+        has = cnt > 0
+        multi = cnt > 1
+
+        # --- temporal var (population) ---
+        if "ts_var" in names:
+            mean = np.bincount(src, weights=t, minlength=n) / np.maximum(cnt, 1)
+            sq = np.bincount(src, weights=(t - mean[src]) ** 2, minlength=n)
+            out["ts_var"] = np.where(multi, sq / np.maximum(cnt, 1), 0.0)
+
+        # --- avg gap / last seen delta ---
+        if "avg_ts_gap" in names or "last_seen_delta" in names:
+            first = np.where(has, t[np.minimum(starts, len(t) - 1)], 0.0)
+            last = np.where(has, t[np.minimum(starts + cnt - 1, len(t) - 1)], 0.0)
+            span = last - first
+            if "avg_ts_gap" in names:
+                out["avg_ts_gap"] = np.where(multi, span / np.maximum(cnt - 1, 1), 0.0)
+            if "last_seen_delta" in names:
+                out["last_seen_delta"] = np.where(has, span, 0.0)
+
+        # --- burst flag: ts[i+5] - ts[i] < 0.2 within the same node ---
+        k = self.BURST_EVENTS
+        if "burst_flag" in names and len(t) > k:
+            same = src[k:] == src[:-k]
+            hit = same & (t[k:] - t[:-k] < self.BURST_SECONDS)
+            out["burst_flag"] = (np.bincount(src[:-k][hit], minlength=n) > 0).astype(np.float64)
+
+        # --- temporal entropy of normalised gaps ---
+        if "temporal_entropy" in names and len(t) > 1:
+            same = src[1:] == src[:-1]
+            g_src = src[1:][same]
+            gaps = np.diff(t)[same]
+            total = np.bincount(g_src, weights=gaps, minlength=n)
+            p = np.where(total[g_src] > 0, gaps / np.where(total[g_src] > 0, total[g_src], 1), gaps)
+            ent = -np.bincount(g_src, weights=p * np.log(p + 1e-9), minlength=n)
+            out["temporal_entropy"] = np.where(multi, ent, 0.0)
+
+        # --- time of day (local time of the first event), once per distinct second ---
+        if "time_sin" in names or "time_cos" in names:
+            secs = ts_ns[starts[has]] // 10**9
+            uniq, inv = np.unique(secs, return_inverse=True)
+            tod = np.array([_seconds_of_day(int(sec)) for sec in uniq], dtype=np.float64)[inv]
+            if "time_sin" in names:
+                out["time_sin"][has] = np.sin(2 * np.pi * tod / 86400)
+            if "time_cos" in names:
+                out["time_cos"][has] = np.cos(2 * np.pi * tod / 86400)
+
+        return out
+
+    @feature(**dict.fromkeys(EntityStateStore.HISTORY_KEYS, 1))
+    def _history(self, wg, names):
+        """Entity history before the window (one gather by entity id)."""
+        if self.history is None or wg.node_ids is None:
+            return {k: np.zeros(wg.num_nodes) for k in names}
+        frame = self.history.reindex(wg.node_ids)
+        return {k: frame[k].fillna(0.0).to_numpy(np.float64) for k in names}
+
+    # ------------------------------------------------------------------
+    # Feature selection
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def resolve(cls, keys=None):
+        """
+        Feature list -> the keys it names, in NODE_KEYS + HISTORY_KEYS order.
+        Accepts None (all NODE_KEYS), a FEATURE_SETS name, a comma-separated
+        string or a list.
+        """
+        if keys is None:
+            return list(cls.NODE_KEYS)
+        if isinstance(keys, str):
+            keys = cls.FEATURE_SETS.get(keys, [k.strip() for k in keys.split(",") if k.strip()])
+        unknown = set(keys) - set(cls.FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown node features: {sorted(unknown)}")
+        return [k for k in cls.NODE_KEYS + cls.HISTORY_KEYS if k in keys]
+
+    @classmethod
+    def plan(cls, keys):
+        """Feature functions needed for keys -> [(function, [names])], cheapest first."""
+        groups = {}
+        for k in cls.resolve(keys):
+            fn, _ = cls.FEATURES[k]
+            groups.setdefault(fn, []).append(k)
+        cost = lambda item: max(cls.FEATURES[k][1] for k in item[1])
+        return sorted(groups.items(), key=cost)
+
+    @classmethod
+    def cost(cls, keys):
+        """Declared cost of computing keys (one charge per feature function)."""
+        return sum(max(cls.FEATURES[k][1] for k in names) for _, names in cls.plan(keys))
+
+    def compute_feature_columns(self, wg, keys=None, cached=None):
+        """
+        Requested features (default: self.keys) for all nodes of a WindowGraph
+        -> {key: float64 array}. Columns in `cached` (e.g. loaded from a
+        previous build of the same window) are reused, not recomputed.
+        """
+        keys = self.keys if keys is None else self.resolve(keys)
+        cached = cached or {}
+        cols = {k: np.asarray(cached[k], dtype=np.float64) for k in keys if k in cached}
+
+        for fn, names in self.plan([k for k in keys if k not in cols]):
+            computed = fn(self, wg, names)
+            cols.update((k, computed[k]) for k in names)
+
+        wg.graph.setdefault("centrality_mode", "skipped")
+        wg.graph.setdefault("centrality_error", float("nan"))
+        return cols
+
+    def compute_feature_matrix(self, wg, keys=None):
+        """Batch mode: float32 [num_nodes, len(keys)] in NODE_KEYS order."""
+        keys = self.keys if keys is None else self.resolve(keys)
+        cols = self.compute_feature_columns(wg, keys)
+        return np.stack([cols[k] for k in keys], axis=1).astype(np.float32).reshape(wg.num_nodes, len(keys))
+
+    def add_window_features(self, wg, keys=None, cached=None):
+        """Batch mode: store the features on wg.node_attrs (ints kept as ints)."""
+        cols = self.compute_feature_columns(wg, keys, cached)
+        for k in self.NODE_KEYS + self.HISTORY_KEYS:
+            if k in cols:
+                wg.node_attrs[k] = cols[k].astype(np.int64) if k in self.INT_KEYS else cols[k]
+        return wg
+
+
+def _seconds_of_day(epoch_seconds):
+    """Local time of day in seconds, as datetime.fromtimestamp() sees it."""
+    dt_obj = datetime.fromtimestamp(epoch_seconds)
+    return dt_obj.hour * 3600 + dt_obj.minute * 60 + dt_obj.second
@@ -1,35 +1,18 @@
 # src/pipeline/graph_constructor.py
-import networkx as nx
+from src.pipeline.window_graph import WindowGraph
 
 class GraphConstructor:
     """
     Builds raw directed provenance graphs for each window.
     Ensures timestamps are JSON-serializable (converted to ISO strings).
-    """
-
-    def build_graph(self, events_window):
-        G = nx.DiGraph()
-
-        for _, row in events_window.iterrows():
-            subj = row["subject"]
-            obj = row["predicate_object"] if row.get("predicate_object") else None
+    Nodes carry their stable `entity_id` when the loader interned UUIDs.
 
-            # --- add subject node ---
-            G.add_node(subj, node_type="subject")
-
-            if obj:
-                # --- add object node ---
-                G.add_node(obj, node_type="object")
-
-                # FIX: convert Timestamp → string
-                ts_str = str(row["timestamp"])
+    build_window_graph() -> compact array WindowGraph (pipeline hot path)
+    build_graph()        -> NetworkX DiGraph (visualizer / debugging)
+    """
 
-                # --- add edge with event + timestamp ---
-                G.add_edge(
-                    subj,
-                    obj,
-                    event=row["type"],
-                    ts=ts_str  # 🔥 ISO STRING, NOT Timestamp
-                )
+    def build_window_graph(self, events_window):
+        return WindowGraph.from_events(events_window)
 
-        return G
+    def build_graph(self, events_window):
+        return self.build_window_graph(events_window).to_networkx()
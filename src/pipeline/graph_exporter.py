@@ -1,19 +1,62 @@
 # src/pipeline/graph_exporter.py
 import json
 from pathlib import Path
+import numpy as np
 import networkx as nx
 
+from src.pipeline.window_graph import WindowGraph
+from src.pipeline.graph_store import graph_arrays
+from src.pipeline.feature_engineer import FeatureEngineer
+
 class GraphExporter:
     """
     Saves graphs to JSON (node-link format) and tracks metadata.
     Clean, safe, reusable.
+
+    formats:
+    - json : window_XXXX.json (visualizer / API / debugging)
+    - npz  : window_XXXX.npz packed arrays, cheap to pack into a GraphStore
     """
 
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, formats=("json",)):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.formats = tuple(formats)
+
+    def path(self, window_id, fmt=None):
+        return self.output_dir / f"window_{window_id:04d}.{fmt or self.formats[0]}"
+
+    def paths(self, window_id):
+        return [self.path(window_id, fmt) for fmt in self.formats]
 
     def save(self, G, window_id):
-        path = self.output_dir / f"window_{window_id:04d}.json"
-        with open(path, "w") as f:
-            json.dump(nx.node_link_data(G), f)
+        if "npz" in self.formats:
+            np.savez(self.path(window_id, "npz"), **graph_arrays(G))
+
+        if "json" in self.formats:
+            if isinstance(G, WindowGraph):
+                G = G.to_networkx()
+            with open(self.path(window_id, "json"), "w") as f:
+                json.dump(nx.node_link_data(G), f)
+
+    def load_arrays(self, window_id):
+        """Packed arrays of a saved window (from .npz if written, else JSON)."""
+        npz = self.path(window_id, "npz")
+        if npz.exists():
+            with np.load(npz) as z:
+                return {k: z[k] for k in z.files}
+
+        with open(self.path(window_id, "json")) as f:
+            return graph_arrays(nx.node_link_graph(json.load(f)))
+
+    def load_node_attrs(self, window_id, keys):
+        """Saved node attributes {key: float64 array} (JSON keeps full precision)."""
+        path = self.path(window_id, "json")
+        if not path.exists():
+            x = self.load_arrays(window_id)["x"]
+            return {k: x[:, FeatureEngineer.NODE_KEYS.index(k)].astype(np.float64)
+                    for k in keys if k in FeatureEngineer.NODE_KEYS}
+
+        with open(path) as f:
+            nodes = json.load(f)["nodes"]
+        return {k: np.array([float(n.get(k, 0)) for n in nodes]) for k in keys}
@@ -0,0 +1,271 @@
+# src/pipeline/graph_store.py
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import networkx as nx
+import pandas as pd
+
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.window_graph import EDGE_STAT_KEYS, EVENT_TYPES, WindowGraph, edge_stat_columns
+
+NODE_ARRAYS = ["x", "node_id", "node_kind"]
+EDGE_ARRAYS = ["edge_index", "edge_attr"]
+ARRAYS = NODE_ARRAYS + EDGE_ARRAYS
+
+# index.npy columns
+WINDOW_ID, SHARD, NODE_LO, NODE_HI, EDGE_LO, EDGE_HI = range(6)
+
+
+def graph_arrays(G, node_keys=FeatureEngineer.NODE_KEYS):
+    """
+    WindowGraph or NetworkX window graph -> dict of packed arrays:
+    - x           float32 [num_nodes, len(node_keys)]
+    - edge_index  int64   [num_edges, 2]  (local node indices)
+    - edge_attr   float32 [num_edges, len(EVENT_TYPES) + len(EDGE_STAT_KEYS)]
+                  share of each event type among the edge's coalesced events
+                  (one-hot for a single event), then its repeat statistics
+    - node_id     int32   [num_nodes]  entity id (-1 if unknown)
+    - node_kind   int8    [num_nodes]  EntityDictionary.KINDS index (0 = unknown)
+    """
+    if isinstance(G, WindowGraph):
+        n = G.num_nodes
+        x = np.zeros((n, len(node_keys)), dtype=np.float32)
+        for j, k in enumerate(node_keys):
+            if k in G.node_attrs:
+                x[:, j] = G.node_attrs[k]
+        node_id = G.node_ids if G.node_ids is not None else np.full(n, -1)
+        node_kind = G.node_attrs.get("node_kind", np.zeros(n))
+        edge_index = np.stack([G.src, G.dst], axis=1)
+        event = G.event.astype(np.int64)
+        type_counts = G.edge_attrs.get("type_counts")
+        stats = G.edge_stats()
+    else:
+        nodes = list(G.nodes(data=True))
+        index = {node: i for i, (node, _) in enumerate(nodes)}
+        x = np.array([[float(d.get(k, 0)) for k in node_keys] for _, d in nodes],
+                     dtype=np.float32).reshape(len(nodes), len(node_keys))
+        node_id = np.array([int(d.get("entity_id", -1)) for _, d in nodes])
+        node_kind = np.array([int(d.get("node_kind", 0)) for _, d in nodes])
+        edge_index = np.array([[index[u], index[v]] for u, v in G.edges()]).reshape(-1, 2)
+        codes = {e: i for i, e in enumerate(EVENT_TYPES)}
+        edges = [d for _, _, d in G.edges(data=True)]
+        event = np.array([codes.get(d.get("event"), -1) for d in edges], dtype=np.int64)
+        type_counts, stats = _edge_stats_of_json(edges, codes)
+
+    n_types = len(EVENT_TYPES)
+    edge_attr = np.zeros((len(event), n_types + len(EDGE_STAT_KEYS)), dtype=np.float32)
+    if type_counts is not None:
+        total = type_counts.sum(axis=1, keepdims=True)
+        edge_attr[:, :n_types] = type_counts / np.maximum(total, 1)
+    else:
+        known = event >= 0
+        edge_attr[np.flatnonzero(known), event[known]] = 1.0
+    edge_attr[:, n_types:] = stats
+
+    return {
+        "x": x,
+        "edge_index": edge_index.astype(np.int64),
+        "edge_attr": edge_attr,
+        "node_id": np.asarray(node_id, dtype=np.int32),
+        "node_kind": np.asarray(node_kind, dtype=np.int8),
+    }
+
+
+def _edge_stats_of_json(edges, codes):
+    """(type_counts or None, EDGE_STAT_KEYS columns) from node-link edge dicts."""
+    if not edges or "type_counts" not in edges[0]:
+        return None, np.zeros((len(edges), len(EDGE_STAT_KEYS)))
+
+    type_counts = np.zeros((len(edges), len(codes)), dtype=np.int64)
+    for i, d in enumerate(edges):
+        for evt, c in d["type_counts"].items():
+            type_counts[i, codes[evt]] = c
+    ns = lambda key: pd.to_datetime([d[key] for d in edges]).values.view(np.int64)
+    stats = edge_stat_columns([d["count"] for d in edges], ns("ts"), ns("first_ts"),
+                              [d["gap_sq"] for d in edges])
+    return type_counts, stats
+
+
+class GraphStore:
+    """
+    Sharded binary store of window graphs (replaces parsing one JSON per window).
+
+    Layout of store_dir:
+    - meta.json                        node feature keys (and the ones
+                                       actually computed), edge types /
+                                       stats, shard size
+    - index.npy                        int64 [W, 6]: window_id, shard,
+                                       node_lo, node_hi, edge_lo, edge_hi
+    - shard_00000.<array>.npy          x / node_id / node_kind /
+                                       edge_index / edge_attr
+      (or shard_00000.npz if compressed)
+
+    Uncompressed shards are memory-mapped (copy-on-write), so arrays()
+    returns views and torch.from_numpy() on them does not copy.
+
+    x always has a column per node key; those a build did not compute
+    (e.g. features="graphsage") hold 0. meta["features"] lists the computed
+    ones and require() refuses readers that need any other.
+    """
+
+    FORMAT_VERSION = 4
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        self.index = np.load(self.store_dir / "index.npy")
+        self._rows = {int(wid): i for i, wid in enumerate(self.index[:, WINDOW_ID])}
+        self.arrays_stored = self.meta.get("arrays", ["x", "edge_index", "edge_attr", "node_id"])
+        # stores older than version 4 were always built with every feature
+        self.features = self.meta.get("features", self.meta["node_keys"])
+        self._shards = {}
+
+    @staticmethod
+    def exists(store_dir):
+        return store_dir is not None and (Path(store_dir) / "index.npy").exists()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, window_id):
+        return int(window_id) in self._rows
+
+    def window_ids(self):
+        return self.index[:, WINDOW_ID].tolist()
+
+    def require(self, keys):
+        """Raise if any of the node feature keys was not computed by the build."""
+        missing = [k for k in keys if k not in self.features]
+        if missing:
+            raise ValueError(
+                f"{self.store_dir} was built without node features {missing}; "
+                f"rebuild with SENTINEL_FEATURES covering them")
+
+    # -----------------------------------------------------------
+    # Read
+    # -----------------------------------------------------------
+
+    def _shard(self, shard):
+        if shard not in self._shards:
+            base = self.store_dir / f"shard_{shard:05d}"
+            if self.meta["compressed"]:
+                with np.load(f"{base}.npz") as z:
+                    self._shards[shard] = {k: z[k] for k in self.arrays_stored}
+            else:
+                self._shards[shard] = {
+                    k: np.load(f"{base}.{k}.npy", mmap_mode="c") for k in self.arrays_stored
+                }
+        return self._shards[shard]
+
+    def arrays(self, window_id):
+        """Packed arrays of one window (views into its shard)."""
+        row = self.index[self._rows[int(window_id)]]
+        s = self._shard(int(row[SHARD]))
+        nodes = slice(row[NODE_LO], row[NODE_HI])
+        edges = slice(row[EDGE_LO], row[EDGE_HI])
+        return {
+            k: s[k][nodes if k in NODE_ARRAYS else edges] for k in self.arrays_stored
+        }
+
+    # -----------------------------------------------------------
+    # Write
+    # -----------------------------------------------------------
+
+    @classmethod
+    def write(cls, store_dir, items, shard_size=1024, compress=False, features=None):
+        """
+        Pack (window_id, arrays) pairs into a new store. The store is written
+        next to store_dir and swapped in once complete. features: the node
+        feature keys computed for every window (default: all).
+        """
+        store_dir = Path(store_dir)
+        tmp = store_dir.with_name(store_dir.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        index, pending = [], []
+        shard = 0
+        for window_id, arrays in items:
+            pending.append((window_id, arrays))
+            if len(pending) == shard_size:
+                index += cls._write_shard(tmp, shard, pending, compress)
+                pending, shard = [], shard + 1
+        if pending:
+            index += cls._write_shard(tmp, shard, pending, compress)
+
+        np.save(tmp / "index.npy", np.array(index, dtype=np.int64).reshape(-1, 6))
+        with open(tmp / "meta.json", "w") as f:
+            json.dump({
+                "version": cls.FORMAT_VERSION,
+                "node_keys": FeatureEngineer.NODE_KEYS,
+                "features": [k for k in FeatureEngineer.NODE_KEYS
+                             if features is None or k in features],
+                "edge_types": EVENT_TYPES,
+                "edge_stats": EDGE_STAT_KEYS,
+                "arrays": ARRAYS,
+                "compressed": compress,
+                "shard_size": shard_size,
+            }, f)
+
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.replace(tmp, store_dir)
+        return cls(store_dir)
+
+    @staticmethod
+    def _write_shard(store_dir, shard, windows, compress):
+        packed = {k: np.concatenate([a[k] for _, a in windows]) for k in ARRAYS}
+
+        index, n0, e0 = [], 0, 0
+        for window_id, a in windows:
+            n1, e1 = n0 + len(a["x"]), e0 + len(a["edge_index"])
+            index.append([window_id, shard, n0, n1, e0, e1])
+            n0, e0 = n1, e1
+
+        base = store_dir / f"shard_{shard:05d}"
+        if compress:
+            np.savez_compressed(f"{base}.npz", **packed)
+        else:
+            for k, arr in packed.items():
+                np.save(f"{base}.{k}.npy", arr)
+        return index
+
+    @classmethod
+    def from_json_dir(cls, graphs_dir, store_dir, window_ids=None, **kwargs):
+        """Converter: existing window_XXXX.json directory -> GraphStore."""
+        graphs_dir = Path(graphs_dir)
+        if window_ids is None:
+            window_ids = sorted(int(p.stem.split("_")[1]) for p in graphs_dir.glob("window_*.json"))
+
+        features = set(FeatureEngineer.NODE_KEYS)  # keys every node carries
+
+        def items():
+            for wid in window_ids:
+                path = graphs_dir / f"window_{wid:04d}.json"
+                if not path.exists():
+                    continue
+                with open(path) as f:
+                    G = nx.node_link_graph(json.load(f))
+                for _, d in G.nodes(data=True):
+                    features.intersection_update(d)
+                yield wid, graph_arrays(G)
+
+        # features is complete once items() is exhausted, before meta.json
+        return cls.write(store_dir, items(), features=features, **kwargs)
+
+
+# -----------------------------------------------------------
+# MAIN: python -m src.pipeline.graph_store <graphs_dir> <store_dir> [--compress]
+# -----------------------------------------------------------
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    graphs_dir = args[0] if len(args) > 0 else "data/model_ready/graphs"
+    store_dir = args[1] if len(args) > 1 else "data/model_ready/store"
+
+    store = GraphStore.from_json_dir(graphs_dir, store_dir, compress="--compress" in sys.argv)
+    print(f"✔ Packed {len(store)} graphs into {store_dir}")
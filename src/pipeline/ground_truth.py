@@ -0,0 +1,160 @@
+# src/pipeline/ground_truth.py
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class GroundTruth:
+    """
+    Labelled attack intervals (red-team ground truth), for labelling windows.
+
+    Intervals come from a CSV / JSON file with columns:
+    - start, end   timestamps (closed interval)
+    - host         optional; the interval only applies to windows holding
+                   events of that host (empty = every host)
+    - technique    optional tag(s), e.g. "T1059" or "T1059;T1105"
+
+    They are kept in a pd.IntervalIndex. label_windows() labels every
+    window in one vectorized pass (sort + searchsorted over the interval
+    union, no per-window loop) and returns:
+    - label            1 if the window touches an applicable interval
+    - attack_overlap   fraction of the window covered by them
+    - technique_<tag>  per-technique 0/1 (multi-label)
+
+    Without a file, the single DARPA engagement period used so far
+    (2019-05-07 11:10:00 - 11:11:59) is the ground truth.
+    """
+
+    DEFAULT_INTERVALS = [("2019-05-07 11:10:00", "2019-05-07 11:11:59")]
+
+    def __init__(self, intervals):
+        intervals = pd.DataFrame(intervals).reset_index(drop=True)
+        for col in ("host", "technique"):
+            if col not in intervals.columns:
+                intervals[col] = None
+        intervals["host"] = intervals["host"].where(intervals["host"].notna() & (intervals["host"] != ""), None)
+
+        self.index = pd.IntervalIndex.from_arrays(
+            pd.to_datetime(intervals["start"], format="mixed"),
+            pd.to_datetime(intervals["end"], format="mixed"), closed="both")
+        self.hosts = intervals["host"].to_numpy(dtype=object)
+
+        # technique tag -> boolean mask over intervals
+        tags = intervals["technique"].fillna("").astype(str).str.split(";")
+        self.techniques = {}
+        for i, row in enumerate(tags):
+            for tag in (t.strip() for t in row):
+                if tag:
+                    self.techniques.setdefault(tag, np.zeros(len(intervals), bool))[i] = True
+
+    @classmethod
+    def load(cls, path=None):
+        """Intervals from a .csv / .json file, or DEFAULT_INTERVALS if it does not exist."""
+        if path is None or not Path(path).exists():
+            return cls.single(*cls.DEFAULT_INTERVALS[0])
+        path = Path(path)
+        df = pd.read_json(path) if path.suffix == ".json" else pd.read_csv(path, dtype={"host": object})
+        return cls(df)
+
+    @classmethod
+    def single(cls, start, end):
+        return cls(pd.DataFrame({"start": [start], "end": [end]}))
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def columns(self):
+        """Label columns label_windows() adds (besides `label`)."""
+        return ["attack_overlap"] + [f"technique_{t}" for t in sorted(self.techniques)]
+
+    # -----------------------------------------------------------
+    # Labelling
+    # -----------------------------------------------------------
+
+    @staticmethod
+    def window_hosts(events, lo, hi):
+        """{host: bool per window} - windows (rows lo:hi) holding events of the host."""
+        if "host" not in events.columns:
+            return None
+        codes, names = pd.factorize(events["host"])
+        out = {}
+        for j, host in enumerate(names):
+            count = np.concatenate([[0], np.cumsum(codes == j)])
+            out[host] = count[np.asarray(hi)] > count[np.asarray(lo)]
+        return out
+
+    def label_windows(self, starts, ends, hosts=None):
+        """
+        Labels for windows [starts[i], ends[i]) -> DataFrame (one row per
+        window, columns ["label"] + self.columns). hosts is window_hosts()
+        output; without it host-specific intervals apply to every window.
+        """
+        ws = pd.DatetimeIndex(starts).asi8
+        we = pd.DatetimeIndex(ends).asi8
+        n = len(ws)
+
+        # windows with the same set of hosts share the applicable intervals
+        host_names = sorted(hosts) if hosts else []
+        present = np.stack([hosts[h] for h in host_names], axis=1) if host_names else np.zeros((n, 0), bool)
+        patterns, pattern_of = np.unique(present, axis=0, return_inverse=True)
+        pattern_of = pattern_of.reshape(-1)
+
+        label = np.zeros(n, dtype=np.int64)
+        covered = np.zeros(n, dtype=np.float64)
+        tech = {t: np.zeros(n, dtype=np.int64) for t in self.techniques}
+
+        for p, pattern in enumerate(patterns):
+            rows = np.flatnonzero(pattern_of == p)
+            applies = np.array([
+                h is None or not host_names or (h in host_names and pattern[host_names.index(h)])
+                for h in self.hosts
+            ], dtype=bool)
+
+            hit, cov = self._cover(applies, ws[rows], we[rows])
+            label[rows] = hit
+            covered[rows] = cov
+            for t, mask in self.techniques.items():
+                tech[t][rows] = self._cover(applies & mask, ws[rows], we[rows])[0]
+
+        out = pd.DataFrame({
+            "label": label,
+            "attack_overlap": covered / np.maximum(we - ws, 1),
+        })
+        for t in sorted(tech):
+            out[f"technique_{t}"] = tech[t]
+        return out
+
+    def label_window(self, ws, we):
+        """Scalar label of one window (same rule as label_windows)."""
+        return int(self.label_windows([ws], [we])["label"].iloc[0])
+
+    def _cover(self, mask, ws, we):
+        """(touches any interval, ns covered by their union) for windows ws..we."""
+        s = self.index.left.asi8[mask]
+        e = self.index.right.asi8[mask]
+        if len(s) == 0:
+            return np.zeros(len(ws), dtype=np.int64), np.zeros(len(ws))
+
+        order = np.argsort(s, kind="stable")
+        s = s[order]
+        reach = np.maximum.accumulate(e[order])  # furthest end among intervals started so far
+
+        # some interval starting at or before we reaches ws
+        k = np.searchsorted(s, we, side="right")
+        hit = (k > 0) & (reach[np.maximum(k - 1, 0)] >= ws)
+
+        # disjoint runs of the union, and cumulative covered length
+        new_run = np.concatenate([[True], s[1:] > reach[:-1]])
+        first = np.flatnonzero(new_run)
+        run_s = s[first]
+        run_e = reach[np.concatenate([first[1:] - 1, [len(s) - 1]])]
+        cum = np.concatenate([[0], np.cumsum(run_e - run_s)])
+
+        def covered_before(t):
+            i = np.searchsorted(run_s, t, side="right")
+            over = np.where(i > 0, np.maximum(run_e[np.maximum(i - 1, 0)] - t, 0), 0)
+            return cum[i] - over
+
+        return hit.astype(np.int64), (covered_before(we) - covered_before(ws)).astype(np.float64)
@@ -0,0 +1,179 @@
+# src/pipeline/hub_compactor.py
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.window_graph import EVENT_TYPES, WindowGraph
+
+
+class HubCompactor:
+    """
+    Optional stage after GraphConstructor that shrinks the fan-out of hub
+    entities (shared DLLs, registry hives, the System process, ...).
+
+    fit() finds the hubs once from corpus-wide statistics: an entity is a
+    hub when its number of distinct counterparts over the whole log is at
+    least max(min_degree, the `quantile` of all entities).
+
+    compact() then, in every window where a hub has more than max_fanout
+    edges, collapses the hub's leaf neighbours (nodes whose only edge is to
+    the hub) into one summary node per (hub, direction, event type). The
+    summary edge keeps the summed edge_count / type_counts / gap_sq, the
+    first first_ts and the last ts; the summary
+    node's `collapsed` attribute counts the leaves it replaced. Edges
+    between hubs and non-leaf nodes are kept as they are.
+
+    Per-window statistics (STAT_COLUMNS, net of the summary nodes / edges
+    added) are stored in wg.graph.
+    """
+
+    STAT_COLUMNS = ["hub_nodes", "hub_edges_removed", "hub_nodes_removed"]
+
+    def __init__(self, max_fanout=32, min_degree=100, quantile=0.999):
+        self.max_fanout = max_fanout
+        self.min_degree = min_degree
+        self.quantile = quantile
+        self.threshold = None
+        self.hub_ids = np.zeros(0, dtype=np.int64)
+        self.hub_keys = pd.Index([], dtype=object)
+
+    # -----------------------------------------------------------
+    # Corpus statistics
+    # -----------------------------------------------------------
+
+    def fit(self, events):
+        """Distinct-counterpart degree of every entity over the whole log."""
+        has_obj = events["predicate_object"].notna().to_numpy()
+        if "subject_id" in events.columns:
+            subj = events["subject_id"].to_numpy()[has_obj].astype(np.int64)
+            obj = events["object_id"].to_numpy()[has_obj].astype(np.int64)
+            keys = None
+        else:
+            codes, keys = pd.factorize(np.concatenate([
+                events["subject"].to_numpy(dtype=object)[has_obj],
+                events["predicate_object"].to_numpy(dtype=object)[has_obj],
+            ]))
+            subj, obj = np.split(codes.astype(np.int64), 2)
+
+        pairs = np.unique(np.stack([subj, obj], axis=1), axis=0)
+        ends = pairs.ravel()
+        ends = ends[ends >= 0]
+        nodes, degree = np.unique(ends, return_counts=True)
+
+        q = np.quantile(degree, self.quantile) if len(degree) else 0
+        self.threshold = max(self.min_degree, float(q))
+        hubs = nodes[degree >= self.threshold]
+
+        if keys is None:
+            self.hub_ids = hubs
+        else:
+            self.hub_keys = pd.Index(np.asarray(keys)[hubs], dtype=object)
+        self.degree = dict(zip(hubs.tolist(), degree[degree >= self.threshold].tolist()))
+        return self
+
+    def signature(self):
+        """Short hash of the settings and hub set (part of the build version)."""
+        h = hashlib.sha1(f"{self.max_fanout}:{self.threshold}".encode())
+        h.update(np.sort(self.hub_ids).tobytes())
+        h.update("\n".join(sorted(self.hub_keys)).encode())
+        return h.hexdigest()[:8]
+
+    def __len__(self):
+        return len(self.hub_ids) + len(self.hub_keys)
+
+    # -----------------------------------------------------------
+    # Compaction
+    # -----------------------------------------------------------
+
+    def _is_hub(self, wg):
+        if wg.node_ids is not None and len(self.hub_ids):
+            return np.isin(wg.node_ids, self.hub_ids)
+        if len(self.hub_keys):
+            return self.hub_keys.get_indexer(wg.node_keys) >= 0
+        return np.zeros(wg.num_nodes, dtype=bool)
+
+    def compact(self, wg):
+        n = wg.num_nodes
+        deg = np.bincount(wg.src, minlength=n) + np.bincount(wg.dst, minlength=n)
+        hub = self._is_hub(wg)
+        big = hub & (deg > self.max_fanout)
+        leaf = (deg == 1) & ~hub
+
+        out = big[wg.src] & leaf[wg.dst]
+        inc = big[wg.dst] & leaf[wg.src]
+        collapse = out | inc
+
+        wg.graph.update(dict.fromkeys(self.STAT_COLUMNS, 0))
+        wg.graph["hub_nodes"] = int(big.sum())
+        if not collapse.any():
+            wg.node_attrs["collapsed"] = np.zeros(n, dtype=np.int64)
+            return wg
+
+        # one group per (hub, direction, event type)
+        e = np.flatnonzero(collapse)
+        hub_of = np.where(out[e], wg.src[e], wg.dst[e]).astype(np.int64)
+        leaf_of = np.where(out[e], wg.dst[e], wg.src[e])
+        direction = out[e].astype(np.int64)  # 1 = hub -> leaves
+        group = (hub_of * 2 + direction) * (len(EVENT_TYPES) + 1) + (wg.event[e].astype(np.int64) + 1)
+        codes, _ = pd.factorize(group)
+        first = np.unique(codes, return_index=True)[1]
+        g_hub, g_out, g_event = hub_of[first], direction[first] == 1, wg.event[e][first]
+
+        g_count = np.bincount(codes, weights=wg.edge_count[e]).astype(np.int32)
+        g_leaves = np.bincount(codes).astype(np.int64)
+        g_ts = np.full(len(first), np.iinfo(np.int64).min)
+        np.maximum.at(g_ts, codes, wg.ts[e])
+
+        # surviving nodes keep their order; summary nodes are appended
+        keep_node = np.ones(n, dtype=bool)
+        keep_node[leaf_of] = False
+        new_index = np.cumsum(keep_node) - 1
+        m = int(keep_node.sum())
+        summary = m + np.arange(len(first))
+
+        names = np.array(EVENT_TYPES + ["OTHER"], dtype=object)[g_event]
+        summary_keys = [
+            f"{wg.node_keys[h]}/{evt}/{'out' if o else 'in'}"
+            for h, evt, o in zip(g_hub.tolist(), names.tolist(), g_out.tolist())
+        ]
+
+        keep = ~collapse
+        src = np.concatenate([new_index[wg.src[keep]], np.where(g_out, new_index[g_hub], summary)])
+        dst = np.concatenate([new_index[wg.dst[keep]], np.where(g_out, summary, new_index[g_hub])])
+        order = np.lexsort((np.arange(len(src)), src))
+
+        edge_attrs = {}
+        if "first_ts" in wg.edge_attrs:
+            first_ts = np.full(len(first), np.iinfo(np.int64).max)
+            np.minimum.at(first_ts, codes, wg.edge_attrs["first_ts"][e])
+            type_counts = np.zeros((len(first), len(EVENT_TYPES)), dtype=np.int32)
+            np.add.at(type_counts, codes, wg.edge_attrs["type_counts"][e])
+            gap_sq = np.bincount(codes, weights=wg.edge_attrs["gap_sq"][e])
+            edge_attrs = {
+                "first_ts": np.concatenate([wg.edge_attrs["first_ts"][keep], first_ts])[order],
+                "type_counts": np.concatenate([wg.edge_attrs["type_counts"][keep], type_counts])[order],
+                "gap_sq": np.concatenate([wg.edge_attrs["gap_sq"][keep], gap_sq])[order],
+            }
+
+        node_ids = None
+        if wg.node_ids is not None:
+            node_ids = np.concatenate([wg.node_ids[keep_node], np.full(len(first), -1, np.int32)])
+
+        compacted = WindowGraph(
+            node_keys=np.concatenate([wg.node_keys[keep_node], np.array(summary_keys, dtype=object)]),
+            node_type_flag=np.concatenate([
+                wg.node_type_flag[keep_node], np.where(g_out, 0, 1).astype(np.int8)]),
+            src=src[order].astype(np.int32),
+            dst=dst[order].astype(np.int32),
+            event=np.concatenate([wg.event[keep], g_event])[order],
+            ts=np.concatenate([wg.ts[keep], g_ts])[order],
+            edge_count=np.concatenate([wg.edge_count[keep], g_count])[order],
+            node_ids=node_ids,
+            edge_attrs=edge_attrs,
+        )
+        compacted.graph.update(wg.graph)
+        compacted.graph["hub_edges_removed"] = int(len(e) - len(first))
+        compacted.graph["hub_nodes_removed"] = int(n - m - len(first))
+        compacted.node_attrs["collapsed"] = np.concatenate([np.zeros(m, np.int64), g_leaves])
+        return compacted
@@ -0,0 +1,281 @@
+# src/pipeline/incremental_graph.py
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.window_graph import (
+    EDGE_ATTRS, WindowGraph, coalesce_events, _first_index, _last_index,
+)
+
+
+class IncrementalWindowGraph:
+    """
+    Graph of a sliding window, maintained bucket by bucket.
+
+    The window is a run of stride-sized buckets. Each bucket's events are
+    coalesced exactly once, when the bucket enters the window, into a small
+    summary (distinct nodes, distinct edges with count / last ts / last
+    event). Sliding appends the new buckets' summaries and drops the expired
+    ones; the window graph is merged from the summaries with integer keys,
+    so no event is re-read by each of the window / stride overlapping windows.
+
+    to_window_graph() gives the same graph WindowGraph.from_events() would
+    build from all of the window's events.
+
+    Node degrees are kept with add / expire too: each distinct edge counts
+    the live buckets it appears in, and a node's in / out degree changes
+    only when one of its edges enters (0 -> 1) or leaves (1 -> 0) the
+    window. node_columns() hands them to the FeatureEngineer as cached
+    columns, plus the previous window's centralities when the graph did not
+    change. Temporal features and event_type_count follow each edge's last
+    event, which does not expire cleanly, and are still recomputed.
+    """
+
+    COMPACT_MIN = 1 << 16   # interned keys / edge slots before trimming is considered
+
+    def __init__(self, stride):
+        self.stride_ns = int(pd.Timedelta(stride).value)
+        self.reset()
+
+    def reset(self, row=0):
+        self.buckets = deque()   # (row_lo, row_hi, summary)
+        self.lo = self.hi = row
+        # no summary outlives a reset, so the interned keys can go too
+        self._keys = pd.Index([], dtype=object)  # hex key -> int key (no entity ids)
+        self._reset_degrees()
+        self._kept = None        # (node keys, src, dst, centrality columns, meta)
+
+    def _reset_degrees(self):
+        self._pairs = pd.Index([], dtype=np.int64)   # src key << 32 | dst key -> slot
+        self._refs = np.zeros(0, dtype=np.int64)     # live buckets holding each edge
+        self._in = np.zeros(0, dtype=np.int64)       # per node key
+        self._out = np.zeros(0, dtype=np.int64)
+        self._live_pairs = 0
+
+    # -----------------------------------------------------------
+    # Sliding
+    # -----------------------------------------------------------
+
+    def slide_to(self, events, a, b):
+        """Make the state cover rows a:b of the (timestamp-sorted) events."""
+        if a < self.lo or b < self.hi or a > self.hi:
+            self.reset(a)
+
+        # expire buckets that left the window
+        while self.buckets and self.buckets[0][1] <= a:
+            self._count(self.buckets.popleft()[2], -1)
+        if self.buckets and self.buckets[0][0] < a:
+            # window start is not on a bucket edge: rebuild from scratch
+            self.reset(a)
+
+        # add buckets that entered it
+        if b > self.hi:
+            start = max(self.hi, a)
+            new = events.iloc[start:b]
+            ts = new["timestamp"].to_numpy().astype("datetime64[ns]").view(np.int64)
+            bucket = ts // self.stride_ns
+
+            cuts = np.concatenate([[0], np.flatnonzero(np.diff(bucket)) + 1, [len(new)]])
+            for i in range(len(cuts) - 1):
+                summary = self.summarize(new.iloc[cuts[i]:cuts[i + 1]])
+                self._count(summary, +1)
+                self.buckets.append((start + cuts[i], start + cuts[i + 1], summary))
+
+        self.lo, self.hi = a, b
+        self._compact()
+        return self
+
+    def _count(self, summary, sign):
+        """Add (+1) / expire (-1) a bucket's edges in the degree counters."""
+        src, dst = summary["src"], summary["dst"]
+        pairs = (src << 32) | dst
+        slots = self._pairs.get_indexer(pairs)
+        new = slots < 0
+        if new.any():
+            slots[new] = len(self._pairs) + np.arange(new.sum())
+            self._pairs = self._pairs.append(pd.Index(pairs[new]))
+            self._refs = np.concatenate([self._refs, np.zeros(new.sum(), dtype=np.int64)])
+
+        before = self._refs[slots]
+        self._refs[slots] += sign
+        flip = before == 0 if sign > 0 else self._refs[slots] == 0
+        self._live_pairs += sign * int(flip.sum())
+
+        size = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+        if size > len(self._in):
+            grow = max(size, 2 * len(self._in)) - len(self._in)
+            self._in = np.concatenate([self._in, np.zeros(grow, dtype=np.int64)])
+            self._out = np.concatenate([self._out, np.zeros(grow, dtype=np.int64)])
+        np.add.at(self._out, src[flip], sign)
+        np.add.at(self._in, dst[flip], sign)
+
+    def _compact(self):
+        """
+        Trim interned keys and edge slots no live bucket uses, once they
+        outnumber the live ones twice over (amortized O(1) per key).
+        """
+        rows = sum(len(s["key"]) for _, _, s in self.buckets)
+        stale_keys = len(self._keys) > max(self.COMPACT_MIN, 2 * rows)
+        stale_pairs = len(self._pairs) > max(self.COMPACT_MIN, 2 * self._live_pairs)
+        if not (stale_keys or stale_pairs):
+            return
+
+        if stale_keys:
+            live = np.unique(np.concatenate([s["key"] for _, _, s in self.buckets] or [[]]).astype(np.int64))
+            remap = np.full(len(self._keys), -1, dtype=np.int64)
+            remap[live] = np.arange(len(live))
+            self._keys = self._keys[live]
+            for _, _, s in self.buckets:
+                for k in ("key", "src", "dst"):
+                    s[k] = remap[s[k]]
+            self._kept = None
+
+        self._reset_degrees()
+        for _, _, s in self.buckets:
+            self._count(s, +1)
+
+    def _int_keys(self, c):
+        if c["node_ids"] is not None:
+            return c["node_ids"].astype(np.int64)
+        keys = self._keys.get_indexer(c["node_keys"])
+        new = keys < 0
+        if new.any():
+            start = len(self._keys)
+            self._keys = self._keys.append(pd.Index(c["node_keys"][new], dtype=object))
+            keys[new] = start + np.arange(new.sum())
+        return keys.astype(np.int64)
+
+    def summarize(self, rows):
+        """Coalesced summary (distinct nodes / edges) of a run of rows."""
+        c = coalesce_events(rows)
+        keys = self._int_keys(c)
+        summary = {
+            "key": keys,
+            "node_key": c["node_keys"],
+            "role": c["node_type_flag"],
+            "src": keys[c["src"]],
+            "dst": keys[c["dst"]],
+            "count": c["edge_count"],
+            "ts": c["ts"],
+            "event": c["event"],
+            "has_ids": c["node_ids"] is not None,
+        }
+        summary.update((k, c[k]) for k in EDGE_ATTRS)
+        return summary
+
+    # -----------------------------------------------------------
+    # Output
+    # -----------------------------------------------------------
+
+    def to_window_graph(self):
+        parts = [s for _, _, s in self.buckets]
+        wg, node_codes = merge_summaries(parts)
+        keys = np.zeros(wg.num_nodes, dtype=np.int64)
+        if parts:
+            keys[node_codes] = np.concatenate([s["key"] for s in parts])
+        self._node_keys = keys
+        return wg
+
+    def node_columns(self, wg):
+        """
+        Feature columns of the last to_window_graph() known without
+        recomputing: degree counters, and the centralities kept from the
+        previous window when nodes and edges are identical, in the same
+        order (so the reuse is exact). Centrality meta goes on wg.graph.
+        """
+        keys = self._node_keys
+        indeg = self._in[keys].astype(np.float64)
+        outdeg = self._out[keys].astype(np.float64)
+        degree = indeg + outdeg
+        cols = {
+            "degree": degree,
+            "in_degree": indeg,
+            "out_degree": outdeg,
+            "event_count": degree,
+            "activity_rate": degree,
+        }
+
+        kept = self._kept
+        if (kept is not None and np.array_equal(kept[0], keys)
+                and np.array_equal(kept[1], wg.src) and np.array_equal(kept[2], wg.dst)):
+            cols.update(kept[3])
+            wg.graph.update(kept[4])
+        return cols
+
+    def keep(self, wg, keys):
+        """Remember wg's centrality columns for the next window."""
+        cols = {k: wg.node_attrs[k] for k in keys if k in wg.node_attrs}
+        meta = {k: wg.graph.get(k) for k in ("centrality_mode", "centrality_error")}
+        self._kept = (self._node_keys, wg.src, wg.dst, cols, meta) if cols else None
+
+
+def merge_summaries(parts):
+    """
+    Merge consecutive summaries (in time order) into one WindowGraph.
+    Returns (graph, node_codes): node_codes maps every row of the
+    concatenated summaries' "key" arrays to its node index in the graph.
+    """
+    cat = lambda k, dtype: (np.concatenate([p[k] for p in parts]) if parts
+                            else np.zeros(0, dtype=dtype))
+
+    # Summaries are in (bucket, first appearance) order, i.e. the order
+    # of the window's rows - so first occurrence == first appearance.
+    keys = cat("key", np.int64)
+    src_keys, dst_keys = cat("src", np.int64), cat("dst", np.int64)
+    n_nodes_rows = len(keys)
+
+    codes, uniq = pd.factorize(np.concatenate([keys, src_keys, dst_keys]))
+    node_codes = codes[:n_nodes_rows]
+    num_nodes = len(uniq)
+
+    node_keys = cat("node_key", object)[_first_index(node_codes)]
+    node_type_flag = cat("role", np.int8)[_last_index(node_codes)]
+    has_ids = bool(parts) and parts[0]["has_ids"]
+
+    n_edge_rows = len(src_keys)
+    src_all = codes[n_nodes_rows:n_nodes_rows + n_edge_rows]
+    dst_all = codes[n_nodes_rows + n_edge_rows:]
+
+    pair_codes, pairs = pd.factorize(src_all.astype(np.int64) * num_nodes + dst_all)
+    first = _first_index(pair_codes)
+    last = _last_index(pair_codes)
+    count = np.bincount(pair_codes, weights=cat("count", np.int32),
+                        minlength=len(pairs)).astype(np.int32)
+
+    # NetworkX edge order: by source node, then first insertion
+    src = src_all[first]
+    order = np.lexsort((np.arange(len(pairs)), src))
+
+    edge_attrs = {}
+    if parts and "first_ts" in parts[0]:
+        ts, first_ts = cat("ts", np.int64), cat("first_ts", np.int64)
+        type_counts = np.zeros((len(pairs), parts[0]["type_counts"].shape[1]), dtype=np.int32)
+        np.add.at(type_counts, pair_codes, cat("type_counts", np.int32))
+
+        # gaps inside each bucket, plus the gap across consecutive buckets
+        seq = np.argsort(pair_codes, kind="stable")
+        p = pair_codes[seq]
+        same = p[1:] == p[:-1]
+        cross = (first_ts[seq][1:] - ts[seq][:-1])[same] / 1e9
+        gap_sq = np.bincount(pair_codes, weights=cat("gap_sq", np.float64), minlength=len(pairs))
+        gap_sq += np.bincount(p[1:][same], weights=cross * cross, minlength=len(pairs))
+
+        edge_attrs = {
+            "first_ts": first_ts[first][order],
+            "type_counts": type_counts[order],
+            "gap_sq": gap_sq[order],
+        }
+
+    wg = WindowGraph(
+        node_keys=np.asarray(node_keys, dtype=object),
+        node_type_flag=node_type_flag.astype(np.int8),
+        src=src[order].astype(np.int32),
+        dst=dst_all[first][order].astype(np.int32),
+        event=cat("event", np.int8)[last][order],
+        ts=cat("ts", np.int64)[last][order],
+        edge_count=count[order],
+        node_ids=uniq.astype(np.int32) if has_ids else None,
+        edge_attrs=edge_attrs,
+    )
+    return wg, node_codes
@@ -0,0 +1,132 @@
+# src/pipeline/multi_source_loader.py
+import glob
+from pathlib import Path
+
+import pandas as pd
+
+from src.pipeline.event_loader import EventLoader
+
+
+class MultiSourceLoader:
+    """
+    Streams events from many CDM exports (e.g. one file per host per hour)
+    as one timestamp-ordered stream, tagged with a categorical `host` column.
+
+    sources:
+    - {host: [paths or glob patterns]}  explicit host per file
+    - [paths or glob patterns]          host = file stem
+
+    Each file is read through its own EventLoader (columnar cache, entity
+    ids) in timestamp order; the cache sorts each file, and the uncached
+    path raises on rows later than reorder_slack. iter_chunks() performs a
+    k-way merge: it only emits rows up to the smallest "last timestamp
+    buffered" over the sources still open, and the full log is never
+    concatenated.
+
+    Every source reads chunksize / (number of sources) rows at a time, so
+    the buffered rows stay about one chunksize in total however many files
+    there are; hundreds of sources just mean smaller reads.
+    """
+
+    def __init__(self, sources, chunksize=1_000_000, reorder_slack="1s",
+                 use_cache=True, cache_dir=None, entities=None):
+        self.files = self._expand(sources)
+        if not self.files:
+            raise FileNotFoundError(f"No event files match {sources!r}")
+
+        self.hosts = sorted({host for host, _ in self.files})
+        self.entities = entities
+
+        # per-source chunks: k buffered chunks = one chunk of the total budget
+        per_source = max(chunksize // len(self.files), 1)
+        # one cache per host so equally named hourly files don't collide
+        self.loaders = [
+            EventLoader(path, chunksize=per_source, reorder_slack=reorder_slack,
+                        use_cache=use_cache,
+                        cache_dir=Path(cache_dir) / host if cache_dir else None,
+                        entities=entities)
+            for host, path in self.files
+        ]
+
+    @staticmethod
+    def _expand(sources):
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        if not isinstance(sources, dict):
+            sources = {None: sources}
+
+        files = []
+        for host, patterns in sources.items():
+            if isinstance(patterns, (str, Path)):
+                patterns = [patterns]
+            for pattern in patterns:
+                for path in sorted(glob.glob(str(pattern))) or [pattern]:
+                    path = Path(path)
+                    if path.exists():
+                        files.append((host if host is not None else path.stem, path))
+        return files
+
+    def _tag(self, df, host):
+        host_col = pd.Categorical([host] * len(df), categories=self.hosts)
+        return df.assign(host=host_col)
+
+    def _tagged(self, loader, host):
+        for chunk in loader.iter_chunks():
+            yield self._tag(chunk, host)
+
+    # -----------------------------------------------------------
+    # Streaming merge
+    # -----------------------------------------------------------
+
+    def iter_chunks(self):
+        """Timestamp-ordered, host-tagged chunks merged across every source."""
+        streams = [
+            self._tagged(loader, host)
+            for (host, _), loader in zip(self.files, self.loaders)
+        ]
+        buffers = [None] * len(streams)
+        open_ = [True] * len(streams)
+
+        def refill(i):
+            while open_[i] and (buffers[i] is None or buffers[i].empty):
+                chunk = next(streams[i], None)
+                if chunk is None:
+                    open_[i] = False
+                    buffers[i] = None
+                else:
+                    buffers[i] = chunk
+
+        for i in range(len(streams)):
+            refill(i)
+
+        while any(b is not None and len(b) for b in buffers):
+            # every open source will only produce rows >= its last buffered ts
+            tails = [buffers[i]["timestamp"].iloc[-1] for i in range(len(buffers))
+                     if open_[i] and buffers[i] is not None]
+            bound = min(tails) if tails else None
+
+            parts = []
+            for i, buf in enumerate(buffers):
+                if buf is None or buf.empty:
+                    continue
+                if bound is None:
+                    take = len(buf)
+                else:
+                    take = int(buf["timestamp"].searchsorted(bound, side="right"))
+                if take:
+                    parts.append(buf.iloc[:take])
+                    buffers[i] = buf.iloc[take:]
+
+            for i in range(len(streams)):
+                if buffers[i] is not None and buffers[i].empty:
+                    refill(i)
+
+            if parts:
+                # stable: equal timestamps keep source order
+                merged = pd.concat(parts, ignore_index=True)
+                yield merged.sort_values("timestamp", kind="stable", ignore_index=True)
+
+    def load(self):
+        """Whole merged log in memory (small datasets / the batch builder)."""
+        chunks = list(self.iter_chunks())
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
@@ -0,0 +1,190 @@
+# src/pipeline/streaming_build.py
+import csv
+import math
+import resource
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from src.pipeline.worker_pool import pool_context, init_worker, run_job
+
+
+def memory_mb(pids=()):
+    """
+    Memory of this process plus `pids` in MB: proportional set size (shared
+    pages of forked workers split between them), RSS without smaps_rollup.
+    """
+    total = 0.0
+    for pid in ("self",) + tuple(pids):
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("Pss:")) / 1024
+        except (OSError, StopIteration, ValueError):
+            if pid == "self":
+                total += resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return total
+
+
+class StreamingBuild:
+    """
+    Memory-capped build of a DatasetBuilder: chunks -> windows -> graphs ->
+    export without ever holding the log.
+
+    - at most one loader chunk (plus the unfinished window's rows) and
+      2 * workers batches of windows are in memory at any time
+    - labels.csv is written as windows finish (no manifest / resume)
+    - memory (PSS of the build) is checked after every batch: over the
+      budget, in-flight work is drained and batches shrink; a budget below
+      the idle build's own footprint, or still exceeded with one window at
+      a time, raises MemoryError
+    """
+
+    # Budget split: pandas bytes per event row (hex UUID strings dominate),
+    # and the share of the budget for loader chunks
+    ROW_BYTES = 512
+    CHUNK_SHARE = 0.125
+    BATCH = 64   # windows per job (labelled together), halved over budget
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.budget_mb = builder.memory_budget_mb
+        self.batch_size = self.BATCH
+        self.peak_mb = 0.0
+
+    @classmethod
+    def chunksize(cls, budget_mb):
+        """Rows per loader chunk for a memory budget."""
+        return max(10_000, int(budget_mb * 2**20 * cls.CHUNK_SHARE / cls.ROW_BYTES))
+
+    def run(self):
+        b = self.builder
+        print(f"🌊 Streaming build from {b.sources or b.events_path} "
+              f"(budget {self.budget_mb:g} MB, {b.chunksize:,} rows per chunk)")
+
+        # fresh build: no per-window manifest, no graphs from older builds
+        b.manifest.path.unlink(missing_ok=True)
+        b.progress_path.unlink(missing_ok=True)
+        for path in b.graph_dir.glob("window_*"):
+            path.unlink()
+
+        windows = b.windows.iter_windows_stream(b.loader.iter_chunks())
+        labels_path = b.output_dir / "labels.csv"
+        built = 0
+        self._check_baseline(memory_mb(), "")
+        with open(labels_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=b.label_columns, extrasaction="ignore",
+                                    lineterminator="\n")
+            writer.writeheader()
+            for window_id, ws, row in self._run_bounded(self._batches(windows)):
+                if row is None:
+                    print(f"⚠️  Empty graph for window {window_id}, skipping")
+                    continue
+                print(f"✔ Graph {window_id} saved ({row['num_nodes']} nodes, {row['num_edges']} edges)")
+                # same text as DataFrame.to_csv (NaN -> empty)
+                writer.writerow({k: "" if isinstance(v, float) and math.isnan(v) else v
+                                 for k, v in row.items()})
+                built += 1
+
+        b.entities.save()
+        b._write_store(b.exporter, b.store_dir, pd.read_csv(labels_path, usecols=["window_id"]))
+
+        print(f"\n🎉 Dataset ready!")
+        print(f"Total graphs created: {built}")
+        self._report_memory()
+
+    def _batches(self, windows):
+        """(ws, we, events) stream -> batches of (window_id, ws, we, events, label)."""
+        batch = []
+        for window_id, (ws, we, w) in enumerate(windows):
+            batch.append((window_id, ws, we, w))
+            if len(batch) >= self.batch_size:
+                yield self._label_batch(batch)
+                batch = []
+        if batch:
+            yield self._label_batch(batch)
+
+    def _label_batch(self, batch):
+        hosts = None
+        if "host" in batch[0][3].columns:
+            present = [set(w["host"].unique()) for *_, w in batch]
+            hosts = {h: np.array([h in p for p in present]) for h in set().union(*present)}
+        labels = self.builder.truth.label_windows([b[1] for b in batch], [b[2] for b in batch], hosts)
+        return [b + (label,) for b, label in zip(batch, labels.to_dict("records"))]
+
+    def process_batch(self, events, batch):
+        """Yield (window_id, ws, label_row) for one labelled batch of windows."""
+        for window_id, ws, we, w, label in batch:
+            yield window_id, ws, self.builder._process_window(window_id, ws, we, w, label=label)
+
+    def _run_bounded(self, batches):
+        """
+        process_batch over a stream of batches, in order, with at most
+        2 * workers batches submitted and not yet collected. While the
+        build (main + workers) is above the memory budget, in-flight work is
+        drained before more windows are read (see _over_budget).
+        """
+        workers = self.builder.workers
+        if workers == 1:
+            for batch in batches:
+                yield from self.process_batch(None, batch)
+                self._over_budget(memory_mb(), idle=True)
+            return
+
+        max_inflight = 2 * workers
+        print(f"🧵 Streaming windows through {workers} workers")
+        with pool_context().Pool(workers, initializer=init_worker, initargs=(self, None)) as pool:
+            pids = [p.pid for p in pool._pool]
+            self._check_baseline(memory_mb(pids), f" with {workers} workers")
+            pending = deque()
+            for batch in batches:
+                while pending:
+                    over = self._over_budget(memory_mb(pids))
+                    if len(pending) < max_inflight and not over:
+                        break
+                    yield from pending.popleft().get()
+                if not pending:
+                    self._over_budget(memory_mb(pids), idle=True)
+                pending.append(pool.apply_async(run_job, (("process_batch", batch),)))
+            while pending:
+                yield from pending.popleft().get()
+
+    def _check_baseline(self, used, where):
+        """Refuse budgets the idle build (plus one loader chunk) already needs."""
+        self.peak_mb = max(self.peak_mb, used)
+        need = used + self.budget_mb * self.CHUNK_SHARE
+        if need > self.budget_mb:
+            raise MemoryError(
+                f"Memory budget {self.budget_mb:g} MB is below what the build needs "
+                f"before any window{where}: {used:.0f} MB plus a "
+                f"{self.CHUNK_SHARE:.0%} chunk share (SENTINEL_MEMORY_MB >= {used / (1 - self.CHUNK_SHARE):.0f})")
+
+    def _over_budget(self, used, idle=False):
+        """
+        Track the peak; above the budget, halve the windows per batch. With
+        nothing in flight (idle) and batches already one window, fail.
+        """
+        self.peak_mb = max(self.peak_mb, used)
+        if used <= self.budget_mb:
+            return False
+        if self.batch_size > 1:
+            self.batch_size = max(1, self.batch_size // 2)
+            print(f"⚠️  {used:.0f} MB over the {self.budget_mb:g} MB budget, "
+                  f"{self.batch_size} windows per batch")
+        elif idle:
+            raise MemoryError(
+                f"Streaming build uses {used:.0f} MB with one window at a time, "
+                f"over the {self.budget_mb:g} MB budget")
+        return True
+
+    def _report_memory(self):
+        """Peak memory of the build (sampled per batch) and max RSS vs the budget."""
+        main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        line = f"📈 Peak memory {self.peak_mb:.0f} MB (budget {self.budget_mb:g} MB); max RSS {main:.0f} MB"
+        if self.builder.workers > 1:
+            worker = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            line += f", largest worker {worker:.0f} MB"
+        print(line)
+        if self.peak_mb > self.budget_mb:
+            print(f"⚠️  Peak exceeded the budget by {self.peak_mb - self.budget_mb:.0f} MB "
+                  f"before batches shrank to {self.batch_size} windows")
+        return self.peak_mb
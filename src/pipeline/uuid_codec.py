@@ -0,0 +1,131 @@
+# src/pipeline/uuid_codec.py
+import numpy as np
+import pandas as pd
+
+UUID_BYTES = 16
+
+# Longest possible literal: b'' + 16 * "\xNN"
+_MAX_LITERAL_LEN = 3 + UUID_BYTES * 4
+_MIN_LITERAL_LEN = 3 + UUID_BYTES
+_BLOCK_ROWS = 65536
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+# char code -> nibble value (-1 = not a hex digit)
+_HEX_VALUE = np.full(128, -1, dtype=np.int16)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_VALUE[ord(_c)] = _i
+for _i, _c in enumerate("ABCDEF"):
+    _HEX_VALUE[ord(_c)] = 10 + _i
+
+# char after a backslash -> byte value (-1 = unsupported escape)
+_SIMPLE_ESCAPE = np.full(128, -1, dtype=np.int16)
+for _c, _v in {"t": 9, "n": 10, "r": 13, "\\": 92, "'": 39, '"': 34}.items():
+    _SIMPLE_ESCAPE[ord(_c)] = _v
+
+
+def _decode_block(strings):
+    """Decode one block of candidate literals (numpy unicode array)."""
+    n = len(strings)
+    codes = np.zeros((n, _MAX_LITERAL_LEN + 4), dtype=np.uint32)
+    width = strings.dtype.itemsize // 4
+    codes[:, :width] = strings.view(np.uint32).reshape(n, width)
+    lengths = np.char.str_len(strings)
+
+    rows = np.arange(n)
+    quote = codes[:, 1]
+    valid = (codes[:, 0] == ord("b")) & ((quote == ord("'")) | (quote == ord('"')))
+
+    out = np.zeros((n, UUID_BYTES), dtype=np.uint8)
+    pos = np.full(n, 2, dtype=np.int64)
+
+    for k in range(UUID_BYTES):
+        c = codes[rows, pos]
+        nxt = np.minimum(codes[rows, pos + 1], 127)
+        hi = _HEX_VALUE[np.minimum(codes[rows, pos + 2], 127)]
+        lo = _HEX_VALUE[np.minimum(codes[rows, pos + 3], 127)]
+
+        is_esc = c == ord("\\")
+        is_hex = is_esc & (nxt == ord("x"))
+        simple = _SIMPLE_ESCAPE[nxt]
+
+        byte = np.where(is_hex, hi * 16 + lo, np.where(is_esc, simple, c.astype(np.int16)))
+
+        # plain chars must be printable ASCII and not the closing quote
+        plain_ok = (c >= 32) & (c < 127) & (c != quote)
+        valid &= np.where(is_hex, (hi >= 0) & (lo >= 0),
+                          np.where(is_esc, simple >= 0, plain_ok))
+
+        out[:, k] = byte.astype(np.uint8)
+        pos += np.where(is_hex, 4, np.where(is_esc, 2, 1))
+
+    # exactly 16 bytes, then the closing quote as the last char
+    valid &= (codes[rows, pos] == quote) & (pos + 1 == lengths)
+    out[~valid] = 0
+    return out, valid
+
+
+def decode_uuid_literals(values):
+    """
+    Vectorized decoder for CDM UUIDs exported as Python bytes literals
+    (b'..' or b".."), e.g. b'>\\xa5\\x80\\x08...'.
+
+    Returns (uint8 array [n, 16], bool mask [n]). Rows that are not a
+    16-byte literal (NaN, hex strings, other lengths) are flagged invalid
+    and left zeroed so callers can fall back to a slower path.
+    """
+    values = np.asarray(values, dtype=object)
+    n = len(values)
+
+    raw = np.zeros((n, UUID_BYTES), dtype=np.uint8)
+    valid = np.zeros(n, dtype=bool)
+    if n == 0:
+        return raw, valid
+
+    strings = np.where(pd.isna(values), "", values).astype(str)
+    lengths = np.char.str_len(strings)
+    candidates = np.flatnonzero(
+        (lengths >= _MIN_LITERAL_LEN) & (lengths <= _MAX_LITERAL_LEN)
+    )
+
+    for start in range(0, len(candidates), _BLOCK_ROWS):
+        idx = candidates[start:start + _BLOCK_ROWS]
+        block = strings[idx].astype(f"U{_MAX_LITERAL_LEN}")
+        raw[idx], valid[idx] = _decode_block(block)
+
+    return raw, valid
+
+
+def uuid_bytes_to_hex(raw):
+    """uint8 array [n, 16] -> array of 32-char lowercase hex strings."""
+    raw = np.asarray(raw, dtype=np.uint8).reshape(-1, UUID_BYTES)
+    chars = np.empty((len(raw), UUID_BYTES * 2), dtype=np.uint8)
+    chars[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    chars[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    return chars.view(f"S{UUID_BYTES * 2}").ravel().astype(str)
+
+
+def uuid_bytes_to_words(raw):
+    """uint8 array [n, 16] -> (hi, lo) uint64 arrays (big-endian halves)."""
+    raw = np.ascontiguousarray(raw, dtype=np.uint8).reshape(-1, UUID_BYTES)
+    words = raw.view(">u8").astype(np.uint64)
+    return words[:, 0].copy(), words[:, 1].copy()
+
+
+def uuid_words_to_bytes(hi, lo):
+    """(hi, lo) uint64 arrays -> uint8 array [n, 16]."""
+    words = np.stack([np.asarray(hi), np.asarray(lo)], axis=1).astype(">u8")
+    return words.view(np.uint8).reshape(-1, UUID_BYTES)
+
+
+def uuid_literals_to_hex(values):
+    """
+    Convenience for lookup tables (subjects.csv, ...): bytes literals -> hex,
+    missing cells -> None, anything else passed through unchanged.
+    """
+    values = np.asarray(values, dtype=object)
+    raw, valid = decode_uuid_literals(values)
+
+    out = np.where(pd.isna(values), None, values).astype(object)
+    out[valid] = uuid_bytes_to_hex(raw[valid])
+    return out
@@ -1,39 +1,141 @@
 # src/pipeline/window_generator.py
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 
+from src.pipeline.ground_truth import GroundTruth
+
 class WindowGenerator:
     """
-    Efficient 1-second window slicing:
+    Efficient window slicing:
     - Only generates windows for timestamps that actually exist
     - Avoids thousands of empty windows
+    - Sorts once and slices windows by offsets (O(events) in total)
+
+    Tumbling by default (stride = window). With stride_seconds < window_seconds
+    windows overlap (hopping), e.g. 5 s windows every 1 s; window starts are
+    aligned to multiples of the stride.
+
+    Labels come from a GroundTruth (set_ground_truth); none set = all benign.
     """
 
-    def __init__(self, window_seconds=1):
+    def __init__(self, window_seconds=1, stride_seconds=None):
         self.window = timedelta(seconds=window_seconds)
-        self.attack_start = None
-        self.attack_end = None
+        self.stride = timedelta(seconds=stride_seconds or window_seconds)
+        if self.stride > self.window or self.window % self.stride:
+            raise ValueError("window_seconds must be a multiple of stride_seconds")
+        self.truth = None
+
+    @property
+    def sliding(self):
+        return self.stride < self.window
+
+    def set_ground_truth(self, truth):
+        self.truth = truth
 
     def set_attack_period(self, start, end):
-        self.attack_start = start
-        self.attack_end = end
+        """One attack interval (shorthand for a single-interval GroundTruth)."""
+        self.truth = GroundTruth.single(start, end)
 
     def generate_windows(self, events):
         """
         FAST: Instead of looping thousands of seconds,
         generate windows only for unique time bins that have events.
         """
-        events = events.copy()
-        events["second_bin"] = events["timestamp"].dt.floor("1S")
+        _, bins, _, _ = self.partition(events)
+        return [(t, t + self.window) for t in bins]
+
+    def partition(self, events):
+        """
+        Sort events by timestamp once and compute each window's row range.
+
+        Returns (sorted_events, window_starts, lo, hi): window i covers rows
+        lo[i]:hi[i] of sorted_events.
+        """
+        if not events["timestamp"].is_monotonic_increasing:
+            events = events.sort_values("timestamp", kind="stable")
+
+        ts = events["timestamp"]
+        stride_bin = ts.dt.floor(self.stride).to_numpy()
+
+        # sorted input -> unique bins are wherever the bin changes
+        if len(stride_bin):
+            change = np.empty(len(stride_bin), dtype=bool)
+            change[0] = True
+            np.not_equal(stride_bin[1:], stride_bin[:-1], out=change[1:])
+            starts = stride_bin[change]
+        else:
+            starts = stride_bin
+
+        # hopping: every stride-aligned start whose window holds a bin
+        if self.sliding:
+            hops = self.window // self.stride
+            back = np.arange(hops) * np.timedelta64(self.stride)
+            starts = np.unique((starts[:, None] - back[None, :]).ravel())
+
+        ts_values = ts.to_numpy()
+        lo = np.searchsorted(ts_values, starts, side="left")
+        hi = np.searchsorted(ts_values, starts + np.timedelta64(self.window), side="left")
+
+        return events, pd.DatetimeIndex(starts), lo, hi
+
+    def iter_windows(self, events):
+        """
+        Lazily yield (ws, we, events_in_window). Each window is an iloc slice
+        (a view) of the once-sorted frame - no per-window full-column scan.
+        """
+        events, starts, lo, hi = self.partition(events)
+        for ws, a, b in zip(starts, lo, hi):
+            yield ws, ws + self.window, events.iloc[a:b]
+
+    def iter_windows_stream(self, chunks):
+        """
+        iter_windows() over a stream of timestamp-ordered chunks (e.g.
+        MultiSourceLoader.iter_chunks()) without holding the whole log.
+
+        A window is emitted once a later chunk proves it complete; rows that
+        can still belong to an unfinished window are carried to the next chunk.
+        A row that belongs to a window already emitted would be lost, so it
+        raises ValueError.
+        """
+        carry = None
+        last_start = None
+
+        def fresh(starts):
+            return starts > last_start if last_start is not None else np.ones(len(starts), bool)
+
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if last_start is not None:
+                oldest = chunk["timestamp"].min()
+                if oldest < last_start + self.window:
+                    raise ValueError(
+                        f"Event at {oldest} belongs to window {last_start}, already emitted: "
+                        f"the chunks are not in timestamp order")
+            buf = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+            buf, starts, lo, hi = self.partition(buf)
+
+            # rows at/after the newest bucket may continue in the next chunk
+            newest = buf["timestamp"].iloc[-1].floor(self.stride)
+            complete = (starts + self.window <= newest) & fresh(starts)
+
+            for ws, a, b in zip(starts[complete], lo[complete], hi[complete]):
+                yield ws, ws + self.window, buf.iloc[a:b]
+                last_start = ws
 
-        # Unique windows with actual events
-        unique_bins = sorted(events["second_bin"].unique())
+            keep_from = newest - self.window + self.stride
+            cut = int(buf["timestamp"].searchsorted(keep_from, side="left"))
+            carry = buf.iloc[cut:].reset_index(drop=True)
 
-        windows = [(t, t + self.window) for t in unique_bins]
-        return windows
+        if carry is not None and len(carry):
+            buf, starts, lo, hi = self.partition(carry)
+            keep = fresh(starts)
+            for ws, a, b in zip(starts[keep], lo[keep], hi[keep]):
+                yield ws, ws + self.window, buf.iloc[a:b]
 
     def label_window(self, ws, we):
         """Label based on attack overlap."""
-        if self.attack_start is None:
+        if self.truth is None:
             return 0
-        return 1 if (ws <= self.attack_end and we >= self.attack_start) else 0
+        return self.truth.label_window(ws, we)
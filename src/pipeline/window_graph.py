@@ -0,0 +1,280 @@
+# src/pipeline/window_graph.py
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+# Event types (edge features) - order defines the int8 event codes
+EVENT_TYPES = [
+    "EVENT_EXECUTE", "EVENT_FORK", "EVENT_SIGNAL", "EVENT_READ", "EVENT_WRITE",
+    "EVENT_OPEN", "EVENT_CREATE", "EVENT_RECVMSG", "EVENT_RECVFROM",
+    "EVENT_RENAME", "EVENT_CLONE", "EVENT_UNIT", "EVENT_MODIFY_PROCESS",
+    "EVENT_SENDMSG", "EVENT_SENDTO", "EVENT_SHM", "EVENT_TEE", "EVENT_SPLICE",
+    "EVENT_VMSPLICE", "EVENT_INIT_MODULE", "EVENT_FINIT_MODULE",
+    "EVENT_SERVICEINSTALL"
+]
+
+# Repeat-behaviour statistics of a coalesced edge (appended to edge_attr)
+EDGE_STAT_KEYS = ["log_count", "span", "gap_mean", "gap_std"]
+
+
+class WindowGraph:
+    """
+    Compact array (COO) form of one window's provenance graph.
+
+    Same semantics as the NetworkX DiGraph GraphConstructor used to build:
+    - nodes in first-appearance order; the last role seen wins for node type
+    - one edge per (subject, object); the last event's type / ts is kept
+
+    Arrays:
+    - node_keys       node labels (hex UUIDs)
+    - node_ids        int32 entity ids (or None without an EntityDictionary)
+    - node_type_flag  int8, 1 = subject, 0 = object
+    - src, dst        int32 node indices, edges grouped by src
+    - event           int8 code into EVENT_TYPES (-1 = other)
+    - ts              int64 ns timestamp
+    - edge_count      int32 number of events coalesced into the edge
+
+    edge_attrs (edge_stats=True), per coalesced edge:
+    - first_ts        int64 ns timestamp of its first event
+    - type_counts     int32 [num_edges, len(EVENT_TYPES)] events per type
+    - gap_sq          float64 sum of squared inter-arrival gaps (s^2)
+    """
+
+    def __init__(self, node_keys, node_type_flag, src, dst, event, ts,
+                 edge_count=None, node_ids=None, edge_attrs=None):
+        self.node_keys = node_keys
+        self.node_ids = node_ids
+        self.node_type_flag = node_type_flag
+        self.src = src
+        self.dst = dst
+        self.event = event
+        self.ts = ts
+        self.edge_count = edge_count if edge_count is not None else np.ones(len(src), np.int32)
+
+        # window-level metadata, per-node outputs (e.g. features), edge stats
+        self.graph = {}
+        self.node_attrs = {}
+        self.edge_attrs = edge_attrs if edge_attrs is not None else {}
+
+    @property
+    def num_nodes(self):
+        return len(self.node_keys)
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    # -----------------------------------------------------------
+    # Construction
+    # -----------------------------------------------------------
+
+    @classmethod
+    def from_events(cls, events_window, edge_stats=True):
+        """Build directly from a window's columns, without per-row Python."""
+        c = coalesce_events(events_window, edge_stats)
+
+        # NetworkX edge order: by source node, then first insertion
+        order = np.lexsort((np.arange(len(c["src"])), c["src"]))
+
+        return cls(
+            node_keys=c["node_keys"],
+            node_type_flag=c["node_type_flag"],
+            src=c["src"][order],
+            dst=c["dst"][order],
+            event=c["event"][order],
+            ts=c["ts"][order],
+            edge_count=c["edge_count"][order],
+            node_ids=c["node_ids"],
+            edge_attrs={k: c[k][order] for k in EDGE_ATTRS if k in c},
+        )
+
+    # -----------------------------------------------------------
+    # Views
+    # -----------------------------------------------------------
+
+    def out_offsets(self):
+        """CSR row pointer over src (edges are already grouped by src)."""
+        counts = np.bincount(self.src, minlength=self.num_nodes)
+        indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return indptr
+
+    def event_names(self):
+        names = np.array(EVENT_TYPES + [None], dtype=object)
+        return names[self.event]
+
+    def edge_stats(self):
+        """EDGE_STAT_KEYS columns, float64 [num_edges, 4] (zeros without edge_attrs)."""
+        if "first_ts" not in self.edge_attrs:
+            return np.zeros((self.num_edges, len(EDGE_STAT_KEYS)), dtype=np.float64)
+        return edge_stat_columns(self.edge_count, self.ts,
+                                 self.edge_attrs["first_ts"], self.edge_attrs["gap_sq"])
+
+    def to_networkx(self):
+        """NetworkX adapter for the visualizer / JSON export / debugging."""
+        G = nx.DiGraph()
+        G.graph.update(self.graph)
+
+        node_types = np.where(self.node_type_flag == 1, "subject", "object").tolist()
+        attr_names = list(self.node_attrs)
+        for i, key in enumerate(self.node_keys):
+            data = {"node_type": node_types[i]}
+            if self.node_ids is not None:
+                data["entity_id"] = int(self.node_ids[i])
+            for name in attr_names:
+                value = self.node_attrs[name][i]
+                data[name] = value.item() if isinstance(value, np.generic) else value
+            G.add_node(key, **data)
+
+        events = self.event_names()
+        for s, d, evt, ts in zip(self.src, self.dst, events, self.ts):
+            G.add_edge(self.node_keys[s], self.node_keys[d],
+                       event=evt, ts=str(pd.Timestamp(ts)))
+
+        if "first_ts" in self.edge_attrs:
+            type_counts = self.edge_attrs["type_counts"]
+            for i, (s, d) in enumerate(zip(self.src, self.dst)):
+                nz = np.flatnonzero(type_counts[i])
+                G.edges[self.node_keys[s], self.node_keys[d]].update(
+                    count=int(self.edge_count[i]),
+                    first_ts=str(pd.Timestamp(self.edge_attrs["first_ts"][i])),
+                    type_counts={EVENT_TYPES[j]: int(type_counts[i, j]) for j in nz},
+                    gap_sq=float(self.edge_attrs["gap_sq"][i]),
+                )
+
+        return G
+
+
+EDGE_ATTRS = ["first_ts", "type_counts", "gap_sq"]
+
+
+def edge_stat_columns(edge_count, ts, first_ts, gap_sq):
+    """
+    EDGE_STAT_KEYS of coalesced edges: log(1 + count), first -> last span
+    and mean / std of the inter-arrival gaps, all in seconds.
+    """
+    count = np.asarray(edge_count, dtype=np.float64)
+    span = (np.asarray(ts) - np.asarray(first_ts)) / 1e9
+    gaps = np.maximum(count - 1, 1)
+    mean = np.where(count > 1, span / gaps, 0.0)
+    var = np.where(count > 1, np.asarray(gap_sq) / gaps - mean ** 2, 0.0)
+    return np.stack([np.log1p(count), span, mean, np.sqrt(np.maximum(var, 0.0))], axis=1)
+
+
+def coalesce_events(events_window, edge_stats=True):
+    """
+    Vectorized core of from_events(). Returns a dict of arrays with nodes
+    and edges both in order of first appearance:
+    node_keys, node_ids (or None), node_type_flag, src, dst, event, ts,
+    edge_count and, with edge_stats, the EDGE_ATTRS.
+    Rows must be in timestamp order.
+    """
+    n_rows = len(events_window)
+    subj = events_window["subject"].to_numpy(dtype=object)
+
+    if "predicate_object" in events_window.columns:
+        obj = events_window["predicate_object"].to_numpy(dtype=object)
+        has_obj = pd.notna(obj) & (obj != "")
+    else:
+        obj = np.full(n_rows, None, dtype=object)
+        has_obj = np.zeros(n_rows, dtype=bool)
+
+    has_ids = "subject_id" in events_window.columns
+
+    # Node appearances in row order: subject, then object (if any)
+    keys = np.empty(2 * n_rows, dtype=object)
+    keys[0::2] = subj
+    keys[1::2] = obj
+    roles = np.tile(np.array([1, 0], dtype=np.int8), n_rows)
+    present = np.ones(2 * n_rows, dtype=bool)
+    present[1::2] = has_obj
+
+    keys = keys[present]
+    roles = roles[present]
+
+    if has_ids:
+        ids = np.empty(2 * n_rows, dtype=np.int64)
+        ids[0::2] = events_window["subject_id"].to_numpy()
+        ids[1::2] = events_window["object_id"].to_numpy()
+        ids = ids[present]
+        codes, node_ids = pd.factorize(ids)
+        node_keys = keys[_first_index(codes)]
+        node_ids = node_ids.astype(np.int32)
+    else:
+        codes, node_keys = pd.factorize(keys)
+        node_keys = np.asarray(node_keys, dtype=object)
+        node_ids = None
+
+    num_nodes = len(node_keys)
+    node_type_flag = roles[_last_index(codes)]
+
+    # Edge rows: node code of each row's subject / object
+    pos = np.cumsum(present) - 1
+    src_all = codes[pos[0::2][has_obj]]
+    dst_all = codes[pos[1::2][has_obj]]
+
+    types = events_window["type"].to_numpy(dtype=object)[has_obj]
+    evt_all = pd.Categorical(types, categories=EVENT_TYPES).codes.astype(np.int8)
+    ts_all = events_window["timestamp"].to_numpy()[has_obj]
+    ts_all = ts_all.astype("datetime64[ns]").view(np.int64)
+
+    # Coalesce repeated (src, dst): keep the last event, remember multiplicity
+    pair = src_all.astype(np.int64) * num_nodes + dst_all
+    pair_codes, pairs = pd.factorize(pair)
+    n_edges = len(pairs)
+
+    first = _first_index(pair_codes)
+    last = _last_index(pair_codes)
+    count = np.bincount(pair_codes, minlength=n_edges).astype(np.int32)
+
+    out = {
+        "node_keys": node_keys,
+        "node_ids": node_ids,
+        "node_type_flag": node_type_flag.astype(np.int8),
+        "src": src_all[first].astype(np.int32),
+        "dst": dst_all[first].astype(np.int32),
+        "event": evt_all[last],
+        "ts": ts_all[last],
+        "edge_count": count,
+    }
+
+    if edge_stats:
+        # events per (edge, type); column 0 collects "other" types
+        k = len(EVENT_TYPES) + 1
+        per_type = np.bincount(pair_codes * k + evt_all.astype(np.int64) + 1,
+                               minlength=n_edges * k).reshape(n_edges, k)
+        out["type_counts"] = per_type[:, 1:].astype(np.int32)
+        out["first_ts"] = ts_all[first]
+
+        # inter-arrival gaps between consecutive events of the same edge
+        order = np.argsort(pair_codes, kind="stable")
+        p, t = pair_codes[order], ts_all[order]
+        same = p[1:] == p[:-1]
+        gaps = np.diff(t)[same] / 1e9
+        out["gap_sq"] = np.bincount(p[1:][same], weights=gaps * gaps, minlength=n_edges)
+
+    return out
+
+
+def _first_index(codes):
+    """
+    Index of the first occurrence of each code, for factorize() codes
+    (numbered in order of first appearance, so a new code exceeds all
+    previous ones).
+    """
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    prev_max = np.maximum.accumulate(codes)
+    is_first = np.empty(len(codes), dtype=bool)
+    is_first[0] = True
+    np.greater(codes[1:], prev_max[:-1], out=is_first[1:])
+    return np.flatnonzero(is_first)
+
+
+def _last_index(codes):
+    """Index of the last occurrence of each code 0..max(codes)."""
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    last = np.full(int(codes.max()) + 1, -1, dtype=np.int64)
+    np.maximum.at(last, codes, np.arange(len(codes)))
+    return last
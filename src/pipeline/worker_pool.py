@@ -0,0 +1,23 @@
+# src/pipeline/worker_pool.py
+import multiprocessing as mp
+
+
+# Read-only state for pool workers (inherited on fork, pickled once on spawn)
+_WORKER = {}
+
+
+def pool_context():
+    """fork where available: workers share the event columns copy-on-write."""
+    methods = mp.get_all_start_methods()
+    return mp.get_context("fork" if "fork" in methods else None)
+
+
+def init_worker(target, events):
+    _WORKER["target"] = target
+    _WORKER["events"] = events
+
+
+def run_job(job):
+    """(method name, tasks) -> list of target.method(events, tasks) results."""
+    method, tasks = job
+    return list(getattr(_WORKER["target"], method)(_WORKER["events"], tasks))
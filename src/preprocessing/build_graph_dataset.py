@@ -14,7 +14,9 @@ import numpy as np
 from datetime import timedelta
 from pathlib import Path
 import json
-import ast
+
+from src.pipeline.event_store import EventStore
+from src.pipeline.ground_truth import GroundTruth
 
 # -----------------------------
 # CONFIG
@@ -38,24 +40,8 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 GRAPH_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def clean_uuid(x):
-    """Convert b'..' UUIDs into hex strings."""
-    if isinstance(x, str) and x.startswith("b'"):
-        try:
-            b = ast.literal_eval(x)
-            return b.hex()
-        except:
-            return x
-    return str(x)
-
-
-# Ground truth attack period
-ATTACK_START = pd.to_datetime("2019-05-07 11:10:00")
-ATTACK_END = pd.to_datetime("2019-05-07 11:11:59")
-
-
-def label_window(ws, we):
-    return 1 if (ws <= ATTACK_END and we >= ATTACK_START) else 0
+# Ground truth attack intervals (default: the 2019-05-07 11:10-11:11:59 period)
+GROUND_TRUTH = GroundTruth.load(DATA_DIR / "ground_truth.csv")
 
 
 # ------------------------------------------------------------
@@ -63,13 +49,11 @@ def label_window(ws, we):
 # ------------------------------------------------------------
 def build_graph_dataset():
     print("📥 Loading events.csv...")
-    events = pd.read_csv(DATA_DIR / "events.csv")
-    events["timestamp"] = pd.to_datetime(events["timestamp"])
+    # cached columnar copy: UUIDs already hex, timestamps already parsed
+    events = EventStore(DATA_DIR / "events.csv").load(types=EXPANDED_EVENTS)
 
     print(f"Loaded {len(events):,} events")
 
-    events = events[events["type"].isin(EXPANDED_EVENTS)]
-
     start_time = events["timestamp"].min()
     end_time = events["timestamp"].max()
 
@@ -79,6 +63,9 @@ def build_graph_dataset():
         windows.append((cursor, cursor + WINDOW))
         cursor += WINDOW
 
+    window_labels = GROUND_TRUTH.label_windows(
+        [ws for ws, _ in windows], [we for _, we in windows])["label"].to_numpy()
+
     label_rows = []
     total_graphs = 0
 
@@ -93,8 +80,8 @@ def build_graph_dataset():
 
         # Add edges + basic nodes
         for _, row in w.iterrows():
-            subj = clean_uuid(row["subject"])
-            obj = clean_uuid(row["predicate_object"]) if isinstance(row["predicate_object"], str) else None
+            subj = row["subject"]
+            obj = row["predicate_object"] if isinstance(row["predicate_object"], str) else None
 
             G.add_node(subj, node_type="subject")
             if obj:
@@ -165,7 +152,7 @@ def build_graph_dataset():
             "window_id": idx,
             "start": ws,
             "end": we,
-            "label": label_window(ws, we),
+            "label": int(window_labels[idx]),
             "num_nodes": len(G.nodes),
             "num_edges": len(G.edges)
         })
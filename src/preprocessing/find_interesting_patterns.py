@@ -7,6 +7,9 @@ import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from src.pipeline.event_store import EventStore
+from src.pipeline.uuid_codec import uuid_literals_to_hex
+
 output_dir = Path('data/processed/analysis/')
 output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -16,11 +19,14 @@ print("="*70)
 
 # Load data
 print("\n📥 Loading data...")
-events_df = pd.read_csv('data/processed/events.csv')
+events_df = EventStore('data/processed/events.csv').load()
 subjects_df = pd.read_csv('data/processed/subjects.csv')
 network_df = pd.read_csv('data/processed/network.csv')
 
-events_df['timestamp'] = pd.to_datetime(events_df['timestamp'])
+# Cached events carry hex UUIDs - convert the lookup table to match
+subjects_df['uuid'] = uuid_literals_to_hex(subjects_df['uuid'])
+subjects_df['parent_subject'] = uuid_literals_to_hex(subjects_df['parent_subject'])
+subjects_by_uuid = subjects_df.drop_duplicates('uuid').set_index('uuid')  # hash index
 
 print(f"✅ Loaded {len(events_df):,} events")
 
@@ -81,9 +87,8 @@ parent_counts = subjects_df[subjects_df['parent_subject'].notna()]['parent_subje
 
 print(f"\n👪 Top processes that spawned children:\n")
 for i, (parent_uuid, child_count) in enumerate(parent_counts.head(5).items(), 1):
-    parent_info = subjects_df[subjects_df['uuid'] == parent_uuid]
-    if not parent_info.empty:
-        cid = parent_info.iloc[0]['cid']
+    if parent_uuid in subjects_by_uuid.index:
+        cid = subjects_by_uuid.at[parent_uuid, 'cid']
         print(f"   {i}. PID {cid}: spawned {child_count} child processes")
 
 # ============================================================================
@@ -155,9 +160,8 @@ if len(rare_events) > 0:
 
 # Target 3: Most active process
 most_active_subject = events_df['subject'].value_counts().index[0]
-subject_info = subjects_df[subjects_df['uuid'] == most_active_subject]
-if not subject_info.empty:
-    cid = subject_info.iloc[0]['cid']
+if most_active_subject in subjects_by_uuid.index:
+    cid = subjects_by_uuid.at[most_active_subject, 'cid']
     targets.append(f"Most active process: PID {cid}")
 
 print("\n📋 Start your investigation here:\n")
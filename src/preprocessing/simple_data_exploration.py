@@ -9,6 +9,9 @@ import seaborn as sns
 from datetime import datetime
 from pathlib import Path
 
+from src.pipeline.event_store import EventStore
+from src.pipeline.uuid_codec import uuid_literals_to_hex
+
 # Set style
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -23,7 +26,7 @@ print("="*70)
 
 # Load the data
 print("\n📥 Loading data...")
-events_df = pd.read_csv('data/processed/events.csv')
+events_df = EventStore('data/processed/events.csv').load()
 subjects_df = pd.read_csv('data/processed/subjects.csv')
 network_df = pd.read_csv('data/processed/network.csv')
 
@@ -31,8 +34,9 @@ print(f"✅ Loaded {len(events_df):,} events")
 print(f"✅ Loaded {len(subjects_df):,} subjects")
 print(f"✅ Loaded {len(network_df):,} network connections")
 
-# Convert timestamps
-events_df['timestamp'] = pd.to_datetime(events_df['timestamp'])
+# Cached events carry hex UUIDs - convert the lookup table to match
+subjects_df['uuid'] = uuid_literals_to_hex(subjects_df['uuid'])
+subjects_by_uuid = subjects_df.drop_duplicates('uuid').set_index('uuid')  # hash index
 
 # ============================================================================
 # 1. EVENT TYPE DISTRIBUTION
@@ -100,10 +104,9 @@ print(f"\nTop 10 most active processes (by number of events):")
 
 for i, (subject_uuid, count) in enumerate(top_subjects.items(), 1):
     # Try to find process info
-    subject_info = subjects_df[subjects_df['uuid'] == subject_uuid]
-    if not subject_info.empty:
-        cid = subject_info.iloc[0]['cid']
-        stype = subject_info.iloc[0]['type']
+    if subject_uuid in subjects_by_uuid.index:
+        cid = subjects_by_uuid.at[subject_uuid, 'cid']
+        stype = subjects_by_uuid.at[subject_uuid, 'type']
         print(f"   {i:2d}. PID {cid} ({stype}): {count:,} events")
     else:
         print(f"   {i:2d}. {subject_uuid[:20]}...: {count:,} events")
@@ -1,26 +1,29 @@
 import torch
 from torch_geometric.loader import DataLoader
-from src.dataset.sentinel_pyg_dataset import SentinelGraphDataset
+from src.dataset.sentinel_pyg_dataset import SentinelInMemoryDataset, NUM_EDGE_FEATURES
 from src.models.gnn_sage import GraphSAGE
+from src.training.utils_training import load_checkpoint
 
 def evaluate():
-    dataset = SentinelGraphDataset(
+    dataset = SentinelInMemoryDataset(
         graphs_dir="data/model_ready/graphs",
-        labels_csv="data/model_ready/labels.csv"
+        labels_csv="data/model_ready/labels.csv",
+        store_dir="data/model_ready/store",
+        feature_keys=GraphSAGE.FEATURE_KEYS,
     )
 
     loader = DataLoader(dataset, batch_size=4)
 
     # MUST MATCH THE TRAINING SCRIPT EXACTLY
     model = GraphSAGE(
-        in_channels=11,
-        edge_channels=22,
+        in_channels=len(GraphSAGE.FEATURE_KEYS),
+        edge_channels=NUM_EDGE_FEATURES,
         hidden_channels=64,
         num_classes=2
     )
 
     # LOAD THE CORRECT CHECKPOINT
-    model.load_state_dict(torch.load("sentinel_gnn_v4.pt"))
+    load_checkpoint(model, "sentinel_gnn_v4.pt")
     model.eval()
 
     correct = 0
@@ -1,32 +1,38 @@
 # src/training/explain_tgnn.py
 
-import torch
 from torch.utils.data import DataLoader
 
 from src.pipeline.sequence_extractor import SequenceExtractor
-from src.dataset.temporal_graph_dataset import TemporalGraphDataset, temporal_collate_fn
+from src.dataset.temporal_graph_dataset import temporal_collate_fn
+from src.models.embedding_cache import WindowEmbeddingCache
 from src.models.tgnn import TGNN
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
+from src.training.utils_training import load_checkpoint
 from src.explainability.importance_extractor import ImportanceExtractor
 from src.explainability.explanation_generator import ExplanationGenerator
 
 def main():
 
     print("🔍 Loading sequences...")
-    seq = SequenceExtractor("data/model_ready/graphs", "data/model_ready/labels.csv")
-    sequences = seq.build_sequences()
+    seq = SequenceExtractor("data/model_ready/graphs", "data/model_ready/labels.csv",
+                            store_dir="data/model_ready/store")
+    dataset = seq.dataset()
 
-    dataset = TemporalGraphDataset(sequences)
     loader = DataLoader(dataset, batch_size=1, shuffle=False,
                         collate_fn=temporal_collate_fn)
 
-    model = TGNN(node_features=18, edge_features=22)
-    state = torch.load("sentinel_tgnn.pt")
-    model.load_state_dict(state, strict=False)
+    model = TGNN(node_features=18, edge_features=NUM_EDGE_FEATURES)
+    load_checkpoint(model, "sentinel_tgnn.pt")
     model.eval()
 
     explainer = ImportanceExtractor(model)
     generator = ExplanationGenerator()
 
+    # predictions from cached window embeddings (each window encoded once);
+    # only the gradient pass below re-encodes a sequence
+    logits, _ = WindowEmbeddingCache(model).predict(dataset)
+    preds = logits.argmax(dim=1).tolist()
+
     print("🚀 Generating explanations for ALL sequences...\n")
 
     for idx, (graph_sequence, label) in enumerate(loader):
@@ -34,9 +40,7 @@ def main():
         graph_sequence = [g for g in graph_sequence]
         label = label.item()
 
-        # Forward pass
-        logits, attn = model(graph_sequence)
-        pred = logits.argmax(dim=1).item()
+        pred = preds[idx]
 
         # Extract importance
         node_scores, edge_scores, temporal_weights = \
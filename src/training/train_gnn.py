@@ -2,16 +2,19 @@ import torch
 from torch_geometric.loader import DataLoader
 from sklearn.model_selection import train_test_split
 
-from src.dataset.sentinel_pyg_dataset import SentinelGraphDataset
+from src.dataset.sentinel_pyg_dataset import SentinelInMemoryDataset, NUM_EDGE_FEATURES
 from src.models.gnn_sage import GraphSAGE
 
 def train():
-    dataset = SentinelGraphDataset(
+    # tensorized once, then served from data/model_ready/processed/
+    dataset = SentinelInMemoryDataset(
         graphs_dir="data/model_ready/graphs",
-        labels_csv="data/model_ready/labels.csv"
+        labels_csv="data/model_ready/labels.csv",
+        store_dir="data/model_ready/store",
+        feature_keys=GraphSAGE.FEATURE_KEYS,
     )
 
-    labels = [dataset[i].y.item() for i in range(len(dataset))]
+    labels = dataset.labels.tolist()
 
     train_idx, val_idx = train_test_split(
         list(range(len(dataset))),
@@ -20,15 +23,12 @@ def train():
         stratify=labels
     )
 
-    train_data = [dataset[i] for i in train_idx]
-    val_data = [dataset[i] for i in val_idx]
-
-    train_loader = DataLoader(train_data, batch_size=8, shuffle=True)
-    val_loader = DataLoader(val_data, batch_size=8)
+    train_loader = DataLoader(dataset[train_idx], batch_size=8, shuffle=True)
+    val_loader = DataLoader(dataset[val_idx], batch_size=8)
 
     model = GraphSAGE(
-    in_channels=11,
-    edge_channels=22)
+    in_channels=len(GraphSAGE.FEATURE_KEYS),
+    edge_channels=NUM_EDGE_FEATURES)
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
 
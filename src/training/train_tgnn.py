@@ -1,38 +1,37 @@
 # src/training/train_tgnn.py
 
 import torch
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, Subset
 from sklearn.model_selection import train_test_split
 
 from src.pipeline.sequence_extractor import SequenceExtractor
-from src.dataset.temporal_graph_dataset import TemporalGraphDataset, temporal_collate_fn
+from src.dataset.temporal_graph_dataset import fused_collate_fn
 from src.models.tgnn import TGNN
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
 
 def train_tgnn():
 
-    seq = SequenceExtractor("data/model_ready/graphs", "data/model_ready/labels.csv")
-    sequences = seq.build_sequences()
+    seq = SequenceExtractor("data/model_ready/graphs", "data/model_ready/labels.csv",
+                            store_dir="data/model_ready/store")
+    dataset = seq.dataset()
 
-    labels = [lab for (_, lab) in sequences]
+    labels = dataset.labels.tolist()
 
     train_idx, val_idx = train_test_split(
-        list(range(len(sequences))),
+        list(range(len(dataset))),
         test_size=0.2,
         shuffle=True,
         stratify=labels
     )
 
-    train_seq = [sequences[i] for i in train_idx]
-    val_seq = [sequences[i] for i in val_idx]
+    train_ds = Subset(dataset, train_idx)
+    val_ds = Subset(dataset, val_idx)
 
-    train_ds = TemporalGraphDataset(train_seq)
-    val_ds = TemporalGraphDataset(val_seq)
-
-    train_loader = DataLoader(train_ds, batch_size=4, shuffle=True, collate_fn=temporal_collate_fn)
-    val_loader = DataLoader(val_ds, batch_size=4, shuffle=False, collate_fn=temporal_collate_fn)
+    train_loader = DataLoader(train_ds, batch_size=4, shuffle=True, collate_fn=fused_collate_fn)
+    val_loader = DataLoader(val_ds, batch_size=4, shuffle=False, collate_fn=fused_collate_fn)
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = TGNN(node_features=18, edge_features=22).to(device)
+    model = TGNN(node_features=18, edge_features=NUM_EDGE_FEATURES).to(device)
 
     criterion = torch.nn.CrossEntropyLoss(weight=torch.tensor([0.3, 0.7]).to(device))
     optim = torch.optim.Adam(model.parameters(), lr=0.002)
@@ -42,11 +41,11 @@ def train_tgnn():
         loss_sum = 0
 
         for batch_graphs, batch_labels in train_loader:
-            batch_graphs = [g.to(device) for g in batch_graphs]
+            batch_graphs = batch_graphs.to(device)
             batch_labels = batch_labels.to(device)
 
             optim.zero_grad()
-            out = model(batch_graphs)
+            out, _ = model(batch_graphs)
             loss = criterion(out, batch_labels)
             loss.backward()
             optim.step()
@@ -60,10 +59,10 @@ def train_tgnn():
 
         with torch.no_grad():
             for batch_graphs, batch_labels in val_loader:
-                batch_graphs = [g.to(device) for g in batch_graphs]
+                batch_graphs = batch_graphs.to(device)
                 batch_labels = batch_labels.to(device)
 
-                preds = model(batch_graphs).argmax(dim=1)
+                preds = model(batch_graphs)[0].argmax(dim=1)
                 correct += (preds == batch_labels).sum().item()
                 total += batch_labels.size(0)
 
@@ -2,6 +2,8 @@ import torch
 from torch.nn import CrossEntropyLoss
 from torch.optim import Adam
 
+from src.dataset.sentinel_pyg_dataset import NUM_EDGE_FEATURES
+
 def get_optimizer(model, lr=0.001):
     return Adam(model.parameters(), lr=lr)
 
@@ -10,3 +12,18 @@ def get_loss():
 
 def accuracy(preds, labels):
     return (preds.argmax(dim=1) == labels).float().mean().item()
+
+def load_checkpoint(model, path):
+    """
+    Load a state dict strictly. A checkpoint from before edge_attr grew to
+    NUM_EDGE_FEATURES columns (or of another architecture) fails loudly
+    instead of leaving the edge projection randomly initialised.
+    """
+    try:
+        model.load_state_dict(torch.load(path, map_location="cpu"))
+    except RuntimeError as e:
+        raise RuntimeError(
+            f"{path} does not match {type(model).__name__}: retrain the model for the "
+            f"{NUM_EDGE_FEATURES}-column edge features (older checkpoints were trained on 22).\n{e}"
+        ) from None
+    return model
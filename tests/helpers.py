@@ -0,0 +1,31 @@
+"""Synthetic inputs and reference implementations shared by tests and benchmarks."""
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.window_graph import EVENT_TYPES
+
+
+def random_window(n=400, n_entities=40, seed=0):
+    """One second of random events over n_entities keys (10% without object)."""
+    rng = np.random.default_rng(seed)
+    keys = [f"{i:032x}" for i in range(n_entities)]
+    obj = [keys[i] for i in rng.integers(0, n_entities, n)]
+    for i in rng.choice(n, n // 10, replace=False):
+        obj[i] = None
+    ts = pd.Timestamp("2019-05-07 11:10:00") + pd.to_timedelta(
+        np.sort(rng.integers(0, 10**9, n)), unit="ns")
+    return pd.DataFrame({
+        "timestamp": ts,
+        "type": rng.choice(EVENT_TYPES[:6], n),
+        "subject": [keys[i] for i in rng.integers(0, n_entities, n)],
+        "predicate_object": obj,
+    })
+
+
+def loop_edge_correction(x, edge_index, correction):
+    """The original GraphSAGE / GraphSAGEEncoder per-edge correction loop."""
+    x = x.clone()
+    for i, (src, dst) in enumerate(edge_index.t()):
+        x[src] += correction[i]
+    return x
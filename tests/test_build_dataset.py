@@ -0,0 +1,230 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dataset.sentinel_pyg_dataset import SentinelGraphDataset
+from src.pipeline.build_dataset import DatasetBuilder
+from src.pipeline.event_loader import EventLoader
+from src.pipeline.event_store import EventStore
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.graph_store import GraphStore
+from src.pipeline.sequence_extractor import SequenceExtractor
+from src.pipeline.streaming_build import StreamingBuild
+from src.pipeline.window_graph import EVENT_TYPES
+
+
+def _literal(i):
+    return "b'" + "".join(f"\\x{b:02x}" for b in int(i).to_bytes(16, "big")) + "'"
+
+
+def _write_events(root, n=1200, seconds=12, seed=0):
+    """events.csv spanning the default attack period start (11:10:00)."""
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp("2019-05-07 11:09:54") + pd.to_timedelta(
+        np.sort(rng.integers(0, seconds * 10**9, n)), unit="ns")
+    obj = [_literal(1000 + i) for i in rng.integers(0, 200, n)]
+    for i in rng.choice(n, n // 20, replace=False):
+        obj[i] = ""
+    events = pd.DataFrame({
+        "uuid": [_literal(10**6 + i) for i in range(n)],
+        "timestamp": ts.astype(str),
+        "type": rng.choice(EVENT_TYPES[:6], n),
+        "subject": [_literal(i) for i in rng.integers(0, 20, n)],
+        "predicate_object": obj,
+        "size": 1,
+    })
+    (root / "data" / "processed").mkdir(parents=True, exist_ok=True)
+    events.to_csv(root / "data" / "processed" / "events.csv", index=False)
+    return events
+
+
+def _build(**kwargs):
+    """Run a build in the cwd -> (labels.csv frame, {window_id: store arrays})."""
+    DatasetBuilder(**kwargs).run()
+    labels = pd.read_csv("data/model_ready/labels.csv")
+    store = GraphStore("data/model_ready/store")
+    arrays = {wid: {k: np.array(v) for k, v in store.arrays(wid).items()}
+              for wid in labels["window_id"]}
+    return labels, arrays
+
+
+def _assert_same(a, b, skip=()):
+    pd.testing.assert_frame_equal(a[0], b[0])
+    assert a[1].keys() == b[1].keys()
+    for wid in a[1]:
+        for k in a[1][wid].keys() - set(skip):
+            np.testing.assert_array_equal(a[1][wid][k], b[1][wid][k], err_msg=f"{wid} {k}")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_streaming_matches_in_memory_build(tmp_path, monkeypatch, workers):
+    monkeypatch.chdir(tmp_path)
+    _write_events(tmp_path)
+
+    batch = _build(workers=workers)
+    monkeypatch.setattr(StreamingBuild, "BATCH", 4)
+    streamed = _build(workers=workers, memory_budget_mb=65536)
+
+    assert 0 < batch[0]["label"].sum() < len(batch[0])
+    _assert_same(streamed, batch)
+
+
+def test_streaming_keeps_rows_later_than_the_slack(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    events = _write_events(tmp_path)
+    # an event of 11:09:55 written 8 s late in the export, past the 1 s slack
+    order = list(range(len(events)))
+    order.insert(900, order.pop(150))
+    events.iloc[order].to_csv(tmp_path / "data" / "processed" / "events.csv", index=False)
+
+    # 100-row cache runs and batches, so the late row lands in another chunk
+    monkeypatch.setattr(EventLoader, "_store", lambda self: EventStore(self.path, self.cache_dir, 100))
+    batch = _build()
+    monkeypatch.setattr(StreamingBuild, "BATCH", 4)
+    streamed = _build(memory_budget_mb=65536)
+    _assert_same(streamed, batch)
+
+
+@pytest.mark.parametrize("kwargs, match", [
+    (dict(memory_budget_mb=4096, resolutions=[1, 10]), "does not support resolutions"),
+    (dict(memory_budget_mb=4096, compact_hubs=True, entity_history=True),
+     "does not support compact_hubs, entity_history"),
+    (dict(resolutions=[1, 10], entity_history=True), "entity_history is not supported"),
+    (dict(resolutions=[1, 10], stride_seconds=1), "stride_seconds is not supported"),
+    (dict(resolutions=[2, 10], window_seconds=1), "conflicts with the finest resolution"),
+])
+def test_unsupported_options_are_rejected(tmp_path, monkeypatch, kwargs, match):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError, match=match):
+        DatasetBuilder(**kwargs)
+    assert not (tmp_path / "data").exists()   # rejected before anything is opened
+
+
+def test_streaming_rejects_budget_below_baseline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_events(tmp_path, n=100)
+    with pytest.raises(MemoryError, match="below what the build needs"):
+        DatasetBuilder(memory_budget_mb=1).run()
+
+
+def test_streaming_shrinks_batches_then_fails_over_budget(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _write_events(tmp_path)
+    monkeypatch.setattr(StreamingBuild, "BATCH", 4)
+    usage = iter([10.0] + [1000.0] * 100)   # idle build, then every batch over budget
+    monkeypatch.setattr("src.pipeline.streaming_build.memory_mb", lambda pids=(): next(usage))
+
+    with pytest.raises(MemoryError, match="one window at a time"):
+        DatasetBuilder(memory_budget_mb=100).run()
+    out = capsys.readouterr().out
+    assert "2 windows per batch" in out and "1 windows per batch" in out
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sliding_build_reuses_columns_exactly(tmp_path, monkeypatch, workers):
+    monkeypatch.chdir(tmp_path)
+    _write_events(tmp_path)
+
+    sliding = _build(workers=workers, window_seconds=3, stride_seconds=1, incremental=False)
+    monkeypatch.setattr("src.pipeline.incremental_graph.IncrementalWindowGraph.node_columns",
+                        lambda self, wg: {})
+    rebuilt = _build(workers=workers, window_seconds=3, stride_seconds=1, incremental=False)
+
+    _assert_same(sliding, rebuilt)
+
+
+def test_readers_refuse_features_the_build_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_events(tmp_path, n=300)
+    DatasetBuilder(features="graphsage").run()
+
+    graphsage = FeatureEngineer.FEATURE_SETS["graphsage"]
+    out = "data/model_ready"
+    assert GraphStore(f"{out}/store").meta["features"] == graphsage
+    assert len(SentinelGraphDataset(f"{out}/graphs", f"{out}/labels.csv", f"{out}/store", graphsage)) > 0
+
+    for store_dir in (f"{out}/store", None):   # packed store, then the JSON files
+        with pytest.raises(ValueError, match="without node features"):
+            SentinelGraphDataset(f"{out}/graphs", f"{out}/labels.csv", store_dir)[0]
+        with pytest.raises(ValueError, match="without node features"):
+            SequenceExtractor(f"{out}/graphs", f"{out}/labels.csv", store_dir=store_dir).load_graph(0)
+
+
+def _fresh(tmp_path, monkeypatch, events, name, **kwargs):
+    """From-scratch build of events in tmp_path / name."""
+    root = tmp_path / name
+    (root / "data" / "processed").mkdir(parents=True)
+    events.to_csv(root / "data" / "processed" / "events.csv", index=False)
+    monkeypatch.chdir(root)
+    return _build(**kwargs)
+
+
+def _graph_files():
+    return sorted(p.name for p in Path("data/model_ready/graphs").glob("window_*"))
+
+
+def test_workers_do_not_change_the_build(tmp_path, monkeypatch):
+    events = _write_events(tmp_path)
+    one = _fresh(tmp_path, monkeypatch, events, "one", workers=1)
+    many = _fresh(tmp_path, monkeypatch, events, "many", workers=3)
+    _assert_same(one, many)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_incremental_rebuild_after_append_and_delete(tmp_path, monkeypatch, capsys, workers):
+    monkeypatch.chdir(tmp_path)
+    events = _write_events(tmp_path)
+    _build(workers=workers)
+    csv = tmp_path / "data" / "processed" / "events.csv"
+
+    # append two seconds: only the two new windows are built
+    more = _write_events(tmp_path / "more", n=200, seconds=2, seed=1)
+    more["timestamp"] = (pd.to_datetime(more["timestamp"]) + pd.Timedelta(seconds=12)).astype(str)
+    events = pd.concat([events, more], ignore_index=True)
+    events.to_csv(csv, index=False)
+    capsys.readouterr()
+    monkeypatch.chdir(tmp_path)
+    appended = _build(workers=workers)
+    assert "♻️  12 windows unchanged, 2 to build" in capsys.readouterr().out
+    assert _graph_files() == sorted(f"window_{i:04d}.{ext}" for i in range(14) for ext in ("json", "npz"))
+    # entity ids depend on the order the persistent dictionary met entities
+    _assert_same(appended, _fresh(tmp_path, monkeypatch, events, "append", workers=workers), ["node_id"])
+
+    # drop the first two seconds and thin out one window: later windows are
+    # renumbered and reused, stale graph files go
+    ts = pd.to_datetime(events["timestamp"])
+    keep = (ts >= "2019-05-07 11:09:56") & ~((ts.dt.second == 0) & (np.arange(len(events)) % 2 == 0))
+    events = events[keep]
+    monkeypatch.chdir(tmp_path)
+    events.to_csv(csv, index=False)
+    capsys.readouterr()
+    deleted = _build(workers=workers)
+    assert "♻️  11 windows unchanged, 1 to build" in capsys.readouterr().out
+    assert _graph_files() == sorted(f"window_{i:04d}.{ext}" for i in range(12) for ext in ("json", "npz"))
+    _assert_same(deleted, _fresh(tmp_path, monkeypatch, events, "delete", workers=workers), ["node_id"])
+
+
+def test_interrupted_build_resumes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    events = _write_events(tmp_path)
+
+    process = DatasetBuilder._process_window
+    calls, stop = [], [5]
+
+    def counted(self, *args, **kwargs):
+        if len(calls) == stop[0]:
+            raise KeyboardInterrupt
+        calls.append(args[0])
+        return process(self, *args, **kwargs)
+
+    monkeypatch.setattr(DatasetBuilder, "_process_window", counted)
+    with pytest.raises(KeyboardInterrupt):
+        DatasetBuilder().run()
+    assert Path("data/model_ready/build_progress.jsonl").exists()
+
+    stop[0] = None
+    resumed = _build()
+    assert calls == list(range(12))   # the first five are not built twice
+    _assert_same(resumed, _fresh(tmp_path, monkeypatch, events, "fresh"))
@@ -0,0 +1,122 @@
+import pandas as pd
+import torch
+
+from src.dataset.sentinel_pyg_dataset import SentinelGraphDataset, SentinelInMemoryDataset
+from src.dataset.temporal_graph_dataset import fused_collate_fn, temporal_collate_fn
+from src.models.embedding_cache import WindowEmbeddingCache
+from src.models.tgnn import TGNN
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.graph_exporter import GraphExporter
+from src.pipeline.graph_store import GraphStore
+from src.pipeline.sequence_extractor import SequenceExtractor
+from src.pipeline.window_graph import WindowGraph
+from tests.helpers import random_window
+
+
+def _write_dataset(root, n=6):
+    exporter = GraphExporter(root / "graphs", formats=("json", "npz"))
+    for wid in range(n):
+        wg = WindowGraph.from_events(random_window(n=200, n_entities=30, seed=wid))
+        exporter.save(FeatureEngineer().add_window_features(wg), wid)
+    pd.DataFrame({"window_id": range(n), "label": [wid % 2 for wid in range(n)]}).to_csv(
+        root / "labels.csv", index=False)
+    GraphStore.write(root / "store", ((wid, exporter.load_arrays(wid)) for wid in range(n)))
+
+
+def test_in_memory_dataset_matches_and_is_cached(tmp_path, monkeypatch):
+    _write_dataset(tmp_path)
+    args = (str(tmp_path / "graphs"), str(tmp_path / "labels.csv"), str(tmp_path / "store"),
+            FeatureEngineer.FEATURE_SETS["graphsage"])
+
+    ref = SentinelGraphDataset(*args)
+    ds = SentinelInMemoryDataset(*args)
+    assert ds.labels.tolist() == [0, 1, 0, 1, 0, 1]
+    for i in range(len(ref)):
+        for k in ("x", "edge_index", "edge_attr", "y", "node_id"):
+            assert torch.equal(ds[i][k], ref[i][k])
+    assert ds[[4, 1]].labels.tolist() == [0, 1]
+
+    # another feature list gets its own cache
+    SentinelInMemoryDataset(*args[:3])
+    assert len(list((tmp_path / "processed").glob("sentinel_*.pt"))) == 2
+
+    # a rebuilt dataset replaces its stale cache
+    (tmp_path / "labels.csv").write_text((tmp_path / "labels.csv").read_text() + "6,1\n")
+    assert len(SentinelInMemoryDataset(*args)) == len(ref)
+    assert len(list((tmp_path / "processed").glob("sentinel_*.pt"))) == 2
+
+    # second open loads the cached block without touching the graphs
+    monkeypatch.setattr(SentinelInMemoryDataset, "process", lambda self: 1 / 0)
+    assert len(SentinelInMemoryDataset(*args)) == len(ref)
+
+
+def test_lazy_sequences_share_windows(tmp_path, monkeypatch):
+    _write_dataset(tmp_path, n=8)
+    seq = SequenceExtractor(str(tmp_path / "graphs"), str(tmp_path / "labels.csv"),
+                            store_dir=str(tmp_path / "store"))
+    loads = []
+    load_graph = seq.load_graph
+    monkeypatch.setattr(seq, "load_graph", lambda wid: loads.append(wid) or load_graph(wid))
+
+    ds = seq.dataset(seq_len=4, stride=3)
+    assert ds.labels.tolist() == [1, 1]
+    for i, start in enumerate((0, 3)):
+        graphs, label = ds.sequence(i)
+        for wid, g in zip(range(start, start + 4), graphs):
+            assert torch.equal(g.x, load_graph(wid).x)
+    assert sorted(loads) == list(range(7))   # window 3 only once, window 7 never
+    assert list(ds.graphs) == [0, 1, 2, 3, 4, 5, 6]    # LRU of seq_len + stride
+
+    # a whole epoch keeps at most cache_size windows
+    ds = seq.dataset(seq_len=3)
+    loads.clear()
+    for i in range(len(ds)):
+        ds.sequence(i)
+        assert len(ds.graphs) <= ds.cache_size == 4
+    assert sorted(loads) == list(range(8))
+
+    assert seq.dataset(seq_len=1).labels.tolist() == [0, 1] * 4
+    assert [lab for _, lab in seq.build_sequences()] == [1] * 6
+
+
+def test_fused_collate_matches_per_timestep(tmp_path):
+    _write_dataset(tmp_path, n=8)
+    ds = SequenceExtractor(str(tmp_path / "graphs"), str(tmp_path / "labels.csv"),
+                           store_dir=str(tmp_path / "store")).dataset(seq_len=3)
+    items = [ds[i] for i in range(4)]
+
+    steps, labels = temporal_collate_fn(items)
+    fused, fused_labels = fused_collate_fn(items)
+    assert fused.num_graphs == 12 and torch.equal(labels, fused_labels)
+    assert fused.sample.tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3]
+
+    torch.manual_seed(0)
+    model = TGNN().eval()
+    with torch.no_grad():
+        ref, ref_attn = model(steps)
+        got, got_attn = model(fused)
+    assert torch.allclose(ref, got, atol=1e-6) and torch.allclose(ref_attn, got_attn, atol=1e-6)
+
+
+def test_window_embedding_cache_matches_full_forward(tmp_path):
+    _write_dataset(tmp_path, n=8)
+    ds = SequenceExtractor(str(tmp_path / "graphs"), str(tmp_path / "labels.csv"),
+                           store_dir=str(tmp_path / "store")).dataset(seq_len=3, stride=2)
+    torch.manual_seed(0)
+    model = TGNN().eval()
+    with torch.no_grad():
+        ref, ref_attn = model(fused_collate_fn([ds[i] for i in range(len(ds))])[0])
+
+    cache = WindowEmbeddingCache(model)
+    logits, attn = cache.predict(ds)
+    assert torch.allclose(logits, ref, atol=1e-6) and torch.allclose(attn, ref_attn, atol=1e-6)
+    assert cache.misses == 7   # windows 0..6, each once
+
+    cache.predict(ds)
+    assert cache.misses == 7 and cache.hits == 7
+
+    # new weights -> new version, nothing reused
+    with torch.no_grad():
+        model.encoder.project.bias.add_(1.0)
+    cache.predict(ds)
+    assert cache.misses == 14
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.entity_dictionary import EntityDictionary
+from src.pipeline.entity_enricher import EntityEnricher
+from src.pipeline.uuid_codec import uuid_literals_to_hex
+
+
+def _uuid(b):
+    return "b'" + f"\\x{b:02x}" * 16 + "'"
+
+
+def test_enricher_joins_entity_tables_by_id(tmp_path):
+    pd.DataFrame({
+        "uuid": [_uuid(1), _uuid(2)],
+        "type": ["SUBJECT_PROCESS", "SUBJECT_THREAD"],
+        "cid": [100, 200],
+        "parent_subject": [None, _uuid(1)],
+        "cmd_line": ["cmd.exe /c whoami", None],
+    }).to_csv(tmp_path / "subjects.csv", index=False)
+    pd.DataFrame({
+        "uuid": [_uuid(3)],
+        "local_port": [53522],
+        "remote_address": ["10.0.0.5"],
+        "remote_port": [443],
+        "ip_protocol": [6],
+    }).to_csv(tmp_path / "network.csv", index=False)
+
+    entities = EntityDictionary()
+    enricher = EntityEnricher.from_tables(tmp_path, entities)
+
+    # subjects, netflow, an unknown UUID and an id interned after loading
+    ids = entities.lookup(uuid_literals_to_hex(pd.Series([_uuid(2), _uuid(3), _uuid(1)])))
+    late = entities.intern(np.array(["ff" * 16], dtype=object))
+    a = enricher.attributes(np.concatenate([ids, [-1], late]))
+
+    kinds = [EntityDictionary.KINDS[k] for k in a["node_kind"]]
+    assert kinds == ["subject", "netflow", "subject", "unknown", "unknown"]
+    assert a["cid"].tolist() == [200, -1, 100, -1, -1]
+    assert a["parent_id"].tolist() == [ids[2], -1, -1, -1, -1]
+    assert a["cmd_line"].tolist() == [None, None, "cmd.exe /c whoami", None, None]
+    assert a["remote_port"].tolist() == [-1, 443, -1, -1, -1]
+    assert a["subject_type"][0] == "SUBJECT_THREAD"
+
+
+def test_interning_chunks_matches_one_pass(tmp_path):
+    rng = np.random.default_rng(0)
+    chunks = [np.array([f"{i:032x}" for i in rng.integers(0, 5000, 300)], dtype=object)
+              for _ in range(60)]
+    chunks[3][::7] = None
+
+    d = EntityDictionary(tmp_path / "entities.csv")
+    got = np.concatenate([d.intern(c) for c in chunks])
+
+    values = np.concatenate(chunks)
+    codes, uniq = pd.factorize(values)
+    assert np.array_equal(got, codes)            # ids in first-appearance order, None -> -1
+    assert len(d) == len(uniq) and len(d._blocks) <= np.log2(len(d)) + 1
+    assert d.table["uuid"].tolist() == list(uniq)
+    assert np.array_equal(d.lookup(values), codes)
+
+    d.save()
+    again = EntityDictionary.open(tmp_path / "entities.csv")
+    assert np.array_equal(again.intern(values), codes) and len(again) == len(d)
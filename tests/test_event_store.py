@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.event_loader import EventLoader
+from src.pipeline.event_store import EventStore
+
+
+def test_cached_load_matches_csv_on_mixed_ids(tmp_path):
+    literal = "b'" + "\\x01" * 16 + "'"
+    pd.DataFrame({
+        "timestamp": [f"2019-05-07 11:10:0{i}" for i in range(6)],
+        "type": ["EVENT_READ", "EVENT_WRITE", "EVENT_OPEN", "EVENT_READ", "EVENT_EXECUTE", "EVENT_READ"],
+        "subject": [literal, "3fa85f6457174562b3fc2c963f66afa6", "b'\\x02\\x03'", literal,
+                    "not-a-uuid", literal],
+        "predicate_object": ["aa" * 16, literal, None, "b'" + "\\x04" * 15 + "'", literal, ""],
+    }).to_csv(tmp_path / "events.csv", index=False)
+
+    plain = EventLoader(tmp_path / "events.csv", use_cache=False).load()
+    cached = EventLoader(tmp_path / "events.csv", cache_dir=tmp_path / "cache").load()
+    again = EventLoader(tmp_path / "events.csv", cache_dir=tmp_path / "cache").load()
+
+    assert plain["subject"][1] == "3fa85f6457174562b3fc2c963f66afa6"
+    for df in (cached, again):
+        pd.testing.assert_frame_equal(
+            df.assign(type=df["type"].astype(object)).reset_index(drop=True),
+            plain.assign(type=plain["type"].astype(object)).reset_index(drop=True))
+
+    streamed = pd.concat(EventLoader(tmp_path / "events.csv", cache_dir=tmp_path / "cache",
+                                     chunksize=2).iter_chunks(), ignore_index=True)
+    assert streamed["subject"].tolist() == plain["subject"].tolist()
+    assert streamed["predicate_object"].tolist() == plain["predicate_object"].tolist()
+
+
+def _write_late_events(path, moves=((51, 66), (101, 301))):
+    """Events every 100 ms, with rows moved later in the file: (row, before row)."""
+    ts = pd.Timestamp("2019-05-07 11:10:00") + pd.to_timedelta(range(0, 40_000, 100), unit="ms")
+    events = pd.DataFrame({
+        "timestamp": ts.astype(str),
+        "type": "EVENT_READ",
+        "subject": [f"{i % 7:032x}" for i in range(len(ts))],
+        "predicate_object": [f"{i:032x}" for i in range(len(ts))],
+    })
+    order = list(range(len(events)))
+    for row, late in moves:
+        order.remove(row)
+        order.insert(order.index(late), row)
+    events.iloc[order].to_csv(path, index=False)
+
+
+def test_cache_is_sorted_when_rows_arrive_late(tmp_path):
+    # one row 1.5 s late, another 20 s: both beyond the 1 s reorder slack
+    _write_late_events(tmp_path / "events.csv")
+
+    plain = EventLoader(tmp_path / "events.csv", use_cache=False).load()
+    expected = plain.sort_values("timestamp", kind="stable", ignore_index=True)
+    store = EventStore(tmp_path / "events.csv", tmp_path / "cache", chunksize=50)
+
+    cached = store.load()
+    assert cached["timestamp"].is_monotonic_increasing
+    assert store.path.exists() and not store.path.with_suffix(".parquet.tmp").exists()
+    for k in ("timestamp", "subject", "predicate_object"):
+        assert cached[k].tolist() == expected[k].tolist(), k
+
+    streamed = pd.concat(store.iter_batches(batch_size=30), ignore_index=True)
+    assert streamed["timestamp"].tolist() == expected["timestamp"].tolist()
+
+
+def test_uncached_stream_refuses_rows_later_than_the_slack(tmp_path):
+    _write_late_events(tmp_path / "ok.csv", moves=((51, 56),))   # 0.5 s late
+    loader = EventLoader(tmp_path / "ok.csv", chunksize=20, use_cache=False)
+    streamed = pd.concat(loader.iter_chunks(), ignore_index=True)
+    assert streamed["timestamp"].is_monotonic_increasing and len(streamed) == 400
+
+    _write_late_events(tmp_path / "late.csv", moves=((51, 150),))  # 9.9 s late
+    loader = EventLoader(tmp_path / "late.csv", chunksize=20, use_cache=False)
+    with pytest.raises(ValueError, match="11:10:05.100000 arrives after"):
+        list(loader.iter_chunks())
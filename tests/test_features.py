@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.centrality import CentralityEngine
+from src.pipeline.entity_state import EntityStateStore
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.window_graph import WindowGraph
+from tests.helpers import random_window
+
+
+def _compare(w):
+    fe = FeatureEngineer()
+    wg = WindowGraph.from_events(w)
+
+    G = fe.compute_node_features(wg.to_networkx())
+    expected = np.array(
+        [[float(G.nodes[k][f]) for f in fe.NODE_KEYS] for k in wg.node_keys]
+    )
+    got = fe.compute_feature_matrix(wg)
+
+    assert got.shape == (wg.num_nodes, len(fe.NODE_KEYS))
+    assert got.dtype == np.float32
+    np.testing.assert_allclose(got, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_batch_features_match_per_node_loop():
+    _compare(random_window(n=400, n_entities=40))
+
+
+def test_batch_features_bursty_window():
+    # few entities, many events: exercises burst_flag and entropy
+    _compare(random_window(n=2000, n_entities=8, seed=3))
+
+
+def test_approximate_centrality_within_bound():
+    wg = WindowGraph.from_events(random_window(n=3000, n_entities=300, seed=5))
+    exact, mode, _ = CentralityEngine().compute(wg.num_nodes, wg.src, wg.dst)
+    approx, amode, err = CentralityEngine(budget=0, min_pivots=64).compute(
+        wg.num_nodes, wg.src, wg.dst)
+
+    assert mode == "exact" and amode == "approx(k=64)"
+    np.testing.assert_allclose(approx["cluster_coeff"], exact["cluster_coeff"], atol=1e-12)
+    np.testing.assert_allclose(approx["pagerank"], exact["pagerank"], atol=1e-6)
+
+    # sampling error measured on this window (seeded pivots)
+    assert np.abs(approx["betweenness"] - exact["betweenness"]).max() <= min(err, 0.015)
+    assert np.abs(approx["closeness"] - exact["closeness"]).max() <= 0.035
+
+    # every node a pivot: the estimators are exact
+    full, fmode, _ = CentralityEngine(budget=0, min_pivots=wg.num_nodes).compute(
+        wg.num_nodes, wg.src, wg.dst)
+    assert fmode == f"approx(k={wg.num_nodes})"
+    for k in ("closeness", "betweenness"):
+        np.testing.assert_allclose(full[k], exact[k], atol=1e-12)
+
+
+def test_feature_subset_and_cached_columns():
+    wg = WindowGraph.from_events(random_window(n=400, n_entities=40))
+    full = FeatureEngineer().compute_feature_columns(wg)
+
+    sage = FeatureEngineer(keys="graphsage")
+    assert sage.keys == FeatureEngineer.NODE_KEYS[:11]
+    assert FeatureEngineer.cost("graphsage") > FeatureEngineer.cost(["degree", "ts_var"])
+
+    cols = FeatureEngineer(keys=["pagerank", "degree"]).compute_feature_columns(wg)
+    assert set(cols) == {"pagerank", "degree"}
+    for k in cols:
+        np.testing.assert_allclose(cols[k], full[k])
+
+    # a superset reuses cached columns instead of recomputing them
+    class NoCentrality(CentralityEngine):
+        def compute(self, *args, **kwargs):
+            raise AssertionError("centralities should come from the cache")
+
+    cached = {k: full[k] for k in FeatureEngineer.NODE_KEYS[:11]}
+    got = FeatureEngineer(centrality=NoCentrality()).compute_feature_columns(wg, cached=cached)
+    for k in FeatureEngineer.NODE_KEYS:
+        np.testing.assert_allclose(got[k], full[k])
+
+
+def test_entity_state_matches_full_history(tmp_path):
+    events = pd.concat([random_window(n=500, n_entities=30, seed=s) for s in range(3)])
+    events["timestamp"] += pd.to_timedelta(np.repeat(np.arange(3), 500), unit="s")
+    events["subject_id"] = events["subject"].map(lambda k: int(k, 16)).astype(np.int32)
+    events["object_id"] = events["predicate_object"].map(
+        lambda k: -1 if k is None else int(k, 16)).astype(np.int32)
+
+    # three chunks through a tiny LRU (forces SQLite round trips), reopened midway
+    store = EntityStateStore(tmp_path / "state.sqlite", cache_size=4)
+    store.ingest(events.iloc[:500])
+    store.close()
+    store = EntityStateStore(tmp_path / "state.sqlite", cache_size=4)
+    store.ingest(events.iloc[500:700])
+    store.ingest(events.iloc[700:])
+    as_of = events["timestamp"].max() + pd.Timedelta(seconds=1)
+    got = store.history(np.arange(31), as_of)
+
+    rows = pd.concat([
+        events[["subject_id", "timestamp", "type"]].set_axis(["id", "timestamp", "type"], axis=1),
+        events[events["object_id"] >= 0][["object_id", "timestamp", "type"]].set_axis(["id", "timestamp", "type"], axis=1),
+    ]).sort_values(["id", "timestamp"], kind="stable")
+    for eid, g in rows.groupby("id"):
+        t = g["timestamp"].astype("int64").to_numpy()
+        gaps = np.diff(t) / 1e9
+        h = got.loc[eid]
+        assert h["hist_event_count"] == len(g)
+        assert h["hist_type_count"] == g["type"].nunique()
+        assert h["hist_age"] == pytest.approx((as_of.value - t[0]) / 1e9)
+        assert h["hist_since_last"] == pytest.approx((as_of.value - t[-1]) / 1e9)
+        assert h["hist_gap_mean"] == pytest.approx(gaps.mean() if len(gaps) else 0.0)
+        assert h["hist_gap_std"] == pytest.approx(gaps.std() if len(gaps) else 0.0, abs=1e-9)
+
+    # unseen entities read as zeros
+    assert (got.loc[30] == 0).all()
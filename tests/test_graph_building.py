@@ -0,0 +1,192 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.feature_engineer import FeatureEngineer
+from src.pipeline.graph_constructor import GraphConstructor
+from src.pipeline.hub_compactor import HubCompactor
+from src.pipeline.incremental_graph import IncrementalWindowGraph
+from src.pipeline.window_generator import WindowGenerator
+from src.pipeline.window_graph import EVENT_TYPES, WindowGraph
+from src.pipeline.window_rollup import WindowRollup
+from tests.helpers import random_window
+
+
+def _reference_graph(events_window):
+    """The original per-row GraphConstructor.build_graph."""
+    G = nx.DiGraph()
+    for _, row in events_window.iterrows():
+        subj = row["subject"]
+        obj = row["predicate_object"] if row.get("predicate_object") else None
+        G.add_node(subj, node_type="subject")
+        if obj:
+            G.add_node(obj, node_type="object")
+            G.add_edge(subj, obj, event=row["type"], ts=str(row["timestamp"]))
+    return G
+
+
+def test_window_graph_matches_networkx_builder():
+    w = random_window()
+    ref = _reference_graph(w)
+    G = GraphConstructor().build_graph(w)
+
+    assert list(G.nodes(data=True)) == list(ref.nodes(data=True))
+    legacy = [(u, v, {"event": d["event"], "ts": d["ts"]}) for u, v, d in G.edges(data=True)]
+    assert legacy == list(ref.edges(data=True))
+
+
+def test_window_graph_coalesces_repeated_edges():
+    w = random_window(n=200, n_entities=5)
+    wg = WindowGraph.from_events(w)
+
+    assert wg.num_edges == _reference_graph(w).number_of_edges()
+    assert wg.edge_count.sum() == w["predicate_object"].notna().sum()
+    assert (np.diff(wg.src) >= 0).all()
+
+
+def test_coalesced_edge_statistics():
+    w = random_window(n=300, n_entities=6, seed=2)
+    wg = WindowGraph.from_events(w)
+    ts = w["timestamp"].astype("datetime64[ns]").astype(np.int64)
+    index = {k: i for i, k in enumerate(wg.node_keys)}
+
+    rows = w[w["predicate_object"].notna()].assign(ns=ts)
+    for e, ((s, d), g) in enumerate(
+            sorted(rows.groupby(["subject", "predicate_object"], sort=False),
+                   key=lambda kv: (index[kv[0][0]], kv[1].index[0]))):
+        assert (wg.node_keys[wg.src[e]], wg.node_keys[wg.dst[e]]) == (s, d)
+        assert wg.edge_count[e] == len(g)
+        assert wg.edge_attrs["first_ts"][e] == g["ns"].min()
+        assert wg.ts[e] == g["ns"].max()
+        counts = g["type"].value_counts()
+        assert all(wg.edge_attrs["type_counts"][e, EVENT_TYPES.index(t)] == c
+                   for t, c in counts.items())
+        gaps = np.diff(g["ns"].to_numpy()) / 1e9
+        assert np.isclose(wg.edge_attrs["gap_sq"][e], (gaps ** 2).sum())
+
+    stats = wg.edge_stats()
+    assert stats.shape == (wg.num_edges, 4)
+    assert np.allclose(stats[:, 0], np.log1p(wg.edge_count))
+
+
+def test_incremental_sliding_window_matches_rebuild():
+    parts = [
+        random_window(n=300, n_entities=30, seed=s).assign(
+            timestamp=lambda d, s=s: d["timestamp"] + pd.Timedelta(seconds=2 * s))
+        for s in range(5)
+    ]
+    events = pd.concat(parts).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    windows = WindowGenerator(window_seconds=3, stride_seconds=1)
+    events, starts, lo, hi = windows.partition(events)
+    inc = IncrementalWindowGraph(windows.stride)
+    inc.COMPACT_MIN = 16  # trim interned keys / edge slots along the way
+    fe = FeatureEngineer()
+
+    for a, b in zip(lo, hi):
+        ref = WindowGraph.from_events(events.iloc[a:b])
+        got = inc.slide_to(events, a, b).to_window_graph()
+        for k in ("node_keys", "node_type_flag", "src", "dst", "event", "ts", "edge_count"):
+            assert np.array_equal(getattr(got, k), getattr(ref, k)), k
+        for k in ("first_ts", "type_counts"):
+            assert np.array_equal(got.edge_attrs[k], ref.edge_attrs[k]), k
+        assert np.allclose(got.edge_attrs["gap_sq"], ref.edge_attrs["gap_sq"])
+
+        # add / expire degree counters == degrees of the rebuilt window
+        known = inc.node_columns(got)
+        direct = fe.compute_feature_columns(ref, list(known))
+        for k in known:
+            assert np.array_equal(known[k], direct[k]), k
+        assert len(inc._keys) <= max(inc.COMPACT_MIN, 2 * got.num_nodes * len(inc.buckets))
+
+
+def test_sliding_window_reuses_centralities_of_an_unchanged_graph():
+    # the same second of activity, repeated: every window has the same graph
+    one = random_window(n=200, n_entities=20, seed=3)
+    events = pd.concat([one.assign(timestamp=one["timestamp"] + pd.Timedelta(seconds=s))
+                        for s in range(4)], ignore_index=True)
+
+    windows = WindowGenerator(window_seconds=2, stride_seconds=1)
+    events, starts, lo, hi = windows.partition(events)
+    inc = IncrementalWindowGraph(windows.stride)
+    fe = FeatureEngineer()
+    keys = ["closeness", "betweenness", "pagerank", "cluster_coeff"]
+
+    reused = 0
+    for a, b in zip(lo, hi):
+        G = inc.slide_to(events, a, b).to_window_graph()
+        known = inc.node_columns(G)
+        reused += "pagerank" in known
+        fe.add_window_features(G, None, known)
+        direct = fe.compute_feature_columns(WindowGraph.from_events(events.iloc[a:b]), keys)
+        for k in keys:
+            assert np.array_equal(G.node_attrs[k], direct[k]), k
+        inc.keep(G, keys)
+    assert reused == len(lo) - 1 > 0
+
+
+def test_rollup_matches_direct_coarse_windows():
+    parts = [
+        random_window(n=200, n_entities=30, seed=s).assign(
+            timestamp=lambda d, s=s: d["timestamp"] + pd.Timedelta(seconds=3 * s))
+        for s in range(8)
+    ]
+    events = pd.concat(parts).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    rollup = WindowRollup(resolutions=(1, 5, 10))
+    fe = FeatureEngineer()
+    events, starts, lo, hi = WindowGenerator(1).partition(events)
+    built = {}
+    for group in rollup.plan(starts):
+        for level, window_id, ws, we, wg in rollup.windows(events, group, lo, hi):
+            built[(level, window_id)] = (ws, wg)
+
+    for level, seconds in enumerate((1, 5, 10)):
+        _, c_starts, c_lo, c_hi = WindowGenerator(seconds).partition(events)
+        assert len(c_starts) == sum(1 for lv, _ in built if lv == level)
+        for window_id, (ws, a, b) in enumerate(zip(c_starts, c_lo, c_hi)):
+            got_ws, got = built[(level, window_id)]
+            w = events.iloc[a:b]
+            ref = WindowGraph.from_events(w)
+            assert got_ws == ws
+            for k in ("node_keys", "node_type_flag", "src", "dst", "event", "ts", "edge_count"):
+                assert np.array_equal(getattr(got, k), getattr(ref, k)), k
+            assert np.allclose(got.edge_stats(), ref.edge_stats())
+
+            # features computed on the merged graph = a direct coarse build
+            np.testing.assert_allclose(fe.compute_feature_matrix(got), fe.compute_feature_matrix(ref))
+
+
+@pytest.mark.parametrize("resolutions", [(1, 10, 15), (2, 3), (1, 4, 6)])
+def test_rollup_rejects_levels_that_do_not_nest(resolutions):
+    with pytest.raises(ValueError, match="must nest"):
+        WindowRollup(resolutions=resolutions)
+
+
+def test_hub_compaction_collapses_leaf_fan_out():
+    w = random_window(n=300, n_entities=20, seed=7)
+    hub = "f" * 32
+    fan = pd.DataFrame({
+        "timestamp": pd.Timestamp("2019-05-07 11:10:00.5") + pd.to_timedelta(np.arange(120), unit="ms"),
+        "type": ["EVENT_READ", "EVENT_OPEN"] * 60,
+        "subject": hub,
+        "predicate_object": [f"{i:032x}" for i in range(1000, 1120)],
+    })
+    events = pd.concat([w, fan]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    compactor = HubCompactor(max_fanout=16, min_degree=50).fit(events)
+    assert list(compactor.hub_keys) == [hub]
+
+    wg = WindowGraph.from_events(events)
+    got = compactor.compact(wg)
+
+    # 120 leaf edges -> one summary edge per event type
+    assert got.graph["hub_edges_removed"] == 118
+    assert got.num_edges == wg.num_edges - 118
+    assert got.num_nodes == wg.num_nodes - 118
+    assert got.edge_count.sum() == wg.edge_count.sum()
+    assert got.edge_attrs["type_counts"].sum() == wg.edge_attrs["type_counts"].sum()
+    assert sorted(got.node_attrs["collapsed"][-2:]) == [60, 60]
+    assert set(got.node_keys[-2:]) == {f"{hub}/EVENT_READ/out", f"{hub}/EVENT_OPEN/out"}
+    assert (np.diff(got.src) >= 0).all()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.ground_truth import GroundTruth
+
+
+def test_default_matches_single_attack_period():
+    truth = GroundTruth.load(None)
+    starts = pd.date_range("2019-05-07 11:09:58", "2019-05-07 11:12:01", freq="1s")
+    got = truth.label_windows(starts, starts + pd.Timedelta(seconds=1))
+
+    start, end = pd.Timestamp("2019-05-07 11:10:00"), pd.Timestamp("2019-05-07 11:11:59")
+    expected = [int(ws <= end and ws + pd.Timedelta(seconds=1) >= start) for ws in starts]
+    assert got["label"].tolist() == expected
+    assert list(got.columns) == ["label", "attack_overlap"]
+
+
+def test_many_intervals_hosts_and_techniques(tmp_path):
+    rng = np.random.default_rng(0)
+    t0 = pd.Timestamp("2019-05-07 10:00:00")
+    n = 40
+    starts = t0 + pd.to_timedelta(rng.integers(0, 600, n), unit="s")
+    pd.DataFrame({
+        "start": starts,
+        "end": starts + pd.to_timedelta(rng.integers(0, 30_000, n), unit="ms"),
+        "host": rng.choice(["", "hostA", "hostB"], n),
+        "technique": rng.choice(["T1059", "T1105", "T1059;T1003", ""], n),
+    }).to_csv(tmp_path / "ground_truth.csv", index=False)
+    truth = GroundTruth.load(tmp_path / "ground_truth.csv")
+
+    ws = t0 + pd.to_timedelta(np.arange(0, 650, 0.5), unit="s")
+    we = ws + pd.Timedelta(seconds=2)
+    hosts = {"hostA": rng.random(len(ws)) < 0.5, "hostB": rng.random(len(ws)) < 0.5}
+    got = truth.label_windows(ws, we, hosts)
+
+    df = pd.read_csv(tmp_path / "ground_truth.csv", dtype={"host": object}, parse_dates=["start", "end"])
+    for i in range(len(ws)):
+        applies = [pd.isna(h) or hosts[h][i] for h in df["host"]]
+        iv = df[applies]
+        touch = (iv["start"] <= we[i]) & (iv["end"] >= ws[i])
+        assert got["label"][i] == int(touch.any())
+        for t in ("T1059", "T1105", "T1003"):
+            tagged = iv["technique"].fillna("").str.split(";").map(lambda tags: t in tags)
+            assert got[f"technique_{t}"][i] == int((touch & tagged).any())
+
+        # covered fraction of the window by the union of applicable intervals
+        grid = ws[i] + pd.to_timedelta(np.arange(2000), unit="ms")
+        inside = np.zeros(len(grid), bool)
+        for s, e in zip(iv["start"], iv["end"]):
+            inside |= (grid >= s) & (grid < e)
+        assert abs(got["attack_overlap"][i] - inside.mean()) < 1e-9
@@ -0,0 +1,46 @@
+import pytest
+import torch
+
+from src.models.edge_correction import EdgeCorrection
+from src.models.tgnn import TGNN
+from src.training.utils_training import load_checkpoint
+from tests.helpers import loop_edge_correction
+
+
+def test_edge_correction_matches_loop():
+    torch.manual_seed(0)
+    x = torch.randn(30, 18)
+    edge_index = torch.randint(0, 20, (2, 200))   # nodes 20.. have no out-edges
+    correction = torch.randn(200, 18, requires_grad=True)
+
+    got = EdgeCorrection("sum")(x, edge_index, correction)
+    ref = loop_edge_correction(x, edge_index, correction)
+    assert torch.allclose(got, ref, atol=1e-6)
+
+    # same gradients as the in-place loop
+    g_got, = torch.autograd.grad(got.square().sum(), correction)
+    g_ref, = torch.autograd.grad(ref.square().sum(), correction)
+    assert torch.allclose(g_got, g_ref, atol=1e-5)
+
+    mean = EdgeCorrection("mean")(x, edge_index, correction)
+    peak = EdgeCorrection("max")(x, edge_index, correction)
+    for n in range(30):
+        rows = correction[edge_index[0] == n]
+        if len(rows):
+            assert torch.allclose(mean[n], x[n] + rows.mean(0), atol=1e-5)
+            assert torch.allclose(peak[n], x[n] + rows.max(0).values, atol=1e-6)
+        else:
+            assert torch.equal(mean[n], x[n]) and torch.equal(peak[n], x[n])
+
+    with pytest.raises(ValueError):
+        EdgeCorrection("median")
+
+
+def test_checkpoint_with_old_edge_features_is_refused(tmp_path):
+    path = tmp_path / "sentinel_tgnn.pt"
+    torch.save(TGNN(node_features=18, edge_features=22).state_dict(), path)
+    with pytest.raises(RuntimeError, match="retrain the model for the 26-column edge features"):
+        load_checkpoint(TGNN(node_features=18), path)
+
+    torch.save(TGNN(node_features=18).state_dict(), path)
+    load_checkpoint(TGNN(node_features=18), path)
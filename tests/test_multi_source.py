@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.multi_source_loader import MultiSourceLoader
+from src.pipeline.window_generator import WindowGenerator
+
+
+def _write_host(path, seconds):
+    rows = [
+        {
+            "uuid": "b'" + "\\x00" * 16 + "'",
+            "timestamp": f"2019-05-07 11:10:{s:02d}.{ms:03d}",
+            "type": "EVENT_READ",
+            "subject": "b'" + "\\x01" * 16 + "'",
+            "predicate_object": "b'" + "\\x02" * 16 + "'",
+            "size": 1,
+        }
+        for s in seconds for ms in (100, 600)
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def test_k_way_merge_is_ordered_and_tagged(tmp_path):
+    _write_host(tmp_path / "hostA.csv", range(0, 20, 2))
+    _write_host(tmp_path / "hostB.csv", range(1, 20, 2))
+
+    loader = MultiSourceLoader(str(tmp_path / "*.csv"), chunksize=4, use_cache=False)
+    loader.loaders[0].chunksize = loader.loaders[1].chunksize = 3
+    chunks = list(loader.iter_chunks())
+    events = pd.concat(chunks, ignore_index=True)
+
+    assert len(chunks) > 1
+    assert len(events) == 40
+    assert events["timestamp"].is_monotonic_increasing
+    assert events["host"].value_counts().to_dict() == {"hostA": 20, "hostB": 20}
+
+    windows = WindowGenerator(window_seconds=4, stride_seconds=2)
+    streamed = [(ws, len(w)) for ws, _, w in windows.iter_windows_stream(iter(chunks))]
+    batch = [(ws, len(w)) for ws, _, w in windows.iter_windows(events)]
+    assert streamed == batch
+
+
+def test_stream_refuses_rows_of_emitted_windows():
+    ts = pd.Timestamp("2019-05-07 11:10:00") + pd.to_timedelta(range(0, 10_000, 250), unit="ms")
+    events = pd.DataFrame({"timestamp": ts, "subject": "a", "predicate_object": "b"})
+    late = events.iloc[[6]]   # 11:10:01.5, after windows up to 11:10:05 went out
+    chunks = [events.iloc[:5], events.iloc[7:25], late, events.iloc[25:]]
+
+    windows = WindowGenerator(window_seconds=2, stride_seconds=1)
+    with pytest.raises(ValueError, match="11:10:01.500000 belongs to window"):
+        list(windows.iter_windows_stream(iter(chunks)))
+
+
+def test_many_sources_share_one_chunk_budget(tmp_path):
+    for h in range(40):
+        _write_host(tmp_path / f"host{h:02d}.csv", range(h % 5, 20, 5))
+    # host07: its first row moved to the end of the file, 15 s late
+    df = pd.read_csv(tmp_path / "host07.csv")
+    pd.concat([df.iloc[1:], df.iloc[:1]]).to_csv(tmp_path / "host07.csv", index=False)
+
+    loader = MultiSourceLoader(str(tmp_path / "*.csv"), chunksize=200, cache_dir=tmp_path / "cache")
+    assert sum(l.chunksize for l in loader.loaders) <= 200
+
+    events = pd.concat(loader.iter_chunks(), ignore_index=True)
+    assert len(events) == 40 * 8
+    assert events["timestamp"].is_monotonic_increasing